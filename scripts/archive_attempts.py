@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Archive old attempts to compressed Parquet files.
+
+Attempts older than the cutoff are moved, in chunks, to
+<archive dir>/month=YYYY-MM/ and deleted from the live database. Progress
+totals are unchanged (archived counts go to archived_attempt_totals);
+weak-topic suggestions use recent attempts only. Safe to re-run or
+interrupt. Requires pyarrow.
+
+Usage:
+    python scripts/archive_attempts.py --dry-run
+    python scripts/archive_attempts.py --db elevenplustutor.db --older-than-days 365 --vacuum
+    python scripts/archive_attempts.py --before 2025-09-01 --archive-dir /mnt/backup/attempts
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from src.core.database import ArchivedAttemptTotals, AttemptArchiveFile
+from src.progress.archive import DEFAULT_CHUNK_SIZE, archive_attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move old attempts to Parquet files')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--archive-dir', default=settings.attempt_archive_dir)
+    parser.add_argument('--older-than-days', type=int, default=settings.attempt_archive_after_days)
+    parser.add_argument('--before', help='Cutoff date (YYYY-MM-DD), instead of --older-than-days')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Attempts per chunk')
+    parser.add_argument('--dry-run', action='store_true', help='Count what would move without writing')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards to shrink the file')
+    args = parser.parse_args()
+
+    if args.before:
+        cutoff = datetime.fromisoformat(args.before)
+    else:
+        cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+
+    engine = create_engine(f"sqlite:///{Path(args.db).resolve()}")
+    for table in (ArchivedAttemptTotals.__table__, AttemptArchiveFile.__table__):
+        table.create(bind=engine, checkfirst=True)
+    engine.dispose()
+
+    size_before = os.path.getsize(args.db)
+    start = time.perf_counter()
+    try:
+        stats = archive_attempts(args.db, cutoff, args.archive_dir, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    except ImportError as e:
+        print(f"Parquet support is missing ({e}) - pip install pyarrow")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"Cutoff: {cutoff:%Y-%m-%d %H:%M}")
+    if args.dry_run:
+        print(f"Attempts to archive: {stats['attempts']:,}")
+        print("  Dry run - nothing written")
+        return
+
+    if stats["orphans_removed"]:
+        print(f"Removed {stats['orphans_removed']} unlisted file(s) from an interrupted run")
+    print(f"Archived {stats['attempts']:,} attempts to {stats['files']} file(s) "
+          f"({stats['bytes'] / 1e6:.1f} MB) in {elapsed:.1f}s")
+    remaining = sqlite3.connect(args.db).execute("SELECT count(*) FROM attempts").fetchone()[0]
+    print(f"Live attempts: {remaining:,}")
+
+    if args.vacuum and stats["attempts"]:
+        conn = sqlite3.connect(args.db)
+        conn.execute("VACUUM")
+        conn.close()
+        print(f"Database: {size_before / 1e6:.1f} MB -> {os.path.getsize(args.db) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
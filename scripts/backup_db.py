@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Back up, verify and restore the SQLite database.
+
+Backups are online: the API can keep running and taking submissions while
+a snapshot is taken. Each snapshot is a gzip file with a .sha256 next to it
+(so `sha256sum -c` also works), and only the newest --keep are kept.
+Restoring checks the snapshot, snapshots the current database first, and
+copies through the SQLite backup API; restart the API afterwards so its
+caches reload.
+
+Usage:
+    python scripts/backup_db.py
+    python scripts/backup_db.py --db /app/data/elevenplustutor.db --backup-dir /app/data/backups --keep 30
+    python scripts/backup_db.py --list
+    python scripts/backup_db.py --verify            # newest snapshot
+    python scripts/backup_db.py --verify all
+    python scripts/backup_db.py --restore backups/elevenplustutor-20260101T030000Z.db.gz
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from src.core.backup import (
+    BackupError, backup_database, list_snapshots, prune_snapshots, restore_snapshot, verify_snapshot,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Online backup, verification and restore for the SQLite database')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--backup-dir', default=settings.backup_dir)
+    parser.add_argument('--keep', type=int, default=settings.backup_keep, help='Snapshots to keep (0 = keep all)')
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--list', action='store_true', help='List snapshots')
+    action.add_argument('--verify', nargs='?', const='latest', metavar='SNAPSHOT',
+                        help='Check a snapshot (default: newest; "all" for every one)')
+    action.add_argument('--restore', metavar='SNAPSHOT', help='Replace the database with a snapshot')
+    args = parser.parse_args()
+
+    snapshots = list_snapshots(args.backup_dir, args.db)
+    try:
+        if args.list:
+            if not snapshots:
+                print(f"No snapshots in {args.backup_dir}")
+            for snapshot in snapshots:
+                print(f"  {snapshot.created:%Y-%m-%d %H:%M:%S}  {snapshot.bytes / 1e6:8.1f} MB  {snapshot.path}")
+
+        elif args.verify:
+            if args.verify == 'all':
+                targets = [s.path for s in snapshots]
+            elif args.verify == 'latest':
+                targets = [snapshots[-1].path] if snapshots else []
+            else:
+                targets = [Path(args.verify)]
+            if not targets:
+                print(f"No snapshots in {args.backup_dir}")
+                sys.exit(1)
+            for target in targets:
+                counts = verify_snapshot(str(target))
+                print(f"OK  {target.name}  ({', '.join(f'{t}: {n:,}' for t, n in counts.items() if n)})")
+
+        elif args.restore:
+            safety = restore_snapshot(args.restore, args.db, args.backup_dir)
+            if safety:
+                print(f"Previous database saved as {safety.path}")
+            print(f"Restored {args.db} from {Path(args.restore).name} - restart the API to reload caches")
+
+        else:
+            snapshot = backup_database(args.db, args.backup_dir)
+            removed = prune_snapshots(args.backup_dir, args.db, args.keep)
+            print(f"Snapshot: {snapshot.path}")
+            print(f"  {snapshot.database_bytes / 1e6:.1f} MB -> {snapshot.bytes / 1e6:.1f} MB in {snapshot.seconds:.1f}s"
+                  + (f" ({snapshot.restarts} restart(s) from concurrent writes)" if snapshot.restarts else ""))
+            if removed:
+                print(f"  Removed {len(removed)} old snapshot(s)")
+    except BackupError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Load-testing benchmark for the 11+ Tutor API.
+Replays a realistic traffic mix with concurrent virtual users and reports
+p50/p95/p99 latency and throughput per route as JSON.
+
+Runs the FastAPI app in-process by default (no server needed), or against a
+running server with --base-url. Submit scenarios write attempts, so point
+--db at a copy of the database.
+
+Usage:
+    python scripts/benchmark.py --db /tmp/bench.db --concurrency 20 --duration 30
+    python scripts/benchmark.py --base-url http://localhost:8002 --mix browse=5,submit=3
+    python scripts/benchmark.py --output after.json --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+MOCK_EXAM_QUESTIONS = 50     # Matches EXAM_QUESTIONS in web/app/mock/page.tsx
+
+DEFAULT_MIX = {
+    "browse": 35,
+    "random_question": 15,
+    "submit": 25,
+    "progress": 10,
+    "strategies": 10,
+    "mock_exam": 5,
+}
+
+
+# ============================================================================
+# Recording
+# ============================================================================
+
+class Recorder:
+    """Collects latency samples and status codes per route label"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = True
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            if self.recording:
+                self.errors[route] += 1
+            return None
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            self.latencies[route].append(elapsed)
+            self.statuses[route][response.status_code] += 1
+            if response.status_code >= 400:
+                self.errors[route] += 1
+        return response
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict:
+    """Per-route and overall latency/throughput summary (milliseconds)"""
+    routes = {}
+    all_latencies: List[float] = []
+    for route in sorted(set(recorder.latencies) | set(recorder.errors)):
+        values = sorted(recorder.latencies.get(route, []))
+        all_latencies.extend(values)
+        routes[route] = _stats(values, elapsed)
+        routes[route]["errors"] = recorder.errors.get(route, 0)
+        routes[route]["status"] = {str(k): v for k, v in sorted(recorder.statuses[route].items())}
+
+    total = _stats(sorted(all_latencies), elapsed)
+    total["errors"] = sum(recorder.errors.values())
+    return {"total": total, "routes": routes}
+
+
+def _stats(values: List[float], elapsed: float) -> Dict:
+    count = len(values)
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 2) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+class Workload:
+    """Question ids/options fetched up front so scenarios don't pay for discovery"""
+
+    def __init__(self, questions: List[Dict], subjects: List[str], students: List[str]):
+        self.questions = questions
+        self.subjects = subjects
+        self.students = students
+
+
+async def browse(client, rec: Recorder, work: Workload, rng: random.Random):
+    """List a subject, then open a couple of questions"""
+    subject = rng.choice(work.subjects)
+    await rec.call(client, "GET /api/questions", "GET", "/api/questions",
+                   params={"subject": subject, "limit": 20})
+    for question in rng.sample(work.questions, min(2, len(work.questions))):
+        await rec.call(client, "GET /api/questions/{id}", "GET", f"/api/questions/{question['id']}")
+
+
+async def random_question(client, rec: Recorder, work: Workload, rng: random.Random):
+    await rec.call(client, "GET /api/questions/random", "GET", "/api/questions/random",
+                   params={"subject": rng.choice(work.subjects)})
+
+
+def _submission(question: Dict, student_id: str, rng: random.Random) -> Dict:
+    options = question.get("options") or [""]
+    answer = rng.choice(options)
+    return {
+        "question_id": question["id"],
+        "student_id": student_id,
+        "answer": answer if isinstance(answer, str) else json.dumps(answer),
+        "time_taken_seconds": rng.randint(5, 60),
+    }
+
+
+async def submit(client, rec: Recorder, work: Workload, rng: random.Random):
+    question = rng.choice(work.questions)
+    await rec.call(client, "POST /api/submit", "POST", "/api/submit",
+                   json=_submission(question, rng.choice(work.students), rng))
+
+
+async def progress(client, rec: Recorder, work: Workload, rng: random.Random):
+    await rec.call(client, "GET /api/progress/{student_id}", "GET",
+                   f"/api/progress/{rng.choice(work.students)}")
+
+
+async def strategies(client, rec: Recorder, work: Workload, rng: random.Random):
+    """Open the guide list, then one of the guides it offers"""
+    response = await rec.call(client, "GET /api/strategies", "GET", "/api/strategies")
+    if response is None or response.status_code != 200:
+        return
+    guides = [s["question_type"] for s in response.json().get("strategies", []) if s.get("question_type")]
+    if guides:
+        await rec.call(client, "GET /api/strategies/{question_type}", "GET",
+                       f"/api/strategies/{rng.choice(guides)}")
+
+
+async def mock_exam(client, rec: Recorder, work: Workload, rng: random.Random):
+    """Load an exam, then mark every answer one by one like the mock page does"""
+    response = await rec.call(client, "GET /api/questions (mock exam)", "GET", "/api/questions",
+                              params={"limit": MOCK_EXAM_QUESTIONS})
+    questions = response.json() if response is not None and response.status_code == 200 else []
+    for question in questions:
+        await rec.call(client, "POST /api/submit (mock exam)", "POST", "/api/submit",
+                       json=_submission(question, "mock-exam", rng))
+
+
+SCENARIOS = {
+    "browse": browse,
+    "random_question": random_question,
+    "submit": submit,
+    "progress": progress,
+    "strategies": strategies,
+    "mock_exam": mock_exam,
+}
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, int]:
+    """Parse "browse=5,submit=3" into scenario weights"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+async def load_workload(client: httpx.AsyncClient, students: int) -> Workload:
+    response = await client.get("/api/questions", params={"limit": 100})
+    response.raise_for_status()
+    questions = response.json()
+    if not questions:
+        raise SystemExit("No questions in the database - import some first")
+    subjects = sorted({q["subject"] for q in questions})
+    return Workload(questions, subjects, [f"bench-{i:03d}" for i in range(students)])
+
+
+async def virtual_user(client, rec: Recorder, work: Workload, mix: Dict[str, int],
+                       rng: random.Random, deadline: float, budget: List[int]):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    while time.perf_counter() < deadline:
+        if budget[0] is not None:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+        scenario = SCENARIOS[rng.choices(names, weights)[0]]
+        await scenario(client, rec, work, rng)
+
+
+def make_client(base_url: Optional[str], concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits)
+
+    # In-process: drive the ASGI app directly (no network, no server)
+    from src.api.main import app
+    from src.core.database import init_db
+    init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+
+async def run_benchmark(base_url: Optional[str], concurrency: int, duration: float, warmup: float,
+                        mix: Dict[str, int], seed: Optional[int], max_scenarios: Optional[int] = None,
+                        students: int = 50) -> Dict:
+    rng = random.Random(seed)
+    rec = Recorder()
+    async with make_client(base_url, concurrency) as client:
+        work = await load_workload(client, students)
+
+        if warmup > 0:
+            rec.recording = False
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(
+                virtual_user(client, rec, work, mix, random.Random(rng.random()), deadline, [None])
+                for _ in range(concurrency)
+            ))
+            rec.recording = True
+
+        budget = [max_scenarios]
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            virtual_user(client, rec, work, mix, random.Random(rng.random()), deadline, budget)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    result = summarize(rec, elapsed)
+    result["config"] = {
+        "target": base_url or "in-process",
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "warmup_s": warmup,
+        "mix": mix,
+        "seed": seed,
+    }
+    return result
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def print_report(result: Dict, baseline: Optional[Dict] = None):
+    config = result["config"]
+    print(f"Target: {config['target']}  concurrency={config['concurrency']}  duration={config['duration_s']}s")
+    header = f"{'Route':<36} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    print(header)
+    print("-" * len(header))
+
+    rows: List[Tuple[str, Dict]] = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, stats in rows:
+        line = (f"{route:<36} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>5}")
+        if baseline:
+            base = baseline["total"] if route == "TOTAL" else baseline["routes"].get(route)
+            if base and base["p95_ms"]:
+                change = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+                line += f" {change:>+11.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the 11+ Tutor API under a realistic traffic mix')
+    parser.add_argument('--db', help='Database for in-process runs (sets DATABASE_URL)')
+    parser.add_argument('--base-url', help='Benchmark a running server instead, e.g. http://localhost:8002')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=10, help='Measured run length in seconds')
+    parser.add_argument('--warmup', type=float, default=2, help='Unmeasured warm-up in seconds')
+    parser.add_argument('--scenarios', type=int, help='Stop after this many scenarios (for quick checks)')
+    parser.add_argument('--mix', help=f'Scenario weights, e.g. browse=5,submit=3 (from: {", ".join(SCENARIOS)})')
+    parser.add_argument('--students', type=int, default=50, help='Distinct student ids used for submits/progress')
+    parser.add_argument('--seed', type=int, help='Random seed for a repeatable traffic sequence')
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout only)')
+    parser.add_argument('--compare', help='Baseline JSON report to compare p95 against')
+    parser.add_argument('--json', action='store_true', help='Print the JSON report instead of a table')
+    args = parser.parse_args()
+
+    if args.db and not args.base_url:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(args.db).resolve()}"
+
+    result = asyncio.run(run_benchmark(
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        warmup=args.warmup,
+        mix=parse_mix(args.mix),
+        seed=args.seed,
+        max_scenarios=args.scenarios,
+        students=args.students,
+    ))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
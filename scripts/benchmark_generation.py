@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Measure question-generation throughput (questions per minute).
+
+Compares the old shape (one question per awaited call) against batched,
+concurrent, streamed generation. Runs against the stub LLM server by
+default, started in-process, so results are repeatable; pass --host to
+measure a real local model.
+
+Usage:
+    python scripts/benchmark_generation.py --count 60
+    python scripts/benchmark_generation.py --count 40 --host http://localhost:1234/v1 --model local-model
+    python scripts/benchmark_generation.py --configs 1x1,4x1,4x5,8x5 --output gen.json
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.agents.llm_client import create_llm_client
+from src.agents.generation import GenerationPipeline
+
+DEFAULT_CONFIGS = "1x1,4x1,1x5,4x5,8x10"
+
+
+def parse_configs(text: str) -> List[Tuple[int, int]]:
+    """"4x5,8x10" -> [(concurrency, per_call), ...]"""
+    configs = []
+    for part in text.split(","):
+        concurrency, _, per_call = part.strip().partition("x")
+        configs.append((int(concurrency), int(per_call or 1)))
+    return configs
+
+
+async def measure(host: str, model: str, binding: str, count: int, concurrency: int, per_call: int,
+                  subject: str, question_type: str) -> Dict:
+    async with create_llm_client(host=host, model=model, binding=binding, max_connections=concurrency) as llm:
+        pipeline = GenerationPipeline(llm, concurrency=concurrency, per_call=per_call)
+        questions = await pipeline.generate(subject, question_type, count)
+    stats = pipeline.stats
+    return {
+        "concurrency": concurrency,
+        "per_call": per_call,
+        "questions": len(questions),
+        "calls": stats.calls,
+        "rejected": stats.rejected,
+        "malformed": stats.malformed,
+        "retry_calls": stats.retry_calls,
+        "aborted_calls": stats.aborted_calls,
+        "duplicates": stats.duplicates,
+        "failed_calls": stats.failed_calls,
+        "seconds": round(stats.elapsed_seconds, 2),
+        "first_question_seconds": round(stats.first_question_seconds or 0, 2),
+        "questions_per_minute": round(stats.questions_per_minute, 1),
+    }
+
+
+def run(args, host: str, binding: str) -> List[Dict]:
+    results = []
+    print(f"{'config':>8} {'questions':>9} {'calls':>6} {'retries':>7} {'rejected':>8} "
+          f"{'first(s)':>9} {'total(s)':>9} {'q/min':>8}")
+    for concurrency, per_call in parse_configs(args.configs):
+        result = asyncio.run(measure(host, args.model, binding, args.count, concurrency, per_call,
+                                     args.subject, args.type))
+        results.append(result)
+        print(f"{concurrency:>4}x{per_call:<3} {result['questions']:>9} {result['calls']:>6} "
+              f"{result['retry_calls']:>7} {result['rejected']:>8} {result['first_question_seconds']:>9.2f} "
+              f"{result['seconds']:>9.2f} {result['questions_per_minute']:>8.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched LLM question generation')
+    parser.add_argument('--count', type=int, default=60, help='Questions to generate per configuration')
+    parser.add_argument('--configs', default=DEFAULT_CONFIGS, help='CONCURRENCYxPER_CALL list')
+    parser.add_argument('--subject', default='mathematics')
+    parser.add_argument('--type', default='arithmetic')
+    parser.add_argument('--host', help='Real LLM endpoint (default: in-process stub server)')
+    parser.add_argument('--binding', default='openai', choices=['openai', 'ollama'])
+    parser.add_argument('--model', default='stub')
+    parser.add_argument('--stub-port', type=int, default=8765)
+    parser.add_argument('--stub-tokens-per-second', type=float, default=60.0)
+    parser.add_argument('--stub-parallel', type=int, default=4)
+    parser.add_argument('--stub-invalid-rate', type=float, default=0.05, help='Share of invalid stub questions')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    if args.host:
+        results = run(args, args.host, args.binding)
+    else:
+        from stub_llm_server import BackgroundServer, StubConfig
+
+        config = StubConfig(tokens_per_second=args.stub_tokens_per_second, parallel=args.stub_parallel,
+                            invalid_rate=args.stub_invalid_rate)
+        print(f"Stub LLM: {config.tokens_per_second:g} tokens/s per request, {config.parallel} parallel slots")
+        with BackgroundServer(config, port=args.stub_port) as server:
+            results = run(args, server.url, "openai")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Build or update the semantic index (questions, lessons, strategy guides).
+
+Each document is hashed together with the embedding model name; only new or
+changed documents are embedded, in batched requests, and everything else is
+copied from the previous index. Re-running after adding questions costs one
+request per batch of new questions, and an unchanged bank costs nothing.
+
+Usage:
+    python scripts/build_embeddings.py
+    python scripts/build_embeddings.py --db elevenplustutor.db --batch-size 64
+    python scripts/build_embeddings.py --binding openai --host http://localhost:1234/v1 --model text-embedding-nomic
+    python scripts/build_embeddings.py --dry-run
+"""
+
+import sys
+import time
+import sqlite3
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from src.agents.llm_client import LLMError
+from src.knowledge.semantic_index import (
+    Document, SemanticIndex, build_index, create_embedding_client,
+    question_document, lesson_documents, strategy_documents,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def collect_documents(db_path: str) -> List[Document]:
+    """Every indexable document, questions first (stable order keeps row copies cheap)"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            "SELECT id, subject, question_type, question_text, options FROM questions ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    documents = [question_document(dict(row)) for row in rows]
+    documents.extend(lesson_documents(DATA_DIR / "lessons"))
+    documents.extend(strategy_documents(DATA_DIR / "strategies"))
+    return documents
+
+
+async def run(args) -> int:
+    documents = collect_documents(args.db)
+    model = args.model or settings.embedding_model
+
+    if args.dry_run:
+        index = SemanticIndex.load(args.index_dir)
+        current = {}
+        if index is not None and index.model == model:
+            current = dict(zip(index.ids, index.hashes))
+        pending = sum(1 for doc in documents if current.get(doc.doc_id) != doc.content_hash(model))
+        print(f"{len(documents)} documents, {pending} to embed with {model}")
+        return 0
+
+    overrides = {"model": model}
+    if args.binding:
+        overrides["binding"] = args.binding
+    if args.host:
+        overrides["host"] = args.host
+
+    def progress(done: int, total: int):
+        print(f"\r  embedded {done}/{total}", end="", flush=True)
+
+    async with create_embedding_client(**overrides) as client:
+        try:
+            stats = await build_index(
+                args.index_dir, documents, client.embed, model,
+                batch_size=args.batch_size, progress=progress,
+            )
+        except LLMError as e:
+            print(f"\nEmbedding failed: {e}")
+            print("Nothing was replaced; the previous index is still in use")
+            return 1
+
+    if stats.embedded:
+        print()
+    print(f"{stats.documents} documents: {stats.embedded} embedded in {stats.batches} batches, "
+          f"{stats.reused} reused, {stats.removed} removed ({stats.seconds:.1f}s)")
+
+    start = time.perf_counter()
+    index = SemanticIndex.load(args.index_dir)
+    print(f"Index loads in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(index)} x {index.vectors.shape[1]} vectors)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the semantic search index')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--index-dir', default=settings.embedding_index_dir)
+    parser.add_argument('--model', help='Override settings.embedding_model')
+    parser.add_argument('--binding', choices=['openai', 'ollama'], help='Override settings.embedding_binding')
+    parser.add_argument('--host', help='Override settings.embedding_host')
+    parser.add_argument('--batch-size', type=int, default=settings.embedding_batch_size)
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many documents need embedding')
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
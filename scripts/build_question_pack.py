@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compile the question bank into a read-only question pack.
+
+The pack is a single memory-mapped file (see src/question_bank/pack.py)
+that the API serves question reads from when QUESTION_PACK points at it -
+meant for old laptops and Raspberry Pi-class machines. Build it from the
+database, or straight from all_questions.json on a machine with no DB.
+
+Usage:
+    python scripts/build_question_pack.py --db elevenplustutor.db --out question_pack.bin
+    python scripts/build_question_pack.py --from-json data/questions/all_questions.json
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from src.question_bank.pack import QuestionPack, build_pack
+from scripts.import_questions import question_fields
+
+DB_COLUMNS = (
+    "id", "exam_type", "subject", "topic", "question_type", "difficulty", "question_text", "options",
+    "correct_answer", "correct_index", "marks_available", "worked_solution", "hint", "tags",
+)
+
+
+def questions_from_db(db_path: str) -> Iterator[Dict]:
+    """Every question in key order (the order the API pages through)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        order = "pk" if "pk" in {row[1] for row in conn.execute("PRAGMA table_info(questions)")} else "rowid"
+        cursor = conn.execute(f"SELECT {', '.join(DB_COLUMNS)} FROM questions ORDER BY {order}")
+        for row in cursor:
+            q = dict(zip(DB_COLUMNS, row))
+            for column in ("options", "tags"):
+                try:
+                    q[column] = json.loads(q[column]) if q[column] else None
+                except ValueError:
+                    q[column] = None
+            yield q
+    finally:
+        conn.close()
+
+
+def questions_from_json(path: str) -> Iterator[Dict]:
+    """Questions from an export, mapped the way import_questions stores them"""
+    with open(path) as f:
+        data = json.load(f)
+    seen = set()
+    for q in data if isinstance(data, list) else [data]:
+        fields = question_fields(q)
+        if fields["id"] and fields["id"] not in seen:
+            seen.add(fields["id"])
+            yield fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a memory-mapped question pack')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--from-json', help='Build from a JSON export instead of the database')
+    parser.add_argument('--out', default=settings.question_pack or 'question_pack.bin')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    questions = questions_from_json(args.from_json) if args.from_json else questions_from_db(args.db)
+    stats = build_pack(questions, args.out)
+    elapsed = time.perf_counter() - start
+
+    pack = QuestionPack.load(args.out)
+    print(f"Pack: {args.out}")
+    print(f"  {stats['questions']:,} questions, {stats['strings']:,} distinct strings, "
+          f"{stats['facet_values']:,} facet values")
+    print(f"  {stats['bytes'] / 1e6:.1f} MB, built in {elapsed:.1f}s")
+    print(f"  Serve it with QUESTION_PACK={Path(args.out).resolve()}")
+    pack.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Export the question bank as static, content-hashed JSON packs.
+
+Run after importing or generating questions. Only packs whose questions
+changed are rewritten (and recompressed). By default packs go to
+web/public/packs, which the frontend serves at /packs; point --out at a
+CDN sync directory instead and set STATIC_PACK_BASE_URL to match.
+Clients read /api/packs/manifest to find them.
+
+Usage:
+    python scripts/export_static_packs.py
+    python scripts/export_static_packs.py --db elevenplustutor.db --out /srv/cdn/packs
+    python scripts/export_static_packs.py --force
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from src.question_bank import static_packs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export static question packs')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--out', default=settings.static_pack_dir)
+    parser.add_argument('--force', action='store_true', help='Rewrite every pack, changed or not')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = static_packs.export_packs(args.db, args.out, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    print(f"Packs: {stats['packs']} ({stats['questions']:,} questions, {stats['bytes'] / 1e6:.1f} MB uncompressed)")
+    print(f"  Written: {stats['written']}  Unchanged: {stats['unchanged']}  Old files removed: {stats['removed']}")
+    if static_packs.brotli is None:
+        print("  brotli is not installed - wrote .gz files only (pip install brotli)")
+    print(f"  Done in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -15,40 +15,10 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.database import init_db, Question, SessionLocal
+from src.question_bank.mimic import CODE_WORDS, apply_cipher
 
-# Common 4-6 letter words for code_words questions
-WORDS = [
-    # 4-letter words
-    "WORD", "MATH", "BOOK", "FISH", "BIRD", "TREE", "HAND", "FACE", "DOOR", "LAKE",
-    "FIRE", "WIND", "RAIN", "SNOW", "STAR", "MOON", "GOLD", "PINK", "BLUE", "GRAY",
-    "KING", "JUMP", "WALK", "TALK", "PLAY", "READ", "SING", "DRAW", "SWIM", "RIDE",
-    "CAMP", "HELP", "LIFT", "PUSH", "PULL", "KICK", "WAVE", "CLAP", "SPIN", "FLIP",
-    "BEAR", "DUCK", "FROG", "GOAT", "LION", "WOLF", "DEER", "SEAL", "CRAB", "MOTH",
-
-    # 5-letter words
-    "HOUSE", "SMART", "BRAIN", "DANCE", "MUSIC", "LIGHT", "NIGHT", "DREAM", "PEACE",
-    "EARTH", "WATER", "PLANT", "FRUIT", "BREAD", "CHAIR", "TABLE", "CLOCK", "PHONE",
-    "SMILE", "LAUGH", "THINK", "LEARN", "TEACH", "WRITE", "SPEAK", "SLEEP", "CLIMB",
-    "HORSE", "SHEEP", "SNAKE", "WHALE", "TIGER", "ZEBRA", "PANDA", "CAMEL", "MOUSE",
-    "CLOUD", "STORM", "FROST", "BEACH", "RIVER", "OCEAN", "MOUNT", "FIELD", "GRASS",
-
-    # 6-letter words
-    "TARGET", "FRIEND", "SCHOOL", "FAMILY", "GARDEN", "ANIMAL", "BRIDGE", "CASTLE",
-    "FLOWER", "MONKEY", "RABBIT", "DRAGON", "PLANET", "SUMMER", "WINTER", "SPRING",
-    "AUTUMN", "ORANGE", "PURPLE", "YELLOW", "SILVER", "GOLDEN", "BRIGHT", "SISTER",
-    "BROTHER", "PARENT", "MARKET", "ISLAND", "FOREST", "DESERT", "JUNGLE", "STREAM",
-]
-
-def apply_cipher(word: str, shift: int) -> str:
-    """Apply Caesar cipher with given shift."""
-    result = []
-    for c in word.upper():
-        if c.isalpha():
-            shifted = (ord(c) - ord('A') + shift) % 26
-            result.append(chr(shifted + ord('A')))
-        else:
-            result.append(c)
-    return ''.join(result)
+# Common 4-6 letter words for code_words questions (also used by the question mimic)
+WORDS = CODE_WORDS
 
 
 def generate_wrong_options(correct: str, shift: int, num_options: int = 4) -> list:
@@ -2,143 +2,44 @@
 """
 Non-Verbal Reasoning Question Generator for 11+ Tutor
 
-Generates SVG-based NVR questions including:
+Generates shape-based NVR questions including:
 - Pattern sequences (shapes follow a rule)
 - Shape analogies (A:B :: C:?)
 - Odd one out (which shape doesn't belong)
 - Rotations and reflections
 
-All shapes are generated as SVG strings that can be rendered directly in the browser.
+Tiles are stored as compact scene dicts (shape, fill, rotation, size, inner shape);
+the API renders them to SVG on demand via src.question_bank.nvr.
 """
 
+import sys
 import sqlite3
 import json
 import random
 import uuid
-import math
-from typing import List, Dict, Tuple
+from pathlib import Path
+from typing import List
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.question_bank.nvr import Shape, DEFAULT_SIZE, SCENE_VERSION
 
 # =============================================================================
-# SVG Shape Generator
+# Scene Helpers
 # =============================================================================
 
-class SVGShapeGenerator:
-    """Generate SVG shapes for NVR questions."""
-    
-    COLORS = ['#3B82F6', '#EF4444', '#10B981', '#F59E0B', '#8B5CF6', '#EC4899']
-    SHAPES = ['circle', 'square', 'triangle', 'pentagon', 'hexagon', 'star', 'diamond']
-    
-    def __init__(self, size: int = 80):
-        self.size = size
-        self.center = size // 2
-    
-    def create_svg(self, content: str, viewbox: str = None) -> str:
-        """Wrap content in SVG tags."""
-        vb = viewbox or f"0 0 {self.size} {self.size}"
-        return f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{vb}" width="{self.size}" height="{self.size}">{content}</svg>'
-    
-    def circle(self, cx: int = None, cy: int = None, r: int = None, 
-               fill: str = '#3B82F6', stroke: str = '#1E40AF', stroke_width: int = 2) -> str:
-        cx = cx or self.center
-        cy = cy or self.center
-        r = r or (self.size // 2 - 5)
-        return f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"/>'
-    
-    def square(self, x: int = None, y: int = None, size: int = None,
-               fill: str = '#EF4444', stroke: str = '#B91C1C', stroke_width: int = 2,
-               rotation: int = 0) -> str:
-        size = size or (self.size - 10)
-        x = x if x is not None else 5
-        y = y if y is not None else 5
-        transform = f' transform="rotate({rotation} {self.center} {self.center})"' if rotation else ''
-        return f'<rect x="{x}" y="{y}" width="{size}" height="{size}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"{transform}/>'
-    
-    def triangle(self, cx: int = None, cy: int = None, size: int = None,
-                 fill: str = '#10B981', stroke: str = '#047857', stroke_width: int = 2,
-                 rotation: int = 0) -> str:
-        cx = cx or self.center
-        cy = cy or self.center
-        size = size or (self.size - 10)
-        h = size * math.sqrt(3) / 2
-        points = f"{cx},{cy - h*2/3} {cx - size/2},{cy + h/3} {cx + size/2},{cy + h/3}"
-        transform = f' transform="rotate({rotation} {cx} {cy})"' if rotation else ''
-        return f'<polygon points="{points}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"{transform}/>'
-    
-    def pentagon(self, cx: int = None, cy: int = None, r: int = None,
-                 fill: str = '#F59E0B', stroke: str = '#B45309', stroke_width: int = 2,
-                 rotation: int = 0) -> str:
-        return self._regular_polygon(5, cx, cy, r, fill, stroke, stroke_width, rotation)
-    
-    def hexagon(self, cx: int = None, cy: int = None, r: int = None,
-                fill: str = '#8B5CF6', stroke: str = '#6D28D9', stroke_width: int = 2,
-                rotation: int = 0) -> str:
-        return self._regular_polygon(6, cx, cy, r, fill, stroke, stroke_width, rotation)
-    
-    def star(self, cx: int = None, cy: int = None, r: int = None,
-             fill: str = '#EC4899', stroke: str = '#BE185D', stroke_width: int = 2,
-             points_count: int = 5, rotation: int = 0) -> str:
-        cx = cx or self.center
-        cy = cy or self.center
-        r = r or (self.size // 2 - 5)
-        inner_r = r * 0.4
-        
-        points = []
-        for i in range(points_count * 2):
-            angle = math.pi * i / points_count - math.pi / 2
-            radius = r if i % 2 == 0 else inner_r
-            x = cx + radius * math.cos(angle)
-            y = cy + radius * math.sin(angle)
-            points.append(f"{x:.1f},{y:.1f}")
-        
-        transform = f' transform="rotate({rotation} {cx} {cy})"' if rotation else ''
-        return f'<polygon points="{" ".join(points)}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"{transform}/>'
-    
-    def diamond(self, cx: int = None, cy: int = None, size: int = None,
-                fill: str = '#06B6D4', stroke: str = '#0E7490', stroke_width: int = 2,
-                rotation: int = 0) -> str:
-        cx = cx or self.center
-        cy = cy or self.center
-        size = size or (self.size // 2 - 5)
-        points = f"{cx},{cy - size} {cx + size},{cy} {cx},{cy + size} {cx - size},{cy}"
-        transform = f' transform="rotate({rotation} {cx} {cy})"' if rotation else ''
-        return f'<polygon points="{points}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"{transform}/>'
-    
-    def _regular_polygon(self, sides: int, cx: int = None, cy: int = None, r: int = None,
-                         fill: str = '#3B82F6', stroke: str = '#1E40AF', stroke_width: int = 2,
-                         rotation: int = 0) -> str:
-        cx = cx or self.center
-        cy = cy or self.center
-        r = r or (self.size // 2 - 5)
-        
-        points = []
-        for i in range(sides):
-            angle = 2 * math.pi * i / sides - math.pi / 2
-            x = cx + r * math.cos(angle)
-            y = cy + r * math.sin(angle)
-            points.append(f"{x:.1f},{y:.1f}")
-        
-        transform = f' transform="rotate({rotation} {cx} {cy})"' if rotation else ''
-        return f'<polygon points="{" ".join(points)}" fill="{fill}" stroke="{stroke}" stroke-width="{stroke_width}"{transform}/>'
-    
-    def get_shape(self, shape_type: str, **kwargs) -> str:
-        """Get a shape by type name."""
-        methods = {
-            'circle': self.circle,
-            'square': self.square,
-            'triangle': self.triangle,
-            'pentagon': self.pentagon,
-            'hexagon': self.hexagon,
-            'star': self.star,
-            'diamond': self.diamond,
-        }
-        return methods.get(shape_type, self.circle)(**kwargs)
-    
-    def shape_with_inner(self, outer: str, inner: str, outer_color: str, inner_color: str) -> str:
-        """Create a shape with another shape inside it."""
-        outer_svg = self.get_shape(outer, fill=outer_color, r=self.size//2 - 5)
-        inner_svg = self.get_shape(inner, fill=inner_color, r=self.size//4, 
-                                   size=self.size//3, cx=self.center, cy=self.center)
-        return outer_svg + inner_svg
+COLORS = ['#3B82F6', '#EF4444', '#10B981', '#F59E0B', '#8B5CF6', '#EC4899']
+SHAPES = ['circle', 'square', 'triangle', 'pentagon', 'hexagon', 'star', 'diamond']
+
+
+def tile(shape: str, fill: str, rotation: int = 0, size: int = None, inner: dict = None) -> dict:
+    """Build a compact scene dict for one tile (rendered to SVG by the API)."""
+    scene = Shape(shape=shape, fill=fill, rotation=rotation, size=size or DEFAULT_SIZE)
+    data = scene.to_dict()
+    if inner:
+        data['inner'] = inner
+    return data
 
 # =============================================================================
 # NVR Question Generators
@@ -149,7 +50,6 @@ class NVRQuestionGenerator:
     
     def __init__(self, db_path: str = "elevenplustutor.db"):
         self.db_path = db_path
-        self.svg = SVGShapeGenerator(80)
     
     def connect(self):
         conn = sqlite3.connect(self.db_path)
@@ -193,7 +93,7 @@ class NVRQuestionGenerator:
     def generate_rotation_sequence(self, difficulty: int = 2) -> dict:
         """Generate a sequence where shapes rotate."""
         shape = random.choice(['triangle', 'square', 'pentagon', 'star'])
-        color = random.choice(SVGShapeGenerator.COLORS)
+        color = random.choice(COLORS)
         
         if difficulty <= 2:
             rotation_step = random.choice([45, 90])
@@ -201,14 +101,13 @@ class NVRQuestionGenerator:
             rotation_step = random.choice([30, 45, 60, 72])
         
         # Create sequence
-        sequence_svgs = []
+        sequence_tiles = []
         for i in range(4):
-            svg_content = self.svg.get_shape(shape, fill=color, rotation=i * rotation_step)
-            sequence_svgs.append(self.svg.create_svg(svg_content))
+            sequence_tiles.append(tile(shape, color, rotation=i * rotation_step))
         
         # Correct answer
         correct_rotation = 4 * rotation_step
-        correct_svg = self.svg.create_svg(self.svg.get_shape(shape, fill=color, rotation=correct_rotation))
+        correct_tile = tile(shape, color, rotation=correct_rotation)
         
         # Wrong answers (different rotations)
         wrong_rotations = [
@@ -217,17 +116,17 @@ class NVRQuestionGenerator:
             correct_rotation + 2 * rotation_step,
             0  # No rotation
         ]
-        wrong_svgs = [self.svg.create_svg(self.svg.get_shape(shape, fill=color, rotation=r)) 
-                      for r in wrong_rotations[:4]]
+        wrong_tiles = [tile(shape, color, rotation=r) for r in wrong_rotations[:4]]
         
-        options = wrong_svgs[:4] + [correct_svg]
+        options = wrong_tiles[:4] + [correct_tile]
         random.shuffle(options)
-        correct_index = options.index(correct_svg)
+        correct_index = options.index(correct_tile)
         
         # Combine sequence images into question_text as JSON
         question_data = {
             'type': 'nvr_sequence',
-            'sequence': sequence_svgs,
+            'scene_version': SCENE_VERSION,
+            'sequence': sequence_tiles,
             'instruction': 'What comes next in the sequence?'
         }
         
@@ -236,31 +135,17 @@ class NVRQuestionGenerator:
             'subject': 'non_verbal_reasoning',
             'question_type': 'nvr_sequences',
             'difficulty': difficulty,
-            'question_text': json.dumps(question_data),
+            'question_text': json.dumps(question_data, separators=(',', ':')),
             'options': options,
             'correct_answer': str(correct_index),
             'correct_index': correct_index,
             'worked_solution': f"The {shape} rotates {rotation_step}° clockwise each step. After 4 steps, it has rotated {correct_rotation}°."
         }
     
-    def _get_shape_with_size(self, shape: str, size: int, color: str) -> str:
-        """Helper to create a shape with the appropriate size parameter."""
-        if shape == 'circle':
-            return self.svg.circle(r=size, fill=color)
-        elif shape == 'square':
-            return self.svg.square(size=size*2, x=(80-size*2)//2, y=(80-size*2)//2, fill=color)
-        elif shape == 'triangle':
-            return self.svg.triangle(size=size*2, fill=color)
-        elif shape == 'diamond':
-            return self.svg.diamond(size=size, fill=color)
-        else:
-            # pentagon, hexagon, star all use 'r'
-            return self.svg.get_shape(shape, r=size, fill=color)
-
     def generate_size_sequence(self, difficulty: int = 2) -> dict:
         """Generate a sequence where shapes change size."""
         shape = random.choice(['circle', 'square', 'triangle', 'hexagon'])
-        color = random.choice(SVGShapeGenerator.COLORS)
+        color = random.choice(COLORS)
 
         # Sizes: increasing or decreasing
         if random.choice([True, False]):
@@ -272,28 +157,28 @@ class NVRQuestionGenerator:
             next_size = 16
             pattern = "decreases by 6"
 
-        sequence_svgs = []
+        sequence_tiles = []
         for size in sizes:
-            svg_content = self._get_shape_with_size(shape, size, color)
-            sequence_svgs.append(self.svg.create_svg(svg_content))
+            sequence_tiles.append(tile(shape, color, size=size))
 
         # Correct answer
-        correct_svg = self.svg.create_svg(self._get_shape_with_size(shape, next_size, color))
+        correct_tile = tile(shape, color, size=next_size)
 
         # Wrong answers
         wrong_sizes = [next_size + 7, next_size - 7, sizes[-1], next_size + 3]
-        wrong_svgs = []
+        wrong_tiles = []
         for ws in wrong_sizes:
             if ws > 5 and ws < 45:
-                wrong_svgs.append(self.svg.create_svg(self._get_shape_with_size(shape, ws, color)))
+                wrong_tiles.append(tile(shape, color, size=ws))
         
-        options = wrong_svgs[:4] + [correct_svg]
+        options = wrong_tiles[:4] + [correct_tile]
         random.shuffle(options)
-        correct_index = options.index(correct_svg)
+        correct_index = options.index(correct_tile)
         
         question_data = {
             'type': 'nvr_sequence',
-            'sequence': sequence_svgs,
+            'scene_version': SCENE_VERSION,
+            'sequence': sequence_tiles,
             'instruction': 'What comes next in the sequence?'
         }
         
@@ -302,7 +187,7 @@ class NVRQuestionGenerator:
             'subject': 'non_verbal_reasoning',
             'question_type': 'nvr_sequences',
             'difficulty': difficulty,
-            'question_text': json.dumps(question_data),
+            'question_text': json.dumps(question_data, separators=(',', ':')),
             'options': options,
             'correct_answer': str(correct_index),
             'correct_index': correct_index,
@@ -311,32 +196,32 @@ class NVRQuestionGenerator:
     
     def generate_shape_change_sequence(self, difficulty: int = 2) -> dict:
         """Generate a sequence where shapes change (triangle -> square -> pentagon -> hexagon)."""
-        color = random.choice(SVGShapeGenerator.COLORS)
+        color = random.choice(COLORS)
         
         # Shapes that progress by adding sides
         shape_progression = ['triangle', 'square', 'pentagon', 'hexagon']
         
-        sequence_svgs = []
+        sequence_tiles = []
         for shape in shape_progression:
-            svg_content = self.svg.get_shape(shape, fill=color)
-            sequence_svgs.append(self.svg.create_svg(svg_content))
+            sequence_tiles.append(tile(shape, color))
         
         # Next shape would have 7 sides, but we'll use star as "7-pointed"
         # Actually let's cycle back or use a different pattern
         correct_shape = 'star'  # 7 points ~ 7 sides conceptually
-        correct_svg = self.svg.create_svg(self.svg.get_shape(correct_shape, fill=color))
+        correct_tile = tile(correct_shape, color)
         
         # Wrong answers
         wrong_shapes = ['circle', 'triangle', 'square', 'diamond']
-        wrong_svgs = [self.svg.create_svg(self.svg.get_shape(s, fill=color)) for s in wrong_shapes]
+        wrong_tiles = [tile(s, color) for s in wrong_shapes]
         
-        options = wrong_svgs[:4] + [correct_svg]
+        options = wrong_tiles[:4] + [correct_tile]
         random.shuffle(options)
-        correct_index = options.index(correct_svg)
+        correct_index = options.index(correct_tile)
         
         question_data = {
             'type': 'nvr_sequence',
-            'sequence': sequence_svgs,
+            'scene_version': SCENE_VERSION,
+            'sequence': sequence_tiles,
             'instruction': 'What comes next in the sequence?'
         }
         
@@ -345,7 +230,7 @@ class NVRQuestionGenerator:
             'subject': 'non_verbal_reasoning',
             'question_type': 'nvr_sequences',
             'difficulty': difficulty,
-            'question_text': json.dumps(question_data),
+            'question_text': json.dumps(question_data, separators=(',', ':')),
             'options': options,
             'correct_answer': str(correct_index),
             'correct_index': correct_index,
@@ -359,7 +244,7 @@ class NVRQuestionGenerator:
     def generate_odd_one_out_rotation(self, difficulty: int = 2) -> dict:
         """One shape is rotated differently from the others."""
         shape = random.choice(['triangle', 'square', 'pentagon', 'star'])
-        color = random.choice(SVGShapeGenerator.COLORS)
+        color = random.choice(COLORS)
         
         base_rotation = random.choice([0, 45, 90])
         odd_rotation = base_rotation + random.choice([15, 30, 60, 120])
@@ -367,17 +252,18 @@ class NVRQuestionGenerator:
         # Create 4 similar shapes and 1 odd one
         shapes = []
         for i in range(4):
-            svg = self.svg.create_svg(self.svg.get_shape(shape, fill=color, rotation=base_rotation))
-            shapes.append(svg)
+            shape_tile = tile(shape, color, rotation=base_rotation)
+            shapes.append(shape_tile)
         
-        odd_svg = self.svg.create_svg(self.svg.get_shape(shape, fill=color, rotation=odd_rotation))
+        odd_tile = tile(shape, color, rotation=odd_rotation)
         
         # Insert odd one at random position
         correct_index = random.randint(0, 4)
-        shapes.insert(correct_index, odd_svg)
+        shapes.insert(correct_index, odd_tile)
         
         question_data = {
             'type': 'nvr_odd_one_out',
+            'scene_version': SCENE_VERSION,
             'shapes': shapes,
             'instruction': 'Which shape is the odd one out?'
         }
@@ -387,7 +273,7 @@ class NVRQuestionGenerator:
             'subject': 'non_verbal_reasoning',
             'question_type': 'nvr_odd_one_out',
             'difficulty': difficulty,
-            'question_text': json.dumps(question_data),
+            'question_text': json.dumps(question_data, separators=(',', ':')),
             'options': ['A', 'B', 'C', 'D', 'E'],
             'correct_answer': chr(65 + correct_index),
             'correct_index': correct_index,
@@ -398,20 +284,21 @@ class NVRQuestionGenerator:
         """One shape is different from the others."""
         main_shape = random.choice(['circle', 'square', 'triangle', 'pentagon'])
         odd_shape = random.choice([s for s in ['circle', 'square', 'triangle', 'pentagon', 'hexagon', 'star'] if s != main_shape])
-        color = random.choice(SVGShapeGenerator.COLORS)
+        color = random.choice(COLORS)
         
         shapes = []
         for i in range(4):
-            svg = self.svg.create_svg(self.svg.get_shape(main_shape, fill=color))
-            shapes.append(svg)
+            shape_tile = tile(main_shape, color)
+            shapes.append(shape_tile)
         
-        odd_svg = self.svg.create_svg(self.svg.get_shape(odd_shape, fill=color))
+        odd_tile = tile(odd_shape, color)
         
         correct_index = random.randint(0, 4)
-        shapes.insert(correct_index, odd_svg)
+        shapes.insert(correct_index, odd_tile)
         
         question_data = {
             'type': 'nvr_odd_one_out',
+            'scene_version': SCENE_VERSION,
             'shapes': shapes,
             'instruction': 'Which shape is the odd one out?'
         }
@@ -421,7 +308,7 @@ class NVRQuestionGenerator:
             'subject': 'non_verbal_reasoning',
             'question_type': 'nvr_odd_one_out',
             'difficulty': difficulty,
-            'question_text': json.dumps(question_data),
+            'question_text': json.dumps(question_data, separators=(',', ':')),
             'options': ['A', 'B', 'C', 'D', 'E'],
             'correct_answer': chr(65 + correct_index),
             'correct_index': correct_index,
@@ -437,33 +324,34 @@ class NVRQuestionGenerator:
         # Simple transformation: change color, size, or add inner shape
         shape1 = random.choice(['circle', 'square', 'triangle'])
         shape2 = random.choice(['pentagon', 'hexagon', 'star'])
-        color1 = random.choice(SVGShapeGenerator.COLORS[:3])
-        color2 = random.choice(SVGShapeGenerator.COLORS[3:])
+        color1 = random.choice(COLORS[:3])
+        color2 = random.choice(COLORS[3:])
         
         # A: shape1 with color1, B: shape1 with color2 (color change)
         # C: shape2 with color1, D: shape2 with color2
         
-        svg_a = self.svg.create_svg(self.svg.get_shape(shape1, fill=color1))
-        svg_b = self.svg.create_svg(self.svg.get_shape(shape1, fill=color2))
-        svg_c = self.svg.create_svg(self.svg.get_shape(shape2, fill=color1))
-        correct_svg = self.svg.create_svg(self.svg.get_shape(shape2, fill=color2))
+        tile_a = tile(shape1, color1)
+        tile_b = tile(shape1, color2)
+        tile_c = tile(shape2, color1)
+        correct_tile = tile(shape2, color2)
         
         # Wrong answers
-        wrong_svgs = [
-            self.svg.create_svg(self.svg.get_shape(shape2, fill=color1)),  # No color change
-            self.svg.create_svg(self.svg.get_shape(shape1, fill=color2)),  # Wrong shape
-            self.svg.create_svg(self.svg.get_shape('diamond', fill=color2)),  # Random
-            self.svg.create_svg(self.svg.get_shape(shape2, fill='#9CA3AF')),  # Wrong color
+        wrong_tiles = [
+            tile(shape2, color1),  # No color change
+            tile(shape1, color2),  # Wrong shape
+            tile('diamond', color2),  # Random
+            tile(shape2, '#9CA3AF'),  # Wrong color
         ]
         
-        options = wrong_svgs[:4] + [correct_svg]
+        options = wrong_tiles[:4] + [correct_tile]
         random.shuffle(options)
-        correct_index = options.index(correct_svg)
+        correct_index = options.index(correct_tile)
         
         question_data = {
             'type': 'nvr_analogy',
-            'pair1': [svg_a, svg_b],
-            'pair2_first': svg_c,
+            'scene_version': SCENE_VERSION,
+            'pair1': [tile_a, tile_b],
+            'pair2_first': tile_c,
             'instruction': 'A is to B as C is to ?'
         }
         
@@ -472,7 +360,7 @@ class NVRQuestionGenerator:
             'subject': 'non_verbal_reasoning',
             'question_type': 'nvr_analogies',
             'difficulty': difficulty,
-            'question_text': json.dumps(question_data),
+            'question_text': json.dumps(question_data, separators=(',', ':')),
             'options': options,
             'correct_answer': str(correct_index),
             'correct_index': correct_index,
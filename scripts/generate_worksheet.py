@@ -8,279 +8,125 @@ Usage:
     python scripts/generate_worksheet.py --subject mathematics --count 20
     python scripts/generate_worksheet.py --type synonyms --count 15
     python scripts/generate_worksheet.py --mixed --count 25
+
+    # One personalised worksheet per student (weighted to their weak topics)
+    python scripts/generate_worksheet.py --batch --output-dir worksheets --workers 8
+
+    # 30 non-overlapping variants + answer key + marking grid in one zip
+    python scripts/generate_worksheet.py --class-bundle 30 --type synonyms --output class.zip
+    python scripts/generate_worksheet.py --class-bundle --roster class_5b.txt --output 5b.zip
 """
 
+import sys
 import sqlite3
-import json
 import argparse
-import random
-from datetime import datetime
+import time
 from pathlib import Path
 
-def get_questions(db_path: str, subject: str = None, question_type: str = None,
-                  count: int = 20, exclude_nvr: bool = True) -> list:
-    """Fetch questions from database"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-
-    query = "SELECT * FROM questions WHERE 1=1"
-    params = []
-
-    if subject:
-        query += " AND subject = ?"
-        params.append(subject)
-
-    if question_type:
-        query += " AND question_type = ?"
-        params.append(question_type)
-
-    # Exclude NVR by default (SVG doesn't print well without special handling)
-    if exclude_nvr:
-        query += " AND subject != 'non_verbal_reasoning'"
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-    # Also exclude comprehension (passages too long for worksheets)
-    query += " AND question_type != 'comprehension'"
+from src.tools.worksheets import (
+    QuestionPool, WorksheetJob, render_worksheet, write_worksheet,
+    weak_topics_by_student, worksheet_title, run_batch, write_class_bundle,
+)
 
-    query += " ORDER BY RANDOM() LIMIT ?"
-    params.append(count)
 
-    cur.execute(query, params)
-    questions = [dict(row) for row in cur.fetchall()]
-    conn.close()
+def get_questions(db_path: str, subject: str = None, question_type: str = None,
+                  count: int = 20, pool: QuestionPool = None) -> list:
+    """Sample questions from the in-memory question pool"""
+    pool = pool or QuestionPool.from_sqlite(db_path)
+    return pool.sample(count, subject=subject, question_type=question_type)
 
-    return questions
 
 def generate_html_worksheet(questions: list, title: str = "11+ Practice Worksheet") -> str:
     """Generate printable HTML worksheet"""
+    return "".join(render_worksheet(questions, title))
 
-    date_str = datetime.now().strftime("%d %B %Y")
-
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>{title}</title>
-    <style>
-        @media print {{
-            body {{ margin: 0; }}
-            .no-print {{ display: none; }}
-            .page-break {{ page-break-after: always; }}
-        }}
-
-        body {{
-            font-family: Arial, sans-serif;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            line-height: 1.4;
-        }}
-
-        .header {{
-            text-align: center;
-            margin-bottom: 30px;
-            border-bottom: 2px solid #333;
-            padding-bottom: 15px;
-        }}
-
-        .header h1 {{
-            margin: 0;
-            font-size: 24px;
-        }}
-
-        .header p {{
-            margin: 5px 0;
-            color: #666;
-        }}
-
-        .student-info {{
-            display: flex;
-            gap: 20px;
-            margin-bottom: 20px;
-        }}
-
-        .student-info label {{
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-
-        .student-info input {{
-            border: none;
-            border-bottom: 1px solid #333;
-            width: 150px;
-            padding: 5px;
-        }}
-
-        .question {{
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #eee;
-        }}
-
-        .question-number {{
-            font-weight: bold;
-            color: #333;
-        }}
-
-        .question-text {{
-            margin: 10px 0;
-            font-size: 14px;
-        }}
-
-        .options {{
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 8px;
-            margin-top: 10px;
-        }}
-
-        .option {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-
-        .option-circle {{
-            width: 18px;
-            height: 18px;
-            border: 2px solid #333;
-            border-radius: 50%;
-            flex-shrink: 0;
-        }}
-
-        .answer-section {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 2px solid #333;
-        }}
-
-        .answer-section h2 {{
-            font-size: 16px;
-            margin-bottom: 15px;
-        }}
-
-        .answers {{
-            display: grid;
-            grid-template-columns: repeat(5, 1fr);
-            gap: 10px;
-            font-size: 12px;
-        }}
-
-        .answer-item {{
-            padding: 5px;
-            background: #f5f5f5;
-            border-radius: 4px;
-        }}
-
-        .instructions {{
-            background: #f9f9f9;
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            font-size: 13px;
-        }}
-
-        .score-box {{
-            float: right;
-            border: 2px solid #333;
-            padding: 15px;
-            text-align: center;
-            min-width: 80px;
-        }}
-
-        .score-box .score {{
-            font-size: 24px;
-            font-weight: bold;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>{title}</h1>
-        <p>Date: {date_str} | Questions: {len(questions)}</p>
-    </div>
-
-    <div class="student-info no-print">
-        <label>Name: <input type="text" placeholder=""></label>
-        <label>Time: <input type="text" placeholder="__ minutes"></label>
-        <div class="score-box">
-            <div class="score">__/{len(questions)}</div>
-            <div>Score</div>
-        </div>
-    </div>
-
-    <div class="instructions">
-        <strong>Instructions:</strong> Read each question carefully. Fill in the circle next to your chosen answer.
-        Work through all questions before checking your answers. Time yourself if practicing for the exam.
-    </div>
-
-    <div class="questions">
-"""
 
-    for i, q in enumerate(questions, 1):
-        options = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
-
-        # Clean up question text (remove JSON for special types)
-        question_text = q['question_text']
-        if question_text.startswith('{'):
-            try:
-                parsed = json.loads(question_text)
-                question_text = parsed.get('question', parsed.get('instruction', question_text))
-            except:
-                pass
-
-        html += f"""
-        <div class="question">
-            <span class="question-number">Q{i}.</span>
-            <span class="question-type" style="color: #888; font-size: 11px;">({q['question_type'].replace('_', ' ').title()})</span>
-            <div class="question-text">{question_text}</div>
-            <div class="options">
-"""
+def get_students(db_path: str, student_ids: list = None) -> list:
+    """Fetch (id, name) for students to include in a batch"""
+    conn = sqlite3.connect(db_path)
+    query = "SELECT id, name FROM students"
+    params = []
+    if student_ids:
+        query += f" WHERE id IN ({', '.join('?' for _ in student_ids)})"
+        params = student_ids
+    rows = conn.execute(query + " ORDER BY name", params).fetchall()
+    conn.close()
+    return rows
 
-        for j, opt in enumerate(options):
-            letter = chr(65 + j)
-            # Truncate long options (like SVG)
-            display_opt = opt[:100] + "..." if len(str(opt)) > 100 else opt
-            html += f"""
-                <div class="option">
-                    <div class="option-circle"></div>
-                    <span><strong>{letter}.</strong> {display_opt}</span>
-                </div>
-"""
 
-        html += """
-            </div>
-        </div>
-"""
+def generate_batch(args):
+    """Write one personalised worksheet per student in parallel"""
+    start = time.perf_counter()
+    pool = QuestionPool.from_sqlite(args.db)
+    student_ids = args.students.split(',') if args.students else None
+    students = get_students(args.db, student_ids)
+    if not students:
+        print("No students found")
+        return
 
-    # Answer key (for parents)
-    html += """
-    <div class="page-break"></div>
-    <div class="answer-section">
-        <h2>Answer Key (for parents - tear off before giving to child)</h2>
-        <div class="answers">
-"""
+    weak = weak_topics_by_student(args.db, student_ids)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = [
+        WorksheetJob(
+            output_path=str(output_dir / f"worksheet_{student_id}.html"),
+            title=f"11+ Practice for {name or student_id}",
+            count=args.count,
+            student_name=name or "",
+            weak_types=weak.get(student_id, []),
+            subject=args.subject,
+            question_type=args.type,
+        )
+        for student_id, name in students
+    ]
+    counts = run_batch(jobs, pool, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    personalised = sum(1 for job in jobs if job.weak_types)
+    print(f"Generated {len(jobs)} worksheets in {output_dir}/ ({elapsed:.2f}s)")
+    print(f"  - {personalised} personalised from weak topics, {len(jobs) - personalised} mixed")
+    print(f"  - {sum(counts)} questions total, pool of {len(pool)}")
+
+
+def generate_class_bundle(args):
+    """Write variant worksheets, answer key and marking grid for a class into one zip"""
+    if args.roster:
+        names = [line.strip() for line in Path(args.roster).read_text().splitlines() if line.strip()]
+    else:
+        names = [f"Student {i}" for i in range(1, (args.class_bundle or 30) + 1)]
 
-    for i, q in enumerate(questions, 1):
-        options = json.loads(q['options']) if isinstance(q['options'], str) else q['options']
-        correct_idx = q['correct_index'] if q['correct_index'] is not None else 0
-        correct_letter = chr(65 + correct_idx)
+    output_path = Path(args.output)
+    if output_path.suffix != '.zip':
+        output_path = output_path.with_suffix('.zip')
 
-        html += f"""
-            <div class="answer-item">
-                <strong>Q{i}:</strong> {correct_letter}
-            </div>
-"""
+    load_start = time.perf_counter()
+    pool = QuestionPool.from_sqlite(args.db)
+    load_seconds = time.perf_counter() - load_start
 
-    html += """
-        </div>
-    </div>
-</body>
-</html>
-"""
+    stats = write_class_bundle(
+        output_path, names, pool,
+        count=args.count,
+        subject=args.subject if not args.mixed else None,
+        question_type=args.type,
+        seed=args.seed,
+    )
+
+    print(f"Class bundle generated: {output_path}")
+    print(f"  - {stats.variants} variants x {args.count} questions, answer key, marking grid")
+    if stats.overlapping:
+        print(f"  - Only {stats.unique_questions} matching questions: some are shared between variants")
+    else:
+        print(f"  - {stats.unique_questions} distinct questions, no overlap between variants")
+    print(f"  - Load pool:   {load_seconds * 1000:7.1f} ms ({len(pool)} questions)")
+    print(f"  - Assign sets: {stats.sample_seconds * 1000:7.1f} ms")
+    print(f"  - Render+zip:  {stats.write_seconds * 1000:7.1f} ms "
+          f"({stats.bytes_written / 1024:.0f} KB HTML -> {output_path.stat().st_size / 1024:.0f} KB zip)")
+    print(f"  - Total:       {(load_seconds + stats.total_seconds) * 1000:7.1f} ms")
 
-    return html
 
 def main():
     parser = argparse.ArgumentParser(description='Generate printable 11+ worksheets')
@@ -290,8 +136,23 @@ def main():
     parser.add_argument('--mixed', action='store_true', help='Mix all question types')
     parser.add_argument('--output', default='worksheet.html', help='Output filename')
     parser.add_argument('--db', default='elevenplustutor.db', help='Database path')
+    parser.add_argument('--batch', action='store_true', help='One worksheet per student')
+    parser.add_argument('--students', help='Comma-separated student IDs for --batch (default: all)')
+    parser.add_argument('--output-dir', default='worksheets', help='Output directory for --batch')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for --batch')
+    parser.add_argument('--class-bundle', type=int, nargs='?', const=30, metavar='N',
+                        help='Zip of N variant worksheets plus answer key and marking grid')
+    parser.add_argument('--roster', help='Text file of student names, one per line (for --class-bundle)')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible bundles')
     args = parser.parse_args()
 
+    if args.batch:
+        generate_batch(args)
+        return
+    if args.class_bundle or args.roster:
+        generate_class_bundle(args)
+        return
+
     # Get questions
     questions = get_questions(
         args.db,
@@ -305,19 +166,12 @@ def main():
         return
 
     # Generate title
-    if args.type:
-        title = f"11+ Practice: {args.type.replace('_', ' ').title()}"
-    elif args.subject:
-        title = f"11+ Practice: {args.subject.replace('_', ' ').title()}"
-    else:
-        title = "11+ Mixed Practice Worksheet"
-
-    # Generate HTML
-    html = generate_html_worksheet(questions, title)
+    title = worksheet_title(args.subject if not args.mixed else None, args.type)
 
-    # Save
+    # Stream HTML to disk
     output_path = Path(args.output)
-    output_path.write_text(html)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        write_worksheet(f, questions, title=title)
 
     print(f"Worksheet generated: {output_path}")
     print(f"  - {len(questions)} questions")
@@ -12,11 +12,38 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.database import get_db, init_db, Question
+from src.question_bank import nvr
 from sqlalchemy.orm import Session
 
 DATA_DIR = Path(__file__).parent.parent / "data" / "questions"
 
 
+def question_fields(q: dict) -> dict:
+    """Questions-table columns for one question from a JSON file (also used by build_question_pack)"""
+    question_text = q.get("question_text", q.get("question", ""))
+    options = q.get("options", [])
+    if q.get("subject") == "non_verbal_reasoning":
+        # Store NVR tiles as compact scenes rather than inline SVG
+        question_text, options = nvr.compact_question(question_text, options)
+
+    return dict(
+        id=q.get("id"),
+        exam_type=q.get("exam_type", "11plus_gl"),
+        subject=q.get("subject", "unknown"),
+        topic=q.get("topic", "general"),
+        question_type=q.get("question_type", "unknown"),
+        difficulty=q.get("difficulty", 3),
+        question_text=question_text,
+        options=options,
+        correct_answer=q.get("correct_answer", ""),
+        correct_index=q.get("correct_index"),
+        worked_solution=q.get("worked_solution", q.get("explanation", "")),
+        marks_available=q.get("marks_available", 1),
+        hint=q.get("hint"),
+        tags=q.get("tags"),    # question_tags is filled from this by trigger
+    )
+
+
 def import_from_file(filepath: Path, db: Session) -> int:
     """Import questions from a single JSON file."""
     imported = 0
@@ -33,21 +60,7 @@ def import_from_file(filepath: Path, db: Session) -> int:
             if existing:
                 continue
 
-            question = Question(
-                id=q.get("id"),
-                exam_type=q.get("exam_type", "11plus_gl"),
-                subject=q.get("subject", "unknown"),
-                topic=q.get("topic", "general"),
-                question_type=q.get("question_type", "unknown"),
-                difficulty=q.get("difficulty", 3),
-                question_text=q.get("question_text", q.get("question", "")),
-                options=q.get("options", []),
-                correct_answer=q.get("correct_answer", ""),
-                correct_index=q.get("correct_index"),
-                worked_solution=q.get("worked_solution", q.get("explanation", "")),
-                marks_available=q.get("marks_available", 1),
-                hint=q.get("hint"),
-            )
+            question = Question(**question_fields(q))
             db.add(question)
             imported += 1
 
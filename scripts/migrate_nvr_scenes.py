@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Convert NVR questions stored as inline SVG into compact scene descriptions.
+
+The API renders scenes back to SVG on demand (src.question_bank.nvr), so the
+frontend sees no difference. Tiles that don't match the generator's output
+are left untouched.
+
+Usage:
+    python scripts/migrate_nvr_scenes.py --dry-run
+    python scripts/migrate_nvr_scenes.py --db elevenplustutor.db --vacuum
+"""
+
+import sys
+import sqlite3
+import json
+import argparse
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.question_bank import nvr
+
+
+def migrate(db_path: str, dry_run: bool = False, vacuum: bool = False) -> dict:
+    """Rewrite NVR rows in place and return before/after byte counts."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+
+    cur.execute("""
+        SELECT id, question_text, options FROM questions
+        WHERE subject = 'non_verbal_reasoning'
+    """)
+    rows = cur.fetchall()
+
+    stats = {"questions": len(rows), "converted": 0, "bytes_before": 0, "bytes_after": 0}
+    updates = []
+    for row in rows:
+        options = json.loads(row['options']) if row['options'] else []
+        question_text, compact_options = nvr.compact_question(row['question_text'], options)
+
+        stats["bytes_before"] += nvr.storage_size(row['question_text'], options)
+        stats["bytes_after"] += nvr.storage_size(question_text, compact_options)
+
+        if question_text != row['question_text'] or compact_options != options:
+            stats["converted"] += 1
+            updates.append((question_text, json.dumps(compact_options), row['id']))
+
+    if not dry_run and updates:
+        cur.executemany("UPDATE questions SET question_text = ?, options = ? WHERE id = ?", updates)
+        conn.commit()
+        if vacuum:
+            conn.execute("VACUUM")
+
+    conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Store NVR questions as compact scenes')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--dry-run', action='store_true', help='Report savings without writing')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards to reclaim file space')
+    args = parser.parse_args()
+
+    stats = migrate(args.db, dry_run=args.dry_run, vacuum=args.vacuum)
+
+    before, after = stats["bytes_before"], stats["bytes_after"]
+    saved = (1 - after / before) * 100 if before else 0
+    print(f"NVR questions: {stats['questions']} ({stats['converted']} converted)")
+    print(f"  Content size: {before:,} -> {after:,} bytes ({saved:.0f}% smaller)")
+    if args.dry_run:
+        print("  Dry run - nothing written")
+
+
+if __name__ == '__main__':
+    main()
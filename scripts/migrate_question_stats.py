@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Move per-question answer counts from the questions table to question_stats.
+
+Older databases kept times_attempted / times_correct on the question row,
+which every submission rewrote. The counts are added into question_stats
+and the old columns are dropped. Answer times were never on the question
+row, so they are rebuilt from the attempts table. That table already holds
+any answers an app version without the startup check counted in
+question_stats, so the rebuilt times replace what is there instead of
+adding to it.
+
+Usage:
+    python scripts/migrate_question_stats.py --dry-run
+    python scripts/migrate_question_stats.py --db elevenplustutor.db --vacuum
+"""
+
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.database import QuestionStats
+
+OLD_COLUMNS = ("times_attempted", "times_correct")
+
+
+def migrate(db_path: str, dry_run: bool = False, vacuum: bool = False) -> dict:
+    """Copy the old counters into question_stats, then drop them from questions"""
+    engine = create_engine(f"sqlite:///{Path(db_path).resolve()}")
+    QuestionStats.__table__.create(bind=engine, checkfirst=True)
+    engine.dispose()
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+    stats = {"questions": 0, "attempts": 0, "dropped": [c for c in OLD_COLUMNS if c in columns]}
+    if not stats["dropped"]:
+        conn.close()
+        return stats
+
+    stats["questions"], stats["attempts"] = conn.execute(
+        "SELECT count(*), COALESCE(sum(times_attempted), 0) FROM questions WHERE times_attempted > 0"
+    ).fetchone()
+    if dry_run:
+        conn.close()
+        return stats
+
+    # Answer times aren't on the old row; take them from the recorded attempts
+    conn.execute("""
+        INSERT INTO question_stats (
+            question_id, times_attempted, times_correct, timed_attempts, total_time_seconds, updated_at
+        )
+        SELECT q.id, q.times_attempted, COALESCE(q.times_correct, 0),
+               COALESCE(t.timed, 0), COALESCE(t.total, 0), datetime('now')
+        FROM questions q
+        LEFT JOIN (
+            SELECT question_id, count(*) AS timed, sum(time_taken_seconds) AS total
+            FROM attempts WHERE time_taken_seconds > 0
+            GROUP BY question_id
+        ) t ON t.question_id = q.id
+        WHERE q.times_attempted > 0
+        ON CONFLICT(question_id) DO UPDATE SET
+            times_attempted = times_attempted + excluded.times_attempted,
+            times_correct = times_correct + excluded.times_correct,
+            timed_attempts = excluded.timed_attempts,
+            total_time_seconds = excluded.total_time_seconds
+    """)
+    for column in stats["dropped"]:
+        conn.execute(f"ALTER TABLE questions DROP COLUMN {column}")
+    conn.commit()
+    if vacuum:
+        conn.execute("VACUUM")
+    conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move question statistics into question_stats')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would move without writing')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards to reclaim file space')
+    args = parser.parse_args()
+
+    stats = migrate(args.db, dry_run=args.dry_run, vacuum=args.vacuum)
+    if not stats["dropped"]:
+        print("Already migrated - questions has no statistics columns")
+        return
+
+    print(f"Questions with attempts: {stats['questions']:,} ({stats['attempts']:,} attempts)")
+    print(f"  Columns {'to drop' if args.dry_run else 'dropped'}: {', '.join(stats['dropped'])}")
+    if args.dry_run:
+        print("  Dry run - nothing written")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Switch questions, students and attempts to INTEGER primary keys.
+
+Questions and students get an integer `pk` (their existing rowid, so the
+full-text index stays valid) and keep their UUID in `id` as a unique public
+identifier; the API translates between the two, so external ids don't
+change. Attempts get an integer id and reference students/questions by
+`student_pk` / `question_pk` instead of two 36-character strings. Attempt
+UUIDs were never exposed and are dropped.
+
+Students that only appear in attempts get a bare student row. Attempts for
+questions that no longer exist can't be keyed and are dropped (and counted).
+
+Run scripts/migrate_question_stats.py first on databases that still have
+statistics columns on questions.
+
+Usage:
+    python scripts/migrate_surrogate_keys.py --dry-run --benchmark
+    python scripts/migrate_surrogate_keys.py --db elevenplustutor.db --benchmark --vacuum
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy.dialects import sqlite as sqlite_dialect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.database import Attempt, Question, Student, QUESTION_SEARCH_TABLE, create_question_search
+
+MIGRATED_TABLES = (Question.__table__, Student.__table__, Attempt.__table__)
+BENCHMARK_STUDENTS = 200
+
+# Progress queries, per key layout (the same shape the API runs)
+PROGRESS_QUERIES = {
+    "uuid": """
+        SELECT q.subject, count(*), sum(CASE WHEN a.is_correct THEN 1 ELSE 0 END)
+        FROM attempts a JOIN questions q ON q.id = a.question_id
+        WHERE a.student_id = ?
+        GROUP BY q.subject
+    """,
+    "integer": """
+        SELECT q.subject, count(*), sum(CASE WHEN a.is_correct THEN 1 ELSE 0 END)
+        FROM attempts a JOIN questions q ON q.pk = a.question_pk
+        WHERE a.student_pk = (SELECT pk FROM students WHERE id = ?)
+        GROUP BY q.subject
+    """,
+}
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def key_layout(conn: sqlite3.Connection) -> str:
+    return "integer" if "pk" in _columns(conn, "questions") else "uuid"
+
+
+def _create_sql(table, name: str) -> str:
+    """CREATE TABLE for an ORM table under another name (indexes are created after the swap)"""
+    sql = str(CreateTable(table).compile(dialect=sqlite_dialect.dialect())).strip()
+    return sql.replace(f"CREATE TABLE {table.name} (", f"CREATE TABLE {name} (", 1)
+
+
+def measure(db_path: str, students: int = BENCHMARK_STUDENTS, seed: int = 11) -> Dict:
+    """File/table sizes and progress-query latency for the current layout"""
+    conn = sqlite3.connect(db_path)
+    layout = key_layout(conn)
+    sizes = dict(conn.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name").fetchall())
+    indexes = {
+        row[0]: row[1] for row in conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")
+    }
+
+    def table_bytes(table: str) -> int:
+        return sizes.get(table, 0) + sum(size for name, size in sizes.items() if indexes.get(name) == table)
+
+    ids = [row[0] for row in conn.execute("SELECT id FROM students")]
+    sample = random.Random(seed).sample(ids, min(students, len(ids)))
+    query = PROGRESS_QUERIES[layout]
+    timings = []
+    for student_id in sample:
+        start = time.perf_counter()
+        conn.execute(query, (student_id,)).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    page_size, page_count, free_pages = (
+        conn.execute(f"PRAGMA {name}").fetchone()[0] for name in ("page_size", "page_count", "freelist_count")
+    )
+    conn.close()
+
+    timings.sort()
+    return {
+        "layout": layout,
+        "file_bytes": os.path.getsize(db_path),
+        "used_bytes": (page_count - free_pages) * page_size,
+        "attempts_bytes": table_bytes("attempts"),
+        "questions_bytes": table_bytes("questions"),
+        "students_bytes": table_bytes("students"),
+        "progress_p50_ms": timings[len(timings) // 2] if timings else 0.0,
+        "progress_p95_ms": timings[int(len(timings) * 0.95)] if timings else 0.0,
+    }
+
+
+def migrate(db_path: str, dry_run: bool = False, vacuum: bool = False) -> Dict:
+    """Rebuild the three tables with integer keys in one transaction"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    stats = {"questions": 0, "students": 0, "created_students": 0, "attempts": 0, "dropped_attempts": 0}
+    if key_layout(conn) == "integer":
+        conn.close()
+        stats["already_migrated"] = True
+        return stats
+    if "times_attempted" in _columns(conn, "questions"):
+        conn.close()
+        raise SystemExit("Run scripts/migrate_question_stats.py first")
+
+    stats["questions"] = conn.execute("SELECT count(*) FROM questions").fetchone()[0]
+    stats["students"] = conn.execute("SELECT count(*) FROM students").fetchone()[0]
+    stats["created_students"] = conn.execute("""
+        SELECT count(DISTINCT student_id) FROM attempts
+        WHERE student_id NOT IN (SELECT id FROM students)
+    """).fetchone()[0]
+    stats["attempts"] = conn.execute("SELECT count(*) FROM attempts").fetchone()[0]
+    stats["dropped_attempts"] = conn.execute("""
+        SELECT count(*) FROM attempts WHERE question_id NOT IN (SELECT id FROM questions)
+    """).fetchone()[0]
+    if dry_run:
+        conn.close()
+        return stats
+
+    question_columns = [c for c in _columns(conn, "questions") if c in Question.__table__.c and c != "pk"]
+    student_columns = [c for c in _columns(conn, "students") if c in Student.__table__.c and c != "pk"]
+    attempt_columns = [
+        c for c in _columns(conn, "attempts")
+        if c in Attempt.__table__.c and c not in ("id", "student_id", "question_id")
+    ]
+
+    conn.execute("BEGIN")
+    # The search triggers name the questions table; create_question_search restores them
+    for (trigger,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'questions'"
+    ).fetchall():
+        conn.execute(f"DROP TRIGGER {trigger}")
+
+    for table in MIGRATED_TABLES:
+        conn.execute(_create_sql(table, f"{table.name}_new"))
+
+    # Keep the rowids: questions_fts is keyed by them
+    columns = ", ".join(question_columns)
+    conn.execute(f"INSERT INTO questions_new (pk, {columns}) SELECT rowid, {columns} FROM questions ORDER BY rowid")
+    columns = ", ".join(student_columns)
+    conn.execute(f"INSERT INTO students_new (pk, {columns}) SELECT rowid, {columns} FROM students ORDER BY rowid")
+    conn.execute("""
+        INSERT INTO students_new (id, created_at, last_active)
+        SELECT student_id, min(timestamp), max(timestamp) FROM attempts
+        WHERE student_id NOT IN (SELECT id FROM students)
+        GROUP BY student_id
+    """)
+    columns = ", ".join(attempt_columns)
+    selected = ", ".join(f"a.{c}" for c in attempt_columns)
+    conn.execute(f"""
+        INSERT INTO attempts_new (student_pk, question_pk, {columns})
+        SELECT s.pk, q.pk, {selected}
+        FROM attempts a
+        JOIN students_new s ON s.id = a.student_id
+        JOIN questions_new q ON q.id = a.question_id
+        ORDER BY a.rowid
+    """)
+
+    for table in reversed(MIGRATED_TABLES):
+        conn.execute(f"DROP TABLE {table.name}")
+    for table in MIGRATED_TABLES:
+        conn.execute(f"ALTER TABLE {table.name}_new RENAME TO {table.name}")
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index).compile(dialect=sqlite_dialect.dialect())))
+    conn.execute("COMMIT")
+
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (QUESTION_SEARCH_TABLE,)
+    ).fetchone():
+        from sqlalchemy import create_engine
+
+        engine = create_engine(f"sqlite:///{Path(db_path).resolve()}")
+        create_question_search(engine)
+        engine.dispose()
+    # Make the app's next init_db re-apply the schema (restores any other triggers on questions)
+    conn.execute("PRAGMA user_version = 0")
+    conn.execute("ANALYZE")
+    if vacuum:
+        conn.execute("VACUUM")
+    conn.close()
+    return stats
+
+
+def _print_comparison(before: Dict, after: Dict):
+    def mb(n: int) -> str:
+        return f"{n / 1e6:.1f} MB"
+
+    print(f"\n{'':24}{'before':>14}{'after':>14}")
+    for key, label, fmt in [
+        ("file_bytes", "File size", mb),
+        ("used_bytes", "Used pages", mb),
+        ("attempts_bytes", "attempts + indexes", mb),
+        ("questions_bytes", "questions + indexes", mb),
+        ("students_bytes", "students + indexes", mb),
+        ("progress_p50_ms", "Progress query p50", lambda v: f"{v:.2f} ms"),
+        ("progress_p95_ms", "Progress query p95", lambda v: f"{v:.2f} ms"),
+    ]:
+        print(f"{label:24}{fmt(before[key]):>14}{fmt(after[key]):>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate questions/students/attempts to integer keys')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards to reclaim file space')
+    parser.add_argument('--benchmark', action='store_true', help='Measure sizes and progress queries before/after')
+    args = parser.parse_args()
+
+    before = measure(args.db) if args.benchmark else None
+    stats = migrate(args.db, dry_run=args.dry_run, vacuum=args.vacuum)
+    if stats.get("already_migrated"):
+        print("Already migrated - questions has an integer pk")
+    else:
+        print(f"Questions: {stats['questions']:,}  Students: {stats['students']:,} "
+              f"(+{stats['created_students']:,} from attempts)")
+        print(f"Attempts: {stats['attempts']:,} ({stats['dropped_attempts']:,} for missing questions dropped)")
+        if args.dry_run:
+            print("  Dry run - nothing written")
+    if before and not args.dry_run and not stats.get("already_migrated"):
+        _print_comparison(before, measure(args.db))
+    elif before:
+        print(f"\nProgress query p50 {before['progress_p50_ms']:.2f} ms, "
+              f"file {before['file_bytes'] / 1e6:.1f} MB ({before['layout']} keys)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Precompute hints and explanations for every bank question with the configured LLM.
+
+Results go to the question_hints table, versioned by (model, prompt version),
+so switching models or editing the prompts regenerates text without touching
+what earlier models produced. The table doubles as the checkpoint: re-running
+skips questions that already have a row for the current model and version,
+so an interrupted run simply resumes.
+
+Usage:
+    python scripts/precompute_hints.py --concurrency 4
+    python scripts/precompute_hints.py --subject verbal_reasoning --limit 200
+    python scripts/precompute_hints.py --model llama3.1:8b --binding ollama --host http://localhost:11434
+"""
+
+import sys
+import time
+import sqlite3
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+
+from settings import settings
+from src.core.database import QuestionHint
+from src.agents.llm_client import LLMError, create_llm_client
+from src.agents.practice_agent import HINT_PROMPT_VERSION, build_hint_prompt, build_explanation_prompt
+
+# Shapes are stored as scenes the LLM can't see, so text hints would be guesses
+SKIPPED_SUBJECTS = ("non_verbal_reasoning",)
+COMMIT_EVERY = 20
+RETRIES = 2
+
+
+def pending_questions(conn: sqlite3.Connection, model: str, subject: Optional[str], limit: Optional[int]) -> List[sqlite3.Row]:
+    """Questions without output for this model/prompt version (the resume point)"""
+    query = f"""
+        SELECT q.id, q.question_type, q.question_text, q.correct_answer, q.hint
+        FROM questions q
+        LEFT JOIN question_hints h
+            ON h.question_id = q.id AND h.model = ? AND h.prompt_version = ?
+        LEFT JOIN question_stats s ON s.question_id = q.id
+        WHERE h.question_id IS NULL
+          AND q.subject NOT IN ({",".join("?" * len(SKIPPED_SUBJECTS))})
+    """
+    params: list = [model, HINT_PROMPT_VERSION, *SKIPPED_SUBJECTS]
+    if subject:
+        query += " AND q.subject = ?"
+        params.append(subject)
+    query += " ORDER BY COALESCE(s.times_attempted, 0) DESC, q.id"    # Most-used questions first
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+async def generate_with_retry(llm, prompt: str) -> str:
+    for attempt in range(RETRIES + 1):
+        try:
+            return await llm.generate(prompt, temperature=0.3)
+        except LLMError:
+            if attempt == RETRIES:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+async def run(args) -> dict:
+    db_path = Path(args.db).resolve()
+    # Make sure question_hints exists (no-op for databases created by the app)
+    engine = create_engine(f"sqlite:///{db_path}")
+    QuestionHint.__table__.create(bind=engine, checkfirst=True)
+    engine.dispose()
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    questions = pending_questions(conn, args.model, args.subject, args.limit)
+    print(f"{len(questions)} questions need hints for {args.model} (prompt v{HINT_PROMPT_VERSION})")
+    if args.dry_run or not questions:
+        conn.close()
+        return {"done": 0, "failed": 0}
+
+    overrides = {"model": args.model}
+    if args.binding:
+        overrides["binding"] = args.binding
+    if args.host:
+        overrides["host"] = args.host
+
+    stats = {"done": 0, "failed": 0}
+    pending_rows = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for row in questions:
+        queue.put_nowait(row)
+    start = time.perf_counter()
+
+    def flush():
+        conn.executemany("""
+            INSERT OR REPLACE INTO question_hints
+                (question_id, model, prompt_version, hint, explanation, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, pending_rows)
+        conn.commit()
+        pending_rows.clear()
+
+    async def worker(llm):
+        while True:
+            try:
+                row = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                # Authored hints are kept; only the explanation is generated for those
+                hint = None
+                if not row['hint']:
+                    hint = await generate_with_retry(llm, build_hint_prompt(row['question_text'], row['question_type']))
+                explanation = await generate_with_retry(
+                    llm, build_explanation_prompt(row['question_text'], row['question_type'], row['correct_answer'])
+                )
+            except LLMError as e:
+                stats["failed"] += 1
+                print(f"  ! {row['id']}: {e}")
+                continue
+
+            pending_rows.append((
+                row['id'], args.model, HINT_PROMPT_VERSION, hint, explanation,
+                datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f'),
+            ))
+            stats["done"] += 1
+            if len(pending_rows) >= COMMIT_EVERY:
+                flush()
+                rate = stats["done"] / (time.perf_counter() - start)
+                print(f"  {stats['done']}/{len(questions)} ({rate:.1f} questions/s)")
+
+    async with create_llm_client(**overrides) as llm:
+        await asyncio.gather(*(worker(llm) for _ in range(args.concurrency)))
+    if pending_rows:
+        flush()
+    conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute LLM hints and explanations for the question bank')
+    parser.add_argument('--db', default='elevenplustutor.db')
+    parser.add_argument('--model', default=settings.llm_model, help='Model name (also the version key)')
+    parser.add_argument('--binding', choices=['openai', 'ollama'], help='Override settings.llm_binding')
+    parser.add_argument('--host', help='Override settings.llm_host')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent LLM requests')
+    parser.add_argument('--subject', choices=['verbal_reasoning', 'mathematics', 'english'])
+    parser.add_argument('--limit', type=int, help='Stop after this many questions')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many questions are pending')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+    if stats["done"] or stats["failed"]:
+        print(f"\nDone: {stats['done']} stored, {stats['failed']} failed in {elapsed:.1f}s")
+        if stats["failed"]:
+            print("Re-run to retry the failures - finished questions are skipped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile for the API process.
+
+Imports src.api.main in a fresh interpreter with -X importtime, then runs the
+startup schema check, and reports where the time went: total import time,
+the slowest modules, and whether any deferred heavy module (numpy, yaml,
+httpx) was pulled in at import time. Use --budget-ms in CI to catch
+regressions.
+
+Usage:
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --db /tmp/copy.db --top 25
+    python scripts/profile_startup.py --budget-ms 1500
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# Only needed by particular endpoints; must not load with the app
+DEFERRED_MODULES = ("numpy", "yaml", "httpx", "pandas", "openai", "tiktoken")
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import src.api.main
+imported = time.perf_counter()
+from src.core.database import init_db
+applied = init_db()
+print("PROFILE " + json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "init_db_ms": (time.perf_counter() - imported) * 1000,
+    "schema_applied": applied,
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for each -X importtime line"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def direct_imports(modules: List[Tuple[str, int, int, int]], parent: str) -> List[Tuple[str, int, int, int]]:
+    """Modules first imported directly by `parent` (importtime lists children before their parent)"""
+    pending = []
+    for module in modules:
+        if module[3] == 1:
+            pending.append(module)
+        elif module[3] == 0:
+            if module[0] == parent:
+                return pending
+            pending = []
+    return []
+
+
+def profile(db: str = None) -> Dict:
+    env = dict(os.environ)
+    if db:
+        env["DATABASE_URL"] = f"sqlite:///{Path(db).resolve()}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    marker = [line for line in proc.stdout.splitlines() if line.startswith("PROFILE ")]
+    if proc.returncode != 0 or not marker:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+
+    result = json.loads(marker[-1][len("PROFILE "):])
+    modules = parse_importtime(proc.stderr)
+    loaded = {name for name, _, _, _ in modules}
+    result["modules"] = modules
+    result["deferred_loaded"] = [name for name in DEFERRED_MODULES if name in loaded]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile API cold start (imports + schema check)')
+    parser.add_argument('--db', help='Database to run the startup schema check against (sets DATABASE_URL)')
+    parser.add_argument('--top', type=int, default=15, help='How many modules to list')
+    parser.add_argument('--budget-ms', type=float, help='Exit non-zero if importing the app takes longer')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    try:
+        result = profile(args.db)
+    except RuntimeError as e:
+        print(f"Could not import the app: {e}")
+        sys.exit(1)
+
+    modules = result.pop("modules")
+    packages = direct_imports(modules, "src.api.main")
+    if args.json:
+        result["top_packages"] = [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1)}
+            for name, _, cum, _ in sorted(packages, key=lambda m: -m[2])[:args.top]
+        ]
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Import src.api.main: {result['import_ms']:.0f} ms")
+        print(f"Startup schema check: {result['init_db_ms']:.1f} ms "
+              f"({'applied' if result['schema_applied'] else 'up to date, skipped'})")
+        print(f"\nSlowest imports of src.api.main (cumulative):")
+        for name, _, cumulative_us, _ in sorted(packages, key=lambda m: -m[2])[:args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        print(f"\nSlowest modules (self):")
+        for name, self_us, _, _ in sorted(modules, key=lambda m: -m[1])[:args.top]:
+            print(f"  {self_us / 1000:8.1f} ms  {name}")
+        if result["deferred_loaded"]:
+            print(f"\nLoaded at import but should be deferred: {', '.join(result['deferred_loaded'])}")
+
+    over_budget = args.budget_ms is not None and result["import_ms"] > args.budget_ms
+    if over_budget:
+        print(f"\nOver budget: {result['import_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+    sys.exit(1 if over_budget or result["deferred_loaded"] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Seeder for Performance Testing
+Builds a production-sized database: questions from the existing generators,
+students, and attempt history with realistic activity, accuracy and timing.
+
+Rows are written with executemany in large transactions with journaling
+relaxed, so even the production preset (tens of millions of attempts) seeds
+in minutes. Never point this at the real database.
+
+Usage:
+    python scripts/seed_dataset.py --db perf.db --scale small
+    python scripts/seed_dataset.py --db perf.db --scale production
+    python scripts/seed_dataset.py --db perf.db --questions 50000 --students 5000 --attempts 2000000
+"""
+
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Add parent (for src) and scripts (for the generators) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine
+
+from src.core.database import Base
+
+SCALES = {
+    "small": {"questions": 10_000, "students": 1_000, "attempts": 200_000},
+    "medium": {"questions": 50_000, "students": 5_000, "attempts": 2_000_000},
+    "production": {"questions": 300_000, "students": 30_000, "attempts": 20_000_000},
+}
+
+BATCH_SIZE = 100_000
+HISTORY_DAYS = 365
+
+# Share of attempts by local hour of day: after school and early evening peak
+HOUR_WEIGHTS = np.array([
+    0, 0, 0, 0, 0, 0, 1, 3, 4, 2, 2, 2,
+    3, 3, 3, 4, 9, 12, 13, 11, 8, 5, 2, 1,
+], dtype=float)
+
+
+def _seq_id(prefix: int, n: int) -> str:
+    """UUID-shaped ids that increase monotonically, so primary-key inserts append"""
+    return f"{prefix:08x}-0000-4000-8000-{n:012x}"
+
+
+# ============================================================================
+# Questions
+# ============================================================================
+
+def question_factories() -> List[Tuple[float, Callable[[], dict]]]:
+    """(weight, factory) pairs over the repo's generators, roughly matching the real bank's mix"""
+    from generate_questions import QuestionGenerator
+    from generate_vr_expanded import VRExpandedGenerator
+    from generate_nvr import NVRQuestionGenerator
+    from generate_english import EnglishQuestionGenerator
+    import generate_code_words as code_words
+
+    maths = QuestionGenerator()
+    vr = VRExpandedGenerator()
+    nvr = NVRQuestionGenerator()
+    english = EnglishQuestionGenerator()
+
+    def difficulty() -> int:
+        return random.choices([1, 2, 3, 4, 5], weights=[1, 4, 4, 2, 1])[0]
+
+    def code_word() -> dict:
+        example = random.choice(code_words.WORDS)
+        targets = [w for w in code_words.WORDS if len(w) == len(example) and w != example] or [example]
+        return code_words.generate_question(example, random.choice(targets), random.choice([1, 2, 3, 4, 5, 23, 24, 25]))
+
+    # Fixed-content generators are expanded once and sampled with fresh ids
+    fixed_english = english.generate_comprehension_questions() + english.generate_grammar_questions()
+
+    def fixed_english_question() -> dict:
+        return dict(random.choice(fixed_english))
+
+    return [
+        (8, lambda: maths.generate_arithmetic_sequence(difficulty())),
+        (4, lambda: maths.generate_quadratic_sequence(difficulty())),
+        (5, lambda: maths.generate_letter_sequence(difficulty())),
+        (6, lambda: maths.generate_addition(difficulty())),
+        (6, lambda: maths.generate_multiplication(difficulty())),
+        (10, vr.generate_synonym_question),
+        (10, vr.generate_antonym_question),
+        (6, vr.generate_hidden_word_question),
+        (6, vr.generate_compound_word_question),
+        (5, code_word),
+        (4, lambda: nvr.generate_rotation_sequence(difficulty())),
+        (4, lambda: nvr.generate_size_sequence(difficulty())),
+        (4, lambda: nvr.generate_shape_change_sequence(difficulty())),
+        (3, lambda: nvr.generate_odd_one_out_rotation(difficulty())),
+        (3, lambda: nvr.generate_odd_one_out_shape(difficulty())),
+        (4, lambda: nvr.generate_shape_analogy(difficulty())),
+        (5, lambda: english.generate_spelling_questions(1)[0]),
+        (6, fixed_english_question),
+    ]
+
+
+def seed_questions(conn: sqlite3.Connection, count: int, now: datetime) -> Tuple[np.ndarray, List[str], List[List[str]]]:
+    """Insert generated questions; returns (difficulty, correct answer, wrong options) per question"""
+    factories = question_factories()
+    weights = [w for w, _ in factories]
+    funcs = [f for _, f in factories]
+
+    difficulties = np.empty(count, dtype=np.int8)
+    correct_answers: List[str] = []
+    wrong_options: List[List[str]] = []
+
+    for start in range(0, count, BATCH_SIZE):
+        rows = []
+        for i, factory in enumerate(random.choices(funcs, weights, k=min(BATCH_SIZE, count - start)), start):
+            q = factory()
+            options = q.get('options') or []
+            qid = _seq_id(1, i)
+            created = now - timedelta(days=random.uniform(HISTORY_DAYS, HISTORY_DAYS * 2))
+            rows.append((
+                i + 1, qid, q.get('exam_type', '11plus_gl'), q['subject'],
+                q.get('topic', q['question_type']), q['question_type'], q['difficulty'],
+                q['question_text'], json.dumps(options), q['correct_answer'], q.get('correct_index'),
+                q.get('marks_available', 1), q.get('hint'), q.get('worked_solution'),
+                'synthetic', created.strftime('%Y-%m-%d %H:%M:%S.%f'),
+            ))
+            difficulties[i] = q['difficulty']
+            correct_answers.append(q['correct_answer'])
+            wrong = [json.dumps(o) if not isinstance(o, str) else o for o in options if o != q['correct_answer']]
+            wrong_options.append(wrong or [""])
+
+        conn.executemany("""
+            INSERT INTO questions (
+                pk, id, exam_type, subject, topic, question_type, difficulty,
+                question_text, options, correct_answer, correct_index,
+                marks_available, hint, worked_solution, source, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        print(f"  questions: {start + len(rows):,}/{count:,}", end="\r", flush=True)
+    print()
+    return difficulties, correct_answers, wrong_options
+
+
+# ============================================================================
+# Students
+# ============================================================================
+
+def seed_students(conn: sqlite3.Connection, count: int, now: datetime, rng: np.random.Generator) -> np.ndarray:
+    """Insert students; returns account age in days per student"""
+    ages_days = rng.uniform(14, HISTORY_DAYS, count)
+    rows = []
+    for i in range(count):
+        created = now - timedelta(days=float(ages_days[i]))
+        rows.append((
+            i + 1, _seq_id(2, i), f"Student {i + 1}", None,
+            int(rng.choice([9, 10, 11])), int(rng.choice([5, 6], p=[0.7, 0.3])),
+            "11plus_gl", int(rng.choice([2, 3, 4], p=[0.3, 0.5, 0.2])), int(rng.choice([10, 20, 30])),
+            created.strftime('%Y-%m-%d %H:%M:%S.%f'), now.strftime('%Y-%m-%d %H:%M:%S.%f'),
+        ))
+    conn.executemany("""
+        INSERT INTO students (
+            pk, id, name, email, age, year_group, exam_target,
+            preferred_difficulty, daily_goal_questions, created_at, last_active
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    return ages_days
+
+
+# ============================================================================
+# Attempts
+# ============================================================================
+
+def seed_attempts(
+    conn: sqlite3.Connection,
+    count: int,
+    student_ages: np.ndarray,
+    difficulties: np.ndarray,
+    correct_answers: List[str],
+    wrong_options: List[List[str]],
+    now: datetime,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """
+    Insert attempt history in vectorised batches
+
+    - Activity is heavy-tailed: a few keen students do most of the practice
+    - Question popularity is Zipf-like (lists and mocks favour the same items)
+    - Accuracy follows a logistic model of ability vs difficulty that improves
+      over each student's history
+    - Time taken is log-normal, longer for harder and for wrong answers
+    """
+    n_students = len(student_ages)
+    n_questions = len(difficulties)
+
+    activity = rng.lognormal(0, 1.2, n_students)
+    student_p = activity / activity.sum()
+    ability = rng.normal(0.4, 1.0, n_students)
+
+    popularity = 1.0 / (rng.permutation(n_questions) + 20.0) ** 0.8
+    question_p = popularity / popularity.sum()
+
+    hour_p = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+    now_us = np.datetime64(now, 'us')
+    day_us = np.int64(86_400_000_000)
+
+    question_ids = [_seq_id(1, i) for i in range(n_questions)]
+    times_attempted = np.zeros(n_questions, dtype=np.int64)
+    times_correct = np.zeros(n_questions, dtype=np.int64)
+    total_time = np.zeros(n_questions, dtype=np.int64)
+
+    for start in range(0, count, BATCH_SIZE):
+        m = min(BATCH_SIZE, count - start)
+        s = rng.choice(n_students, size=m, p=student_p)
+        q = rng.choice(n_questions, size=m, p=question_p)
+        diff = difficulties[q].astype(float)
+
+        # When in the student's history the attempt happened (0 = signup, 1 = today)
+        progress = rng.random(m)
+        days_ago = np.floor(student_ages[s] * (1 - progress))
+        seconds = rng.choice(24, size=m, p=hour_p) * 3600 + rng.integers(0, 3600, m)
+        timestamps = now_us - (days_ago.astype(np.int64) * day_us) + (seconds - 86_400) * 1_000_000
+        timestamps = np.minimum(timestamps, now_us)
+
+        logit = ability[s] + 0.8 * progress - 0.7 * (diff - 3)
+        correct = rng.random(m) < 1 / (1 + np.exp(-logit))
+
+        taken = rng.lognormal(np.log(12 + 8 * diff), 0.5) * np.where(correct, 1.0, 1.3)
+        taken = np.clip(taken, 3, 600).astype(np.int64)
+
+        hint_used = rng.random(m) < np.where(correct, 0.04, 0.18)
+        solution_viewed = ~correct & (rng.random(m) < 0.3)
+        wrong_pick = rng.integers(0, 4, m)
+
+        np.add.at(times_attempted, q, 1)
+        np.add.at(times_correct, q[correct], 1)
+        np.add.at(total_time, q, taken)
+
+        stamp_text = np.datetime_as_string(timestamps, unit='us')
+        rows = [
+            (
+                start + i + 1, si + 1, qi + 1, ts[:10] + " " + ts[11:],
+                correct_answers[qi] if ok else wrong_options[qi][wp % len(wrong_options[qi])],
+                tt, ok, int(ok), 1, hint, sol,
+            )
+            for i, (si, qi, ts, ok, tt, hint, sol, wp) in enumerate(zip(
+                s.tolist(), q.tolist(), stamp_text.tolist(), correct.tolist(), taken.tolist(),
+                hint_used.tolist(), solution_viewed.tolist(), wrong_pick.tolist(),
+            ))
+        ]
+        conn.executemany("""
+            INSERT INTO attempts (
+                id, student_pk, question_pk, timestamp, student_answer, time_taken_seconds,
+                is_correct, marks_awarded, marks_available, hint_used, solution_viewed
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        print(f"  attempts: {start + m:,}/{count:,}", end="\r", flush=True)
+    print()
+
+    updated_at = now.strftime('%Y-%m-%d %H:%M:%S.%f')
+    conn.executemany("""
+        INSERT INTO question_stats (
+            question_id, times_attempted, times_correct, timed_attempts, total_time_seconds, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        (question_ids[i], int(a), int(c), int(a), int(t), updated_at)
+        for i, (a, c, t) in enumerate(zip(times_attempted, times_correct, total_time)) if a
+    ))
+    conn.commit()
+    return {"times_attempted": times_attempted, "times_correct": times_correct, "total_time": total_time}
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def create_schema(db_path: str):
+    """Create the ORM schema so the seeded database matches the app exactly"""
+    engine = create_engine(f"sqlite:///{Path(db_path).resolve()}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+
+def seed(db_path: str, questions: int, students: int, attempts: int, seed_value: int = 11) -> Dict[str, float]:
+    """Build the dataset and return per-phase timings in seconds"""
+    random.seed(seed_value)
+    rng = np.random.default_rng(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    create_schema(db_path)
+    conn = sqlite3.connect(db_path)
+    # Bulk-load settings: a crash mid-seed just means re-running the seeder
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+    timings = {}
+    start = time.perf_counter()
+    difficulties, correct_answers, wrong_options = seed_questions(conn, questions, now)
+    timings["questions"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    student_ages = seed_students(conn, students, now, rng)
+    timings["students"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if attempts:
+        seed_attempts(conn, attempts, student_ages, difficulties, correct_answers, wrong_options, now, rng)
+    timings["attempts"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    timings["analyze"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a synthetic production-sized database for benchmarks')
+    parser.add_argument('--db', required=True, help='Output database (must not exist unless --force)')
+    parser.add_argument('--scale', choices=SCALES.keys(), default='small')
+    parser.add_argument('--questions', type=int, help='Override question count')
+    parser.add_argument('--students', type=int, help='Override student count')
+    parser.add_argument('--attempts', type=int, help='Override attempt count')
+    parser.add_argument('--seed', type=int, default=11, help='Random seed (same seed, same dataset)')
+    parser.add_argument('--force', action='store_true', help='Overwrite an existing file')
+    args = parser.parse_args()
+
+    db_path = Path(args.db)
+    if db_path.exists():
+        if not args.force:
+            parser.error(f"{db_path} already exists (use --force to overwrite)")
+        db_path.unlink()
+
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    if sizes["questions"] < 1 or sizes["students"] < 1:
+        parser.error("need at least one question and one student")
+
+    print(f"Seeding {db_path}: {sizes['questions']:,} questions, "
+          f"{sizes['students']:,} students, {sizes['attempts']:,} attempts")
+    timings = seed(str(db_path), sizes["questions"], sizes["students"], sizes["attempts"], args.seed)
+
+    total = sum(timings.values())
+    print(f"\nDone in {total:.1f}s ({db_path.stat().st_size / 1024 / 1024:.0f} MB)")
+    for phase, seconds in timings.items():
+        print(f"  - {phase:<10} {seconds:7.1f}s")
+    if timings["attempts"] and sizes["attempts"]:
+        print(f"  - {sizes['attempts'] / timings['attempts']:,.0f} attempts/s")
+
+
+if __name__ == '__main__':
+    main()
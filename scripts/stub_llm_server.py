@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Stub LLM server for benchmarks and local testing.
+Speaks the OpenAI chat-completions API (streaming and non-streaming) and
+Ollama's /api/generate, with a simulated model speed, so the generation
+pipeline, hint precompute job and LLM cache can be exercised without a GPU.
+
+Batch generation prompts ("Number of questions: N") get N questions back,
+as {"questions": [...]} when the request carries a JSON schema and as JSON
+Lines otherwise (plus an occasional invalid question to exercise validation
+and retries). A schema-constrained request without the marker gets a single
+question object; any other prompt gets a short canned answer. Prompts are kept in app.state.prompts, so tests can
+check what each call asked for.
+
+/v1/embeddings and /api/embed return hashed bag-of-words vectors, so texts
+sharing words come out similar and semantic search can be tried offline.
+
+Usage:
+    python scripts/stub_llm_server.py --port 8765 --tokens-per-second 60 --parallel 4
+    LLM_HOST=http://127.0.0.1:8765/v1 python scripts/precompute_hints.py --limit 20
+"""
+
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.practice_agent import BATCH_COUNT_MARKER
+
+CHARS_PER_TOKEN = 4
+EMBEDDING_DIM = 256
+
+
+@dataclass
+class StubConfig:
+    first_token_seconds: float = 0.1      # Fixed latency before the first token
+    prefill_tokens_per_second: float = 300.0  # Prompt processing speed (local CPU/GPU models)
+    tokens_per_second: float = 60.0       # Decode speed per request
+    parallel: int = 4                     # Requests decoded at once (like llama.cpp --parallel)
+    invalid_rate: float = 0.05            # Share of malformed question lines
+    seed: int = 0
+
+
+def _question(rng: random.Random, invalid: bool) -> dict:
+    a, b = rng.randint(2, 12), rng.randint(2, 12)
+    answer = a * b
+    wrong = set()
+    while len(wrong) < 4:
+        candidate = answer + rng.choice([-1, 1]) * rng.randint(1, 12)
+        if candidate > 0 and candidate != answer:
+            wrong.add(candidate)
+    options = [str(o) for o in rng.sample(sorted(wrong) + [answer], 5)]
+    question = {
+        "question_text": f"What is {a} x {b}? (#{rng.randint(0, 10**9)})",
+        "options": options,
+        "correct_answer": str(answer) if not invalid else "not an option",
+        "explanation": f"{a} groups of {b} make {answer}.",
+    }
+    return question
+
+
+def completion_text(prompt: str, rng: random.Random, config: StubConfig, structured: bool = False) -> str:
+    for line in prompt.splitlines():
+        if line.startswith(BATCH_COUNT_MARKER):
+            count = int(line[len(BATCH_COUNT_MARKER):].strip() or 1)
+            questions = [_question(rng, rng.random() < config.invalid_rate) for _ in range(count)]
+            if structured:
+                return json.dumps({"questions": questions})
+            return "\n".join(json.dumps(q) for q in questions)
+    if structured:
+        return json.dumps(_question(rng, rng.random() < config.invalid_rate))
+    return "Think about what each word means on its own first, then look for the closest match."
+
+
+def embed_text(text: str) -> list:
+    """Deterministic bag-of-words vector (word hashes folded into EMBEDDING_DIM buckets)"""
+    vector = [0.0] * EMBEDDING_DIM
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        bucket = zlib.crc32(word.encode())
+        vector[bucket % EMBEDDING_DIM] += 1.0 if bucket & 1 << 20 else -1.0
+    return vector
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Stub LLM")
+    slots = asyncio.Semaphore(config.parallel)
+    rng = random.Random(config.seed)
+    app.state.requests = 0
+    app.state.prompts = []
+
+    async def emit(prompt: str, structured: bool):
+        """Yield the completion a token at a time at the configured speed"""
+        prompt_tokens = len(prompt) / CHARS_PER_TOKEN
+        prefill = prompt_tokens / config.prefill_tokens_per_second if config.prefill_tokens_per_second > 0 else 0
+        await asyncio.sleep(config.first_token_seconds + prefill)
+        text = completion_text(prompt, rng, config, structured)
+        delay = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+        for i in range(0, len(text), CHARS_PER_TOKEN):
+            if delay:
+                await asyncio.sleep(delay)
+            yield text[i:i + CHARS_PER_TOKEN]
+
+    async def complete(prompt: str, structured: bool) -> str:
+        async with slots:
+            return "".join([token async for token in emit(prompt, structured)])
+
+    def stream_with_slot(prompt: str, structured: bool, frame):
+        async def body():
+            async with slots:
+                async for token in emit(prompt, structured):
+                    yield frame(token)
+        return body()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        app.state.requests += 1
+        prompt = payload["messages"][-1]["content"]
+        app.state.prompts.append(prompt)
+        structured = "response_format" in payload
+        if payload.get("stream"):
+            def sse(token: str) -> str:
+                return "data: " + json.dumps({"choices": [{"delta": {"content": token}}]}) + "\n\n"
+
+            async def events():
+                async for frame in stream_with_slot(prompt, structured, sse):
+                    yield frame
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        text = await complete(prompt, structured)
+        return {"choices": [{"message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]}
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        payload = await request.json()
+        app.state.requests += 1
+        app.state.prompts.append(payload["prompt"])
+        structured = "format" in payload
+        if payload.get("stream", True):
+            def ndjson(token: str) -> str:
+                return json.dumps({"response": token, "done": False}) + "\n"
+
+            async def lines():
+                async for line in stream_with_slot(payload["prompt"], structured, ndjson):
+                    yield line
+                yield json.dumps({"response": "", "done": True}) + "\n"
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+        return {"response": await complete(payload["prompt"], structured), "done": True}
+
+    async def embed_batch(texts: list) -> list:
+        async with slots:
+            tokens = sum(len(t) for t in texts) / CHARS_PER_TOKEN
+            prefill = tokens / config.prefill_tokens_per_second if config.prefill_tokens_per_second > 0 else 0
+            await asyncio.sleep(config.first_token_seconds + prefill)
+            return [embed_text(t) for t in texts]
+
+    @app.post("/v1/embeddings")
+    async def openai_embeddings(request: Request):
+        payload = await request.json()
+        app.state.requests += 1
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        vectors = await embed_batch(texts)
+        return {"data": [{"index": i, "embedding": v} for i, v in enumerate(vectors)]}
+
+    @app.post("/api/embed")
+    async def ollama_embed(request: Request):
+        payload = await request.json()
+        app.state.requests += 1
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+        return {"embeddings": await embed_batch(texts)}
+
+    return app
+
+
+class BackgroundServer:
+    """Run the stub in a thread (for benchmarks that need a real HTTP hop)"""
+
+    def __init__(self, config: StubConfig, port: int = 8765):
+        import uvicorn
+
+        self.port = port
+        self.app = create_app(config)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, port=port, log_level="warning"))
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self):
+        import threading
+
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        deadline = time.time() + 10
+        while not self.server.started and time.time() < deadline:
+            time.sleep(0.02)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Stub OpenAI/Ollama-compatible LLM server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--first-token', type=float, default=0.1, help='Fixed seconds before the first token')
+    parser.add_argument('--prefill-tokens-per-second', type=float, default=300.0, help='Prompt processing speed')
+    parser.add_argument('--tokens-per-second', type=float, default=60.0, help='Decode speed per request')
+    parser.add_argument('--parallel', type=int, default=4, help='Requests served at once')
+    parser.add_argument('--invalid-rate', type=float, default=0.05, help='Share of malformed questions')
+    args = parser.parse_args()
+
+    config = StubConfig(
+        first_token_seconds=args.first_token,
+        prefill_tokens_per_second=args.prefill_tokens_per_second,
+        tokens_per_second=args.tokens_per_second,
+        parallel=args.parallel,
+        invalid_rate=args.invalid_rate,
+    )
+    uvicorn.run(create_app(config), port=args.port, log_level="warning")
+
+
+if __name__ == '__main__':
+    main()
@@ -20,12 +20,22 @@ class Settings(BaseSettings):
     llm_host: str = "http://localhost:1234/v1"
     llm_model: str = "local-model"
     llm_api_key: str = "lm-studio"
+    llm_generation_concurrency: int = 4    # Concurrent LLM calls when generating questions
+    llm_questions_per_call: int = 5        # Questions requested per generation prompt
 
     # Embedding Configuration
     embedding_binding: str = "ollama"
     embedding_host: str = "http://localhost:11434"
     embedding_model: str = "nomic-embed-text"
     embedding_api_key: str = "ollama"
+    embedding_index_dir: str = "./embedding_index"  # Built by scripts/build_embeddings.py
+    embedding_batch_size: int = 32                   # Texts per embedding request
+
+    # LLM response cache (explanations, hints, marking)
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./llm_cache.db"
+    llm_cache_ttl_seconds: int = 30 * 24 * 3600
+    llm_cache_memory_entries: int = 1024
 
     # Oak National Academy API
     oak_api_base: str = "https://open-api.thenational.academy"
@@ -38,6 +48,36 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./elevenplustutor.db"
 
+    # Attempt archive (scripts/archive_attempts.py)
+    attempt_archive_dir: str = "./attempt_archive"   # Parquet files, one directory per month
+    attempt_archive_after_days: int = 365            # Attempts older than this leave the live DB
+
+    # Backups (scripts/backup_db.py; snapshots run in the API when the interval is set)
+    backup_dir: str = "./backups"
+    backup_interval_hours: float = 0       # 0 = no scheduled backups
+    backup_keep: int = 14                  # Snapshots kept; older ones are deleted
+
+    # Read-only question pack (scripts/build_question_pack.py); when set, question
+    # reads are served from it instead of the database
+    question_pack: str = ""
+
+    # Static question packs (scripts/export_static_packs.py); the directory is
+    # served by the frontend at static_pack_base_url (or copy it to a CDN)
+    static_pack_dir: str = "./web/public/packs"
+    static_pack_base_url: str = "/packs"
+
+    # Background jobs (generation, import, validation, export): worker threads
+    # per API process; 0 = only run queued jobs from another process
+    job_workers: int = 2
+
+    # HTTP Caching (Cache-Control max-age, seconds)
+    question_cache_max_age: int = 86400    # Single questions - content is immutable per id
+    content_cache_max_age: int = 3600      # Question lists, strategies, lessons
+
+    # Metrics (/metrics in Prometheus format)
+    metrics_enabled: bool = True
+    metrics_debug_header: bool = False     # Honour "X-Debug-Queries: 1" with per-request query counts (dev only)
+
     # ===================
     # Feature Flags - Opensource (always enabled)
     # ===================
@@ -0,0 +1,215 @@
+"""
+Batched Question Generation
+Fans LLM calls out with bounded concurrency, asks for several schema-constrained
+questions per call, and parses/validates each question as soon as its JSON
+object closes in the stream
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from src.agents.llm_client import LLMError
+from src.agents.practice_agent import build_batch_prompt
+from src.agents.structured import BATCH_SCHEMA, StreamingObjectParser, check_generated, retry_note
+
+
+# ============================================================================
+# Validation
+# ============================================================================
+
+def validate_generated(
+    item: Dict[str, Any],
+    subject: str,
+    question_type: str,
+    difficulty: int,
+    exam_type: str = "11plus_gl",
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Turn one parsed object into a question row, or (None, reason) if it isn't usable"""
+    fields, reason = check_generated(item)
+    if fields is None:
+        return None, reason
+
+    return {
+        "id": str(uuid.uuid4()),
+        "exam_type": exam_type,
+        "subject": subject,
+        "topic": question_type,
+        "question_type": question_type,
+        "difficulty": difficulty,
+        "question_text": fields["question_text"],
+        "options": fields["options"],
+        "correct_answer": fields["correct_answer"],
+        "correct_index": fields["correct_index"],
+        "worked_solution": fields["explanation"],
+        "source": "generated",
+    }, None
+
+
+def _fingerprint(question: Dict[str, Any]) -> str:
+    return " ".join(question["question_text"].lower().split())
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+@dataclass
+class GenerationStats:
+    calls: int = 0
+    failed_calls: int = 0
+    parsed: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    malformed: int = 0
+    duplicates: int = 0
+    retry_calls: int = 0
+    aborted_calls: int = 0
+    elapsed_seconds: float = 0.0
+    first_question_seconds: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def questions_per_minute(self) -> float:
+        return self.accepted / self.elapsed_seconds * 60 if self.elapsed_seconds else 0.0
+
+
+class GenerationPipeline:
+    """
+    Generate `count` validated questions with at most `concurrency` LLM calls
+    in flight (an asyncio semaphore), each asking for `per_call` questions
+
+    Accepted questions are handed over through a bounded queue, so a slow
+    consumer (e.g. a DB writer) pauses the workers instead of letting
+    responses pile up. Only rejected questions are re-requested: follow-up
+    calls ask for just the shortfall, with the rejection reasons in the
+    prompt, until enough questions pass or the call budget (max_calls_factor
+    x the ideal number) runs out. A call whose first items are mostly bad is
+    cut off early rather than decoded to the end.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        concurrency: int = 4,
+        per_call: int = 5,
+        max_calls_factor: float = 2.0,
+        temperature: float = 0.8,
+    ):
+        self.llm = llm
+        self.concurrency = max(1, concurrency)
+        self.per_call = max(1, per_call)
+        self.max_calls_factor = max_calls_factor
+        self.temperature = temperature
+        self.stats = GenerationStats()
+
+    async def stream(
+        self,
+        subject: str,
+        question_type: str,
+        count: int,
+        difficulty: int = 3,
+        exam_type: str = "11plus_gl",
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield validated question rows as soon as each one is parsed"""
+        stats = self.stats = GenerationStats()
+        if count <= 0:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * self.per_call)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seen: Set[str] = set()
+        reasons: List[str] = []
+        max_calls = max(1, int(-(-count // self.per_call) * self.max_calls_factor))
+        start = time.perf_counter()
+        done = object()
+
+        def remaining() -> int:
+            return count - stats.accepted
+
+        async def one_call(retry: bool):
+            async with semaphore:
+                if remaining() <= 0:
+                    return
+                stats.calls += 1
+                stats.retry_calls += retry
+                asked = min(self.per_call, remaining())
+                prompt = build_batch_prompt(subject, question_type, difficulty, asked, exam_type)
+                if retry:
+                    prompt += retry_note(reasons[-3:])
+                parser = StreamingObjectParser()
+                bad = 0
+
+                async def accept(items):
+                    nonlocal bad
+                    for item in items:
+                        stats.parsed += 1
+                        question, reason = validate_generated(item, subject, question_type, difficulty, exam_type)
+                        if question is None:
+                            stats.rejected += 1
+                            bad += 1
+                            reasons.append(reason)
+                        elif _fingerprint(question) in seen:
+                            stats.duplicates += 1
+                        elif remaining() > 0:
+                            seen.add(_fingerprint(question))
+                            stats.accepted += 1
+                            if stats.first_question_seconds is None:
+                                stats.first_question_seconds = time.perf_counter() - start
+                            await queue.put(question)
+
+                try:
+                    async for chunk in self.llm.stream(prompt, schema=BATCH_SCHEMA, temperature=self.temperature):
+                        await accept(list(parser.feed(chunk)))
+                        if remaining() <= 0:
+                            break
+                        if bad + parser.malformed >= 2 and bad + parser.malformed > asked // 2:
+                            # Mostly bad output: stop paying for it, the next round retries
+                            stats.aborted_calls += 1
+                            break
+                    await accept(list(parser.close()))
+                except LLMError as e:
+                    stats.failed_calls += 1
+                    stats.errors.append(str(e))
+                finally:
+                    stats.malformed += parser.malformed
+
+        async def fan_out():
+            # One round fans out every call still needed; later rounds only
+            # re-request the rejected/duplicate shortfall until the budget runs out
+            planned = 0
+            error = None
+            try:
+                while remaining() > 0 and planned < max_calls:
+                    round_calls = min(-(-remaining() // self.per_call), max_calls - planned)
+                    retry = planned > 0
+                    planned += round_calls
+                    await asyncio.gather(*(one_call(retry) for _ in range(round_calls)))
+            except Exception as e:
+                error = e
+            await queue.put(error or done)
+
+        runner = asyncio.create_task(fan_out())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not runner.done():
+                runner.cancel()
+            try:
+                await runner
+            except asyncio.CancelledError:
+                pass
+            stats.elapsed_seconds = time.perf_counter() - start
+
+    async def generate(self, subject: str, question_type: str, count: int, difficulty: int = 3,
+                       exam_type: str = "11plus_gl") -> List[Dict[str, Any]]:
+        """Collect the stream into a list"""
+        return [q async for q in self.stream(subject, question_type, count, difficulty, exam_type)]
@@ -0,0 +1,317 @@
+"""
+LLM Response Cache
+Two-tier (memory LRU + SQLite) cache for deterministic prompts, with TTL and
+single-flight deduplication of concurrent identical requests
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 1024
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical form of a prompt for cache keys
+
+    Only whitespace that cannot change the model's reading is folded: line
+    endings, trailing spaces and runs of blank lines (e.g. from an empty
+    optional section in an f-string template).
+    """
+    text = prompt.replace("\r\n", "\n").replace("\r", "\n").strip()
+    text = _TRAILING_SPACE_RE.sub("\n", text + "\n").rstrip("\n")
+    return _BLANK_LINES_RE.sub("\n\n", text)
+
+
+def cache_key(model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for (model, normalized prompt, generation parameters)"""
+    payload = json.dumps(
+        {"model": model, "prompt": normalize_prompt(prompt), "params": params or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0      # Callers that waited on an identical in-flight request
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses + self.coalesced
+        return (lookups - self.misses) / lookups if lookups else 0.0
+
+
+# ============================================================================
+# Storage Tiers
+# ============================================================================
+
+class MemoryTier:
+    """Thread-safe LRU of (response, expires_at)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, response: str, expires_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """Persistent tier shared across restarts and worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache(expires_at)")
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row:
+                self._conn.execute("UPDATE llm_cache SET hits = hits + 1 WHERE key = ?", (key,))
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, model: str, response: str, now: float, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, expires_at, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, model, response, now, expires_at),
+            )
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+class _LeaderCancelled(Exception):
+    """The caller running generate() was cancelled; a waiter takes over"""
+
+class LLMResponseCache:
+    """
+    Cache LLM responses keyed by (model, normalized prompt, parameters)
+
+    Lookups check memory, then SQLite (promoting hits to memory). Misses call
+    the LLM once per key even when many requests arrive together: later
+    callers await the first caller's in-flight result. Failed calls are not
+    cached and are re-raised to every waiter; if the first caller is
+    cancelled (a client disconnect), one waiter takes over the call.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.memory = MemoryTier(memory_entries)
+        self.disk = SQLiteTier(path) if path else None
+        self.stats = CacheStats()
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        response = self.memory.get(key, now)
+        if response is not None:
+            self.stats.memory_hits += 1
+            return response
+        if self.disk:
+            stored = self.disk.get(key, now)
+            if stored:
+                self.stats.disk_hits += 1
+                self.memory.set(key, stored[0], stored[1])
+                return stored[0]
+        return None
+
+    def set(self, key: str, model: str, response: str, ttl_seconds: Optional[int] = None):
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self.memory.set(key, response, expires_at)
+        if self.disk:
+            self.disk.set(key, model, response, now, expires_at)
+
+    async def get_or_generate(
+        self,
+        model: str,
+        prompt: str,
+        generate: Callable[[], Awaitable[str]],
+        params: Optional[Dict[str, Any]] = None,
+        ttl_seconds: Optional[int] = None,
+    ) -> str:
+        """Return the cached response, or call generate() once for all concurrent callers"""
+        key = cache_key(model, prompt, params)
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                continue    # The first waiter back finds no call in flight and makes it
+
+        self.stats.misses += 1
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await generate()
+        except asyncio.CancelledError:
+            # Not future.cancel(): waiters would be cancelled along with this caller
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            if response:
+                self.set(key, model, response, ttl_seconds)
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """Drop expired rows from the SQLite tier (memory expires lazily)"""
+        return self.disk.purge_expired(time.time()) if self.disk else 0
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk:
+            self.disk.close()
+
+
+class CachedLLMClient:
+    """
+    Drop-in wrapper for an LLM client with an async generate(prompt, **params)
+
+    Use it only for deterministic prompts (explanations, hints, marking);
+    question generation wants a fresh response every time.
+    """
+
+    def __init__(self, llm_client: Any, cache: LLMResponseCache, model: str):
+        self.llm = llm_client
+        self.cache = cache
+        self.model = model
+
+    async def generate(self, prompt: str, **params) -> str:
+        return await self.cache.get_or_generate(
+            self.model, prompt, lambda: self.llm.generate(prompt, **params), params=params,
+        )
+
+    async def stream(self, prompt: str, **params) -> AsyncIterator[str]:
+        """
+        A hit is yielded as one chunk; a miss streams from the LLM and is
+        stored once complete (an abandoned stream stores nothing)
+        """
+        key = cache_key(self.model, prompt, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        self.cache.stats.misses += 1
+        parts = []
+        async for chunk in self.llm.stream(prompt, **params):
+            parts.append(chunk)
+            yield chunk
+        response = "".join(parts).strip()
+        if response:
+            self.cache.set(key, self.model, response)
+
+
+def create_llm_cache() -> Optional[LLMResponseCache]:
+    """Build the cache from settings (None when caching is disabled)"""
+    from settings import settings
+
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMResponseCache(
+        path=settings.llm_cache_path,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        memory_entries=settings.llm_cache_memory_entries,
+    )
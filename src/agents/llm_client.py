@@ -0,0 +1,169 @@
+"""
+LLM Client
+Minimal async client for the configured local/cloud LLM (OpenAI-compatible or Ollama)
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class LLMError(Exception):
+    """The LLM backend failed or returned an unusable response"""
+
+
+class LLMClient:
+    """
+    Async text generation against an OpenAI-compatible server (LM Studio,
+    llama.cpp, OpenAI) or Ollama's native API
+
+    Exposes generate(prompt, **params), the interface PracticeAgent expects.
+    One instance shares a pooled connection across calls. Pass schema=<JSON
+    schema> to constrain the output (OpenAI response_format / Ollama format).
+    httpx is imported on first use, so processes that never call a model
+    don't pay for it at startup.
+    """
+
+    def __init__(
+        self,
+        binding: str,
+        host: str,
+        model: str,
+        api_key: Optional[str] = None,
+        timeout: float = 120.0,
+        max_connections: int = 10,
+    ):
+        if binding not in ("openai", "ollama"):
+            raise ValueError(f"Unsupported LLM binding: {binding!r}")
+        self.binding = binding
+        self.host = host.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def generate(self, prompt: str, schema: Optional[Dict[str, Any]] = None, **params: Any) -> str:
+        import httpx
+
+        try:
+            if self.binding == "ollama":
+                return await self._generate_ollama(prompt, schema, params)
+            return await self._generate_openai(prompt, schema, params)
+        except httpx.HTTPError as e:
+            raise LLMError(f"{self.binding} request failed: {e}") from e
+
+    async def stream(self, prompt: str, schema: Optional[Dict[str, Any]] = None, **params: Any) -> AsyncIterator[str]:
+        """Yield text chunks as the model produces them"""
+        import httpx
+
+        try:
+            if self.binding == "ollama":
+                request = self._client.stream(
+                    "POST", f"{self.host}/api/generate",
+                    json=self._ollama_payload(prompt, schema, params, stream=True),
+                )
+            else:
+                request = self._client.stream(
+                    "POST", f"{self.host}/chat/completions",
+                    headers=self._headers(),
+                    json=self._openai_payload(prompt, schema, params, stream=True),
+                )
+            async with request as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    chunk = self._stream_chunk(line)
+                    if chunk:
+                        yield chunk
+        except httpx.HTTPError as e:
+            raise LLMError(f"{self.binding} stream failed: {e}") from e
+
+    def _stream_chunk(self, line: str) -> Optional[str]:
+        """Text carried by one line of an SSE (OpenAI) or NDJSON (Ollama) stream"""
+        line = line.strip()
+        if self.binding == "openai":
+            if not line.startswith("data:"):
+                return None
+            line = line[5:].strip()
+            if line == "[DONE]":
+                return None
+        if not line:
+            return None
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        if self.binding == "ollama":
+            return data.get("response")
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content")
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def _openai_payload(self, prompt: str, schema: Optional[Dict[str, Any]], params: Dict[str, Any],
+                        stream: bool = False) -> Dict[str, Any]:
+        payload = {"model": self.model, "messages": [{"role": "user", "content": prompt}], **params}
+        if stream:
+            payload["stream"] = True
+        if schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": schema, "strict": True},
+            }
+        return payload
+
+    def _ollama_payload(self, prompt: str, schema: Optional[Dict[str, Any]], params: Dict[str, Any],
+                        stream: bool = False) -> Dict[str, Any]:
+        payload = {"model": self.model, "prompt": prompt, "stream": stream, "options": params}
+        if schema is not None:
+            payload["format"] = schema
+        return payload
+
+    async def _generate_openai(self, prompt: str, schema: Optional[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        response = await self._client.post(
+            f"{self.host}/chat/completions",
+            headers=self._headers(),
+            json=self._openai_payload(prompt, schema, params),
+        )
+        response.raise_for_status()
+        try:
+            return response.json()["choices"][0]["message"]["content"].strip()
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise LLMError(f"Unexpected response shape: {response.text[:200]}") from e
+
+    async def _generate_ollama(self, prompt: str, schema: Optional[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        response = await self._client.post(
+            f"{self.host}/api/generate",
+            json=self._ollama_payload(prompt, schema, params),
+        )
+        response.raise_for_status()
+        try:
+            return response.json()["response"].strip()
+        except (KeyError, TypeError, ValueError) as e:
+            raise LLMError(f"Unexpected response shape: {response.text[:200]}") from e
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def create_llm_client(**overrides: Any) -> LLMClient:
+    """Build a client from settings (llm_binding, llm_host, llm_model, llm_api_key)"""
+    from settings import settings
+
+    config = {
+        "binding": settings.llm_binding,
+        "host": settings.llm_host,
+        "model": settings.llm_model,
+        "api_key": settings.llm_api_key,
+    }
+    config.update(overrides)
+    return LLMClient(**config)
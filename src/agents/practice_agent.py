@@ -3,9 +3,20 @@ Practice Agent
 Generates practice questions and evaluates student answers
 """
 
-from typing import Optional, List, Dict, Any
+import json
+from typing import Optional, List, Dict, Any, AsyncIterator
 from dataclasses import dataclass
 
+from src.agents.llm_cache import LLMResponseCache, CachedLLMClient
+from src.agents.llm_client import LLMError
+from src.agents.structured import (
+    BATCH_SCHEMA,
+    QUESTION_SCHEMA,
+    StreamingObjectParser,
+    check_generated,
+    retry_note,
+    schema_instructions,
+)
 from src.question_bank.models import (
     Question,
     ExamType,
@@ -17,6 +28,92 @@ from src.question_bank.models import (
 )
 
 
+# Bump when the hint/explanation prompts change so precomputed text is regenerated
+HINT_PROMPT_VERSION = 1
+
+
+def question_prompt_text(question_text: str) -> str:
+    """Readable question for prompts (JSON-encoded types carry a passage/instruction)"""
+    if question_text.startswith("{"):
+        try:
+            parsed = json.loads(question_text)
+        except ValueError:
+            return question_text
+        if isinstance(parsed, dict):
+            parts = [parsed.get("passage"), parsed.get("question") or parsed.get("instruction")]
+            return "\n\n".join(p for p in parts if p) or question_text
+    return question_text
+
+
+def build_hint_prompt(question_text: str, question_type: str, previous_attempt: Optional[str] = None) -> str:
+    """Prompt for a hint that nudges without revealing the answer"""
+    return f"""Provide a helpful hint for this question without giving away the answer.
+
+Question: {question_prompt_text(question_text)}
+Question Type: {question_type}
+
+{"Previous wrong answer: " + previous_attempt if previous_attempt else ""}
+
+Provide a hint that:
+- Points them in the right direction
+- Doesn't reveal the answer
+- Uses encouraging language
+- Is specific to this question type"""
+
+
+def build_explanation_prompt(question_text: str, question_type: str, correct_answer: str) -> str:
+    """Prompt for a child-friendly explanation of why the answer is correct"""
+    return f"""Explain the answer to this 11+ question to a student aged 10-11.
+
+Question: {question_prompt_text(question_text)}
+Question Type: {question_type}
+Correct Answer: {correct_answer}
+
+Requirements:
+- Explain step by step how to reach the answer
+- Use simple, clear language
+- Mention a common mistake to avoid
+- Keep it short (one paragraph)"""
+
+
+# Attempts per question before giving up on malformed output
+MAX_GENERATION_ATTEMPTS = 3
+
+# Marker the batch prompt uses for the requested count (the stub LLM server reads it too)
+BATCH_COUNT_MARKER = "Number of questions:"
+
+_DIFFICULTY_DESC = {
+    1: "very easy, using common words and small numbers",
+    2: "easy, using familiar words",
+    3: "moderate, using curriculum-appropriate vocabulary",
+    4: "challenging, using advanced vocabulary and multi-step reasoning",
+    5: "very challenging, for the strongest candidates",
+}
+
+
+def build_batch_prompt(subject: str, question_type: str, difficulty: int, count: int, exam_type: str = "11plus_gl") -> str:
+    """
+    Prompt for several multiple-choice questions in one call
+
+    Asks for {"questions": [...]} matching BATCH_SCHEMA; send the schema with
+    the request too so servers that support it constrain the output. Each
+    question object can be parsed as soon as it closes in the stream.
+    """
+    subject_name = subject.replace("_", " ").title()
+    return f"""Generate {question_type.replace("_", " ")} questions for the {exam_type} {subject_name} exam.
+
+{BATCH_COUNT_MARKER} {count}
+Difficulty: {_DIFFICULTY_DESC.get(difficulty, _DIFFICULTY_DESC[3])}
+Target age: 10-11 years old
+
+Each question must:
+- Be age-appropriate, clear and unambiguous
+- Have exactly 5 different answer options and exactly one correct answer
+- Be different from the other questions in this list
+
+{schema_instructions(BATCH_SCHEMA)}"""
+
+
 @dataclass
 class GenerationRequest:
     """Request to generate a question"""
@@ -41,35 +138,53 @@ class EvaluationResult:
 class PracticeAgent:
     """Agent for generating and evaluating practice questions"""
 
-    def __init__(self, llm_client: Any):
+    def __init__(
+        self,
+        llm_client: Any,
+        cache: Optional[LLMResponseCache] = None,
+        model: str = "default",
+    ):
         """
         Initialize the practice agent
 
         Args:
             llm_client: Client for LLM API (OpenAI, Ollama, etc.)
+            cache: Response cache for deterministic prompts (explanations,
+                hints, marking). Question generation is never cached.
+            model: Model name, part of the cache key
         """
         self.llm = llm_client
+        self.cached_llm = CachedLLMClient(llm_client, cache, model) if cache else llm_client
 
     async def generate_question(self, request: GenerationRequest) -> Question:
         """
         Generate a practice question
 
+        The prompt is schema-constrained (QUESTION_SCHEMA); output that still
+        fails validation is re-requested with the reason, up to
+        MAX_GENERATION_ATTEMPTS times.
+
         Args:
             request: Specification for the question to generate
 
         Returns:
             A new Question object
+
+        Raises:
+            LLMError: if no attempt produced a usable question
         """
         # Build the generation prompt based on exam type and subject
-        prompt = self._build_generation_prompt(request)
-
-        # Call LLM to generate question
-        response = await self.llm.generate(prompt)
+        prompt = self._build_generation_prompt(request) + "\n\n" + schema_instructions(QUESTION_SCHEMA)
 
-        # Parse response into Question object
-        question = self._parse_generated_question(response, request)
+        reasons: List[str] = []
+        for _ in range(MAX_GENERATION_ATTEMPTS):
+            response = await self.llm.generate(prompt + retry_note(reasons), schema=QUESTION_SCHEMA)
+            try:
+                return self._parse_generated_question(response, request)
+            except ValueError as e:
+                reasons.append(str(e))
 
-        return question
+        raise LLMError(f"No usable question after {MAX_GENERATION_ATTEMPTS} attempts: {'; '.join(reasons)}")
 
     def _build_generation_prompt(self, request: GenerationRequest) -> str:
         """Build prompt for question generation"""
@@ -224,11 +339,22 @@ Generate a well-structured question with:
         response: str,
         request: GenerationRequest
     ) -> Question:
-        """Parse LLM response into a Question object"""
-        # This would parse the LLM's structured response
-        # For now, return a placeholder
+        """
+        Parse a structured LLM response into a Question object
+
+        Raises:
+            ValueError: if the response holds no valid question object
+        """
         import uuid
 
+        parser = StreamingObjectParser()
+        items = list(parser.feed(response))
+        if not items:
+            raise ValueError("response was not a JSON question object")
+        fields, reason = check_generated(items[0])
+        if fields is None:
+            raise ValueError(reason)
+
         return Question(
             id=str(uuid.uuid4()),
             exam_type=request.exam_type,
@@ -238,8 +364,11 @@ Generate a well-structured question with:
             question_type=request.question_type or "general",
             difficulty=request.difficulty,
             format=QuestionFormat.MULTIPLE_CHOICE,
-            question_text=response,  # Would be parsed properly
-            correct_answer="",  # Would be extracted
+            question_text=fields["question_text"],
+            options=fields["options"],
+            correct_answer=fields["correct_answer"],
+            correct_answer_index=fields["correct_index"],
+            worked_solution=fields["explanation"],
             source="generated",
         )
 
@@ -273,7 +402,22 @@ Generate a well-structured question with:
             )
 
         # For longer answers, use LLM to evaluate
-        prompt = f"""Evaluate this student's answer against the mark scheme.
+        prompt = self._build_evaluation_prompt(question, student_answer)
+        response = await self.cached_llm.generate(prompt)
+
+        # Parse response (simplified)
+        return EvaluationResult(
+            is_correct=False,  # Would be parsed
+            marks_awarded=0,  # Would be parsed
+            marks_available=question.marks_available,
+            feedback=response,
+            model_answer=question.correct_answer,
+            explanation=question.worked_solution,
+        )
+
+    def _build_evaluation_prompt(self, question: Question, student_answer: str) -> str:
+        """Build prompt for marking a written answer against the mark scheme"""
+        return f"""Evaluate this student's answer against the mark scheme.
 
 Question: {question.question_text}
 
@@ -289,17 +433,20 @@ Provide:
 3. What was missing or incorrect
 4. Model answer for comparison"""
 
-        response = await self.llm.generate(prompt)
+    async def stream_evaluation(self, question: Question, student_answer: str) -> AsyncIterator[str]:
+        """
+        Stream marking feedback as the LLM writes it
 
-        # Parse response (simplified)
-        return EvaluationResult(
-            is_correct=False,  # Would be parsed
-            marks_awarded=0,  # Would be parsed
-            marks_available=question.marks_available,
-            feedback=response,
-            model_answer=question.correct_answer,
-            explanation=question.worked_solution,
-        )
+        Multiple-choice answers need no LLM, so their feedback arrives as a
+        single chunk.
+        """
+        if question.format == QuestionFormat.MULTIPLE_CHOICE:
+            result = await self.evaluate_answer(question, student_answer)
+            yield result.feedback
+            return
+
+        async for chunk in self.cached_llm.stream(self._build_evaluation_prompt(question, student_answer)):
+            yield chunk
 
     async def explain_concept(
         self,
@@ -318,7 +465,22 @@ Provide:
         Returns:
             Clear explanation of the concept
         """
-        prompt = f"""Explain the concept of "{topic}" in {subject.value} for a student aged {age_group}.
+        prompt = self._build_concept_prompt(topic, subject, age_group)
+        return await self.cached_llm.generate(prompt)
+
+    async def stream_explanation(
+        self,
+        topic: str,
+        subject: Subject,
+        age_group: str = "10-11"
+    ) -> AsyncIterator[str]:
+        """Stream explain_concept's answer as the LLM writes it"""
+        async for chunk in self.cached_llm.stream(self._build_concept_prompt(topic, subject, age_group)):
+            yield chunk
+
+    def _build_concept_prompt(self, topic: str, subject: Subject, age_group: str) -> str:
+        """Build prompt for an age-appropriate concept explanation"""
+        return f"""Explain the concept of "{topic}" in {subject.value} for a student aged {age_group}.
 
 Requirements:
 - Use simple, clear language
@@ -327,8 +489,6 @@ Requirements:
 - Keep it concise (2-3 paragraphs)
 - If relevant, mention how this might appear in exams"""
 
-        return await self.llm.generate(prompt)
-
     async def generate_hint(
         self,
         question: Question,
@@ -344,17 +504,23 @@ Requirements:
         Returns:
             A helpful hint without giving away the answer
         """
-        prompt = f"""Provide a helpful hint for this question without giving away the answer.
+        # Authored or precomputed hints need no LLM call (scripts/precompute_hints.py)
+        if question.hint and not previous_attempt:
+            return question.hint
 
-Question: {question.question_text}
-Question Type: {question.question_type}
+        prompt = build_hint_prompt(question.question_text, question.question_type, previous_attempt)
+        return await self.cached_llm.generate(prompt)
 
-{"Previous wrong answer: " + previous_attempt if previous_attempt else ""}
-
-Provide a hint that:
-- Points them in the right direction
-- Doesn't reveal the answer
-- Uses encouraging language
-- Is specific to this question type"""
-
-        return await self.llm.generate(prompt)
+    async def stream_hint(
+        self,
+        question: Question,
+        previous_attempt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream generate_hint's answer; a stored hint arrives as one chunk"""
+        if question.hint and not previous_attempt:
+            yield question.hint
+            return
+
+        prompt = build_hint_prompt(question.question_text, question.question_type, previous_attempt)
+        async for chunk in self.cached_llm.stream(prompt):
+            yield chunk
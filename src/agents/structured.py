@@ -0,0 +1,222 @@
+"""
+Structured LLM Output
+JSON schemas for generated questions, an incremental parser that yields each
+question object the moment it is complete in a stream, and validation
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MIN_OPTIONS = 3
+MAX_OPTIONS = 5
+
+QUESTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "question_text": {"type": "string"},
+        "options": {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": MAX_OPTIONS,
+            "maxItems": MAX_OPTIONS,
+        },
+        "correct_answer": {"type": "string"},
+        "explanation": {"type": "string"},
+    },
+    "required": ["question_text", "options", "correct_answer", "explanation"],
+    "additionalProperties": False,
+}
+
+BATCH_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"questions": {"type": "array", "items": QUESTION_SCHEMA}},
+    "required": ["questions"],
+    "additionalProperties": False,
+}
+
+_LETTER_RE = re.compile(r"^\(?([A-Ea-e])[\).:]?$")
+
+
+def schema_instructions(schema: Dict[str, Any]) -> str:
+    """Prompt text describing the required output, for servers that can't enforce schemas"""
+    return (
+        "Respond with JSON only (no markdown, no commentary) that matches this JSON schema:\n"
+        + json.dumps(schema, separators=(",", ":"))
+        + "\nPut any passage or context inside question_text, copy correct_answer exactly "
+        "from options, and use explanation for the worked solution."
+    )
+
+
+def retry_note(reasons: List[str]) -> str:
+    """Prompt suffix for a retry, naming what was wrong with the rejected output"""
+    if not reasons:
+        return ""
+    unique = list(dict.fromkeys(reasons))[:3]
+    return "\n\nA previous answer was rejected (" + "; ".join(unique) + "). Avoid that mistake."
+
+
+# ============================================================================
+# Incremental Parser
+# ============================================================================
+
+class StreamingObjectParser:
+    """
+    Pull JSON objects out of streamed text as soon as each one closes
+
+    Works on a character state machine, so it doesn't care how the stream is
+    chunked or laid out. It yields:
+    - items of a top-level array ([{...}, {...}]) or of an array directly
+      inside a top-level object ({"questions": [{...}, {...}]})
+    - top-level objects that contained no such items (single-object and
+      JSON Lines responses)
+
+    Objects nested deeper (e.g. an item's "options": [{...}]) stay part of
+    their item. Malformed objects are skipped; `malformed` counts them. Text
+    outside JSON (markdown fences, chatter) is ignored. Text is joined only
+    to decode an object and dropped once nothing can still need it, so a
+    long stream costs time in proportion to its length.
+    """
+
+    # Open containers under which a new object is one we may yield
+    _ITEM_PARENTS = ([], ["["], ["{", "["])
+
+    def __init__(self):
+        self._chunks: List[str] = []  # Fed text from _offset on
+        self._offset = 0            # Absolute position of the first char in _chunks
+        self._end = 0               # Absolute position after the last fed char
+        self._stack: List[str] = []  # '{' / '[' for open containers
+        self._starts: List[Optional[int]] = []  # Start offset of objects we may yield
+        self._root_had_items = False
+        self._in_string = False
+        self._escape = False
+        self.malformed = 0
+        self.objects = 0
+
+    def feed(self, chunk: str) -> Iterator[Dict[str, Any]]:
+        base = self._end
+        self._end += len(chunk)
+        self._chunks.append(chunk)
+        for i, char in enumerate(chunk):
+            position = base + i
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"' and self._stack:
+                self._in_string = True
+            elif char in "{[":
+                if not self._stack:
+                    self._discard(position)    # Chatter or an earlier top-level value
+                    self._root_had_items = False
+                if char == "{":
+                    self._starts.append(position if self._stack in self._ITEM_PARENTS else None)
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                opener = self._stack.pop()
+                if opener == "{" and char == "}":
+                    start = self._starts.pop()
+                    if start is None or (not self._stack and self._root_had_items):
+                        continue
+                    obj = self._decode(start, position + 1)
+                    if obj is not None:
+                        if self._stack:
+                            # An item: the top-level value won't be decoded now, so its text so far can go
+                            self._root_had_items = True
+                            self._discard(position + 1)
+                        yield obj
+                elif opener != {"}": "{", "]": "["}[char]:
+                    # Mismatched bracket: resynchronise at the top level
+                    self.malformed += 1
+                    self._reset_structure()
+        if not self._stack:
+            self._chunks = []
+            self._offset = self._end
+
+    def close(self) -> Iterator[Dict[str, Any]]:
+        """Nothing can complete after the stream ends; returns no objects"""
+        self._reset_structure()
+        self._chunks = []
+        self._offset = self._end
+        return iter(())
+
+    def _decode(self, start: int, end: int) -> Optional[Dict[str, Any]]:
+        text = "".join(self._chunks)
+        self._chunks = [text]
+        try:
+            obj = json.loads(text[start - self._offset:end - self._offset])
+        except ValueError:
+            self.malformed += 1
+            return None
+        if not isinstance(obj, dict):
+            return None
+        self.objects += 1
+        return obj
+
+    def _discard(self, upto: int):
+        text = "".join(self._chunks)[upto - self._offset:]
+        self._chunks = [text] if text else []
+        self._offset = upto
+
+    def _reset_structure(self):
+        self._stack.clear()
+        self._starts.clear()
+        self._root_had_items = False
+        self._in_string = False
+        self._escape = False
+
+
+# ============================================================================
+# Validation
+# ============================================================================
+
+def _correct_index(options: List[str], answer: str) -> Optional[int]:
+    for i, option in enumerate(options):
+        if option.strip().lower() == answer.strip().lower():
+            return i
+    letter = _LETTER_RE.match(answer.strip())
+    if letter:
+        index = ord(letter.group(1).upper()) - 65
+        return index if index < len(options) else None
+    return None
+
+
+def check_generated(item: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate one generated question object
+
+    Returns (cleaned fields, None) or (None, reason); the reason is fed back
+    into the retry prompt so the model can avoid the same mistake.
+    """
+    text = item.get("question_text") or item.get("question")
+    options = item.get("options")
+    answer = item.get("correct_answer") or item.get("answer")
+    if not isinstance(text, str) or not text.strip():
+        return None, "question_text missing"
+    if not isinstance(answer, str) or not answer.strip():
+        return None, "correct_answer missing"
+    if not isinstance(options, list) or not MIN_OPTIONS <= len(options) <= MAX_OPTIONS:
+        return None, f"options must be a list of {MAX_OPTIONS} strings"
+    options = [str(o).strip() for o in options]
+    if any(not o for o in options):
+        return None, "options must not be empty"
+    if len({o.lower() for o in options}) != len(options):
+        return None, "options must all be different"
+
+    index = _correct_index(options, answer)
+    if index is None:
+        return None, "correct_answer must be exactly one of the options"
+
+    explanation = item.get("explanation")
+    return {
+        "question_text": text.strip(),
+        "options": options,
+        "correct_answer": options[index],
+        "correct_index": index,
+        "explanation": explanation.strip() if isinstance(explanation, str) else None,
+    }, None
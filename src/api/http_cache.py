@@ -0,0 +1,110 @@
+"""
+HTTP Caching Helpers
+ETag / Cache-Control responses and precompressed bodies for immutable content
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Responses smaller than this aren't worth compressing (headers dominate)
+GZIP_MINIMUM_SIZE = 1000
+# Dynamic responses are compressed per request, so favour speed over ratio
+GZIP_DYNAMIC_LEVEL = 6
+# Precompressed bodies are compressed once and reused, so use the best ratio
+GZIP_STATIC_LEVEL = 9
+
+NO_STORE = "no-store"
+
+
+def cache_control(max_age: int, immutable: bool = False, private: bool = False) -> str:
+    """Build a Cache-Control header value"""
+    parts = ["private" if private else "public", f"max-age={max_age}"]
+    if immutable:
+        parts.append("immutable")
+    return ", ".join(parts)
+
+
+class PrecompressedCache:
+    """Small thread-safe LRU of gzip bodies keyed by ETag"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, etag: str, body: bytes) -> bytes:
+        with self._lock:
+            compressed = self._entries.get(etag)
+            if compressed is not None:
+                self._entries.move_to_end(etag)
+                return compressed
+
+        compressed = gzip.compress(body, compresslevel=GZIP_STATIC_LEVEL, mtime=0)
+
+        with self._lock:
+            self._entries[etag] = compressed
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+precompressed_cache = PrecompressedCache()
+
+
+def _encode(content: Any) -> bytes:
+    # Same encoding as FastAPI's default JSONResponse
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def cached_json_response(
+    request: Request,
+    content: Any,
+    cache_control_value: str,
+    precompress: bool = False,
+    status_code: int = 200,
+) -> Response:
+    """
+    Serialize content to JSON with an ETag and Cache-Control header
+
+    Returns 304 when the client already holds the current version. With
+    precompress=True the gzip body is cached by ETag, so repeat requests for
+    immutable payloads are never recompressed (GZipMiddleware leaves
+    already-encoded responses alone).
+    """
+    body = _encode(content)
+    etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+    headers = {"ETag": etag, "Cache-Control": cache_control_value}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if precompress and len(body) >= GZIP_MINIMUM_SIZE and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        body = precompressed_cache.get_or_compress(etag, body)
+
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,165 @@
+"""
+Job Handlers
+The background jobs the API can run (see src.core.jobs): LLM generation,
+template mimicking, JSON import, validation and static pack export - the
+same work as the CLI scripts, with progress and cancellation
+"""
+
+import asyncio
+import zlib
+from contextlib import aclosing
+from typing import Any, Dict
+
+from src.agents.generation import GenerationPipeline
+from src.agents.llm_client import create_llm_client
+from src.core.database import Question, SessionLocal, engine
+from src.core.jobs import JobContext, job_handler
+from src.question_bank import mimic, static_packs
+from settings import settings
+
+# Validation results keep every count but only this many flagged questions
+MAX_REPORTED_ISSUES = 200
+
+
+def database_path() -> str:
+    """File behind the engine, for the sqlite3-based tools"""
+    if engine.url.get_backend_name() != "sqlite":
+        raise RuntimeError("This job needs the SQLite database")
+    return engine.url.database
+
+
+@job_handler("generate", restartable=False)
+def generate_questions(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """LLM generation; each question is saved as soon as it passes validation"""
+    count = int(params.get("count", 10))
+    stream_args = (
+        params["subject"], params["question_type"], count,
+        int(params.get("difficulty", 3)), params.get("exam_type", "11plus_gl"),
+    )
+
+    async def run() -> Dict[str, Any]:
+        client = create_llm_client()
+        pipeline = GenerationPipeline(
+            client, concurrency=settings.llm_generation_concurrency, per_call=settings.llm_questions_per_call,
+        )
+        db = SessionLocal()
+        created = []
+        try:
+            ctx.progress(0, count, "Generating")
+            async with aclosing(pipeline.stream(*stream_args)) as rows:
+                async for row in rows:
+                    db.add(Question(**row))
+                    db.commit()
+                    created.append(row["id"])
+                    ctx.progress(len(created), count)
+        finally:
+            db.close()
+            await client.close()
+        if not created and pipeline.stats.failed_calls:
+            raise RuntimeError("Question generator unavailable")
+        return {
+            "created": len(created),
+            "question_ids": created,
+            "calls": pipeline.stats.calls,
+            "failed_calls": pipeline.stats.failed_calls,
+            "rejected": pipeline.stats.rejected,
+        }
+
+    return asyncio.run(run())
+
+
+@job_handler("mimic")
+def mimic_questions(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Template variants of many questions, saved to the bank (no LLM calls)
+
+    Takes question_ids, or question_type for every question of that type,
+    and count variants of each; questions no template fits are counted as skipped.
+    Each question's variants are seeded from the job's seed (default: its id),
+    so a restarted run makes the same variants and save_variants skips those
+    already saved.
+    """
+    count = int(params.get("count", 10))
+    seed = params.get("seed", ctx.job_id)
+    db = SessionLocal()
+    created = skipped = 0
+    try:
+        query = db.query(Question)
+        if params.get("question_ids"):
+            query = query.filter(Question.id.in_(params["question_ids"]))
+        elif params.get("question_type"):
+            query = query.filter(Question.question_type == params["question_type"])
+        else:
+            raise ValueError("mimic needs question_ids or question_type")
+        sources = [mimic.question_dict(q) for q in query.order_by(Question.pk)]
+        for number, source in enumerate(sources):
+            ctx.progress(number, len(sources), "Mimicking")
+            source_seed = zlib.crc32(f"{seed}:{source['id']}".encode())
+            template, variants = mimic.mimic(source, count, source_seed)
+            if template is None:
+                skipped += 1
+                continue
+            created += len(mimic.save_variants(db, variants))
+    finally:
+        db.close()
+    ctx.progress(len(sources), len(sources), "Done")
+    return {"sources": len(sources), "skipped": skipped, "created": created}
+
+
+@job_handler("import")
+def import_questions(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Import data/questions/*.json (all_questions.json first); existing ids are skipped, so reruns are safe"""
+    from scripts.import_questions import DATA_DIR, import_from_file
+
+    files = sorted(DATA_DIR.rglob("*.json"), key=lambda path: (path.name != "all_questions.json", str(path)))
+    db = SessionLocal()
+    imported = 0
+    try:
+        for number, path in enumerate(files):
+            ctx.progress(number, len(files), f"Importing {path.name}")
+            imported += import_from_file(path, db)
+        total = db.query(Question).count()
+    finally:
+        db.close()
+    ctx.progress(len(files), len(files), "Done")
+    return {"files": len(files), "imported": imported, "total_questions": total}
+
+
+@job_handler("validate")
+def validate_questions(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Automated answer checks from scripts/validate_questions.py over the whole bank"""
+    from scripts.validate_questions import QuestionValidator
+
+    validator = QuestionValidator(database_path())
+    conn = validator.connect()
+    passed = 0
+    issues = []
+    by_confidence: Dict[str, int] = {}
+    try:
+        total = conn.execute("SELECT count(*) FROM questions").fetchone()[0]
+        for number, row in enumerate(conn.execute("SELECT * FROM questions"), 1):
+            result = validator.validate_question(dict(row))
+            by_confidence[result["confidence"]] = by_confidence.get(result["confidence"], 0) + 1
+            if result["valid"]:
+                passed += 1
+            else:
+                issues.append(result)
+            ctx.progress(number, total)
+    finally:
+        conn.close()
+    return {
+        "checked": total,
+        "passed": passed,
+        "flagged": len(issues),
+        "by_confidence": by_confidence,
+        "issues": issues[:MAX_REPORTED_ISSUES],
+    }
+
+
+@job_handler("export_packs")
+def export_packs(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Static question packs (scripts/export_static_packs.py) into static_pack_dir"""
+    return static_packs.export_packs(
+        database_path(), settings.static_pack_dir, force=bool(params.get("force")),
+        progress=lambda done, total: ctx.progress(done, total, "Exporting packs"),
+    )
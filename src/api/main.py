@@ -3,25 +3,59 @@
 FastAPI backend for the 11+ exam preparation platform
 """
 
+import asyncio
+import json
 import os
 import sys
+import time
+import threading
 from pathlib import Path
-from typing import List, Optional
-from datetime import datetime
-import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
 
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.core.database import get_db, init_db, Question as DBQuestion, Attempt as DBAttempt
+from src.core.database import get_db, init_db, engine, Question as DBQuestion, Attempt as DBAttempt
 from src.core.database import Student as DBStudent, TopicProgress as DBTopicProgress
+from src.core.database import QuestionHint as DBQuestionHint, QuestionStats as DBQuestionStats, SessionLocal
+from src.core.database import ArchivedAttemptTotals, record_question_attempt, student_pk, tagged_questions
+from src.core.database import Job as DBJob, SyncBatch, save_question_hint
+from src.core import jobs, sync
+from src.core.jobs import JobRunner
+from src.question_bank import mimic, nvr
+from src.question_bank import static_packs
+from src.question_bank.pack import QuestionPack
+from src.question_bank.search import SearchError, SearchFilters, search_questions
+from src.api.http_cache import (
+    cached_json_response, cache_control, NO_STORE, GZIP_MINIMUM_SIZE, GZIP_DYNAMIC_LEVEL,
+)
+from src.api.metrics import (
+    MetricsMiddleware, instrument_engine, render_metrics, PROMETHEUS_CONTENT_TYPE,
+    QUERY_COUNT_HEADER, QUERY_TIME_HEADER,
+)
+from src.api import jobs as job_handlers    # Registers the job kinds
+from src.api.sse import SSEGZipMiddleware, llm_events, sse_event, sse_response
+from src.agents.llm_cache import create_llm_cache
+from src.agents.llm_client import LLMClient, LLMError, create_llm_client
+from src.agents.generation import GenerationPipeline
+from src.agents.practice_agent import HINT_PROMPT_VERSION, PracticeAgent, build_hint_prompt
+from src.question_bank.models import Question, ExamType, Subject, Difficulty, QuestionFormat
+from src.tools.worksheets import QuestionPool, POOL_COLUMNS, render_worksheet, worksheet_title
 from sqlalchemy.orm import Session
 from settings import settings
 
+# numpy, yaml and httpx are imported on first use (or by warm_caches after
+# startup), keeping them off the cold-start path
+if TYPE_CHECKING:
+    from src.knowledge.semantic_index import EmbeddingClient, SemanticIndex
+
 # ============================================================================
 # Pydantic Models
 # ============================================================================
@@ -34,7 +68,7 @@ class QuestionResponse(BaseModel):
     question_type: str
     difficulty: int
     question_text: str
-    options: Optional[List[str]]
+    options: Optional[List[Any]]  # Strings, or NVR scene dicts when nvr_format=scene
     marks_available: int
     hint: Optional[str] = None
 
@@ -68,8 +102,45 @@ class AnswerResult(BaseModel):
 class GenerateRequest(BaseModel):
     subject: str
     question_type: str
-    difficulty: int = 3
-    count: int = 1
+    difficulty: int = Field(default=3, ge=1, le=5)
+    count: int = Field(default=1, ge=1, le=50)
+
+
+class MimicRequest(BaseModel):
+    count: int = Field(default=10, ge=1, le=1000)
+    save: bool = False
+    seed: Optional[int] = None    # Same seed, same variants
+
+
+class MimicJobRequest(BaseModel):
+    question_ids: Optional[List[str]] = None
+    question_type: Optional[str] = None
+    count: int = Field(default=10, ge=1, le=1000)    # Variants per question, as for MimicRequest
+    seed: Optional[int] = None    # Defaults to the job id, so a restarted run repeats its variants
+
+
+class EvaluationRequest(BaseModel):
+    question_id: str
+    answer: str = Field(min_length=1, max_length=5000)
+
+
+class MistakeQuery(BaseModel):
+    question_id: str
+    answer: Optional[str] = Field(default=None, max_length=500)
+    limit: int = Field(default=3, ge=1, le=10)
+
+
+class SyncAttempt(BaseModel):
+    question_id: str
+    answer: str
+    time_taken_seconds: int = 0
+    answered_at: Optional[datetime] = None    # When it was answered offline (default: now)
+
+
+class SyncUpload(BaseModel):
+    student_id: str
+    batch_id: str = Field(min_length=1, max_length=64)    # Client-chosen; retries reuse it
+    attempts: List[SyncAttempt] = Field(max_length=500)
 
 
 class StudentProgress(BaseModel):
@@ -98,17 +169,72 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", QUERY_COUNT_HEADER, QUERY_TIME_HEADER],
 )
 
+# Compress large payloads (comprehension passages, NVR SVG), but not event streams
+app.add_middleware(SSEGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_DYNAMIC_LEVEL)
+
+# Latency / SQL / size metrics (outermost, so sizes are measured as sent)
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware, debug_header=settings.metrics_debug_header)
+
 
 # ============================================================================
 # Startup
 # ============================================================================
 
+# Set on shutdown so a scheduled backup isn't started while the process exits
+_backup_stop = threading.Event()
+
+# Background job workers (None when job_workers is 0)
+_job_runner: Optional[JobRunner] = None
+
+
 @app.on_event("startup")
 async def startup():
-    """Initialize database on startup"""
+    """Apply the schema if it changed, then warm caches without delaying readiness"""
+    global _job_runner
     init_db()
+    threading.Thread(target=warm_caches, name="warm-caches", daemon=True).start()
+    if settings.backup_interval_hours > 0 and engine.url.get_backend_name() == "sqlite":
+        from src.core.backup import backup_loop
+
+        threading.Thread(
+            target=backup_loop, name="backup", daemon=True,
+            args=(engine.url.database, settings.backup_dir, settings.backup_interval_hours,
+                  settings.backup_keep, _backup_stop),
+        ).start()
+    if settings.job_workers > 0:
+        _job_runner = JobRunner(workers=settings.job_workers)
+        _job_runner.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    _backup_stop.set()
+    if _job_runner is not None:
+        # Running jobs are interrupted and queued again for the next start
+        await asyncio.to_thread(_job_runner.stop)
+
+
+def warm_caches():
+    """Load what the first requests would otherwise pay for (runs in a worker thread)"""
+    start = time.perf_counter()
+    try:
+        get_semantic_index()
+        for path in STRATEGIES_DIR.glob("*.yaml"):
+            load_content(path)
+        db = SessionLocal()
+        try:
+            get_worksheet_pool(db)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"Cache warm-up failed: {e}")
+        return
+    print(f"Caches warmed in {(time.perf_counter() - start) * 1000:.0f} ms")
 
 
 # ============================================================================
@@ -130,77 +256,165 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return Response(
+        content=render_metrics(),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+        headers={"Cache-Control": NO_STORE},
+    )
+
+
 # ============================================================================
 # Questions Endpoints
 # ============================================================================
 
+# "svg" expands NVR scenes server-side; "scene" returns the compact scene JSON
+NVR_FORMAT_PATTERN = "^(svg|scene)$"
+
+# ?tag=a&tag=b matches questions with all of them
+MAX_TAG_FILTERS = 5
+
+
+_question_pack: Optional[QuestionPack] = None
+
+
+def get_question_pack() -> Optional[QuestionPack]:
+    """
+    Pack named by settings.question_pack, or None to read questions from the DB
+
+    The read-only serving mode for low-power devices: memory-mapped, so
+    opening it costs nothing; reopened after a rebuild.
+    """
+    global _question_pack
+    if not settings.question_pack:
+        return None
+    try:
+        mtime = os.stat(settings.question_pack).st_mtime
+    except FileNotFoundError:
+        return None
+    if _question_pack is None or _question_pack.mtime != mtime:
+        _question_pack = QuestionPack.load(settings.question_pack)
+    return _question_pack
+
+
+def present_question(question: DBQuestion, model=QuestionResponse, nvr_format: str = "svg"):
+    """Serialize a question, rendering NVR scenes to SVG unless raw scenes were requested"""
+    data = model.model_validate(question)
+    if question.subject == "non_verbal_reasoning" and nvr_format == "svg":
+        data.question_text, data.options = nvr.render_question(question.question_text, question.options)
+    return data
+
+
+def filter_by_tags(db: Session, query, tags: Optional[List[str]]):
+    """Keep questions carrying every given tag (index lookups on question_tags, no JSON parsing)"""
+    tags = [tag for tag in tags or [] if tag.strip()]
+    if not tags:
+        return query
+    return query.filter(DBQuestion.pk.in_(tagged_questions(db, tags)))
+
+
 @app.get("/api/questions", response_model=List[QuestionResponse])
 async def get_questions(
+    request: Request,
     subject: Optional[str] = None,
     question_type: Optional[str] = None,
     difficulty: Optional[int] = None,
+    tag: Optional[List[str]] = Query(default=None, max_length=MAX_TAG_FILTERS),
     exam_type: str = "11plus_gl",
     limit: int = Query(default=10, le=100),
     offset: int = 0,
+    nvr_format: str = Query(default="svg", pattern=NVR_FORMAT_PATTERN),
     db: Session = Depends(get_db)
 ):
     """Get questions from the question bank"""
-    query = db.query(DBQuestion).filter(DBQuestion.exam_type == exam_type)
-
-    if subject:
-        query = query.filter(DBQuestion.subject == subject)
-    if question_type:
-        query = query.filter(DBQuestion.question_type == question_type)
-    if difficulty:
-        query = query.filter(DBQuestion.difficulty == difficulty)
-
-    questions = query.offset(offset).limit(limit).all()
-    return questions
+    pack = get_question_pack()
+    if pack is not None:
+        filters = {"exam_type": exam_type, "subject": subject, "question_type": question_type, "difficulty": difficulty}
+        questions = pack.select(filters, tag or (), offset=offset, limit=limit)
+    else:
+        query = db.query(DBQuestion).filter(DBQuestion.exam_type == exam_type)
+
+        if subject:
+            query = query.filter(DBQuestion.subject == subject)
+        if question_type:
+            query = query.filter(DBQuestion.question_type == question_type)
+        if difficulty:
+            query = query.filter(DBQuestion.difficulty == difficulty)
+        query = filter_by_tags(db, query, tag)
+
+        questions = query.offset(offset).limit(limit).all()
+    return cached_json_response(
+        request,
+        [present_question(q, nvr_format=nvr_format) for q in questions],
+        cache_control(settings.content_cache_max_age),
+    )
 
 
 @app.get("/api/questions/count")
 async def get_question_count(
     subject: Optional[str] = None,
     question_type: Optional[str] = None,
+    tag: Optional[List[str]] = Query(default=None, max_length=MAX_TAG_FILTERS),
     exam_type: str = "11plus_gl",
     db: Session = Depends(get_db)
 ):
     """Get total count of questions"""
+    pack = get_question_pack()
+    if pack is not None:
+        filters = {"exam_type": exam_type, "subject": subject, "question_type": question_type}
+        return {"count": pack.count_matching(filters, tag or ())}
+
     query = db.query(DBQuestion).filter(DBQuestion.exam_type == exam_type)
 
     if subject:
         query = query.filter(DBQuestion.subject == subject)
     if question_type:
         query = query.filter(DBQuestion.question_type == question_type)
+    query = filter_by_tags(db, query, tag)
 
     count = query.count()
     return {"count": count}
 
 
-@app.get("/api/questions/{question_id}", response_model=QuestionResponse)
-async def get_question(question_id: str, db: Session = Depends(get_db)):
-    """Get a specific question (without answer)"""
-    question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
-    return question
-
-
-@app.get("/api/questions/{question_id}/answer", response_model=QuestionWithAnswer)
-async def get_question_with_answer(question_id: str, db: Session = Depends(get_db)):
-    """Get a question with its answer and solution"""
-    question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
-    return question
+@app.get("/api/questions/search")
+async def search_question_bank(
+    q: str = Query(..., min_length=1, max_length=200),
+    subject: Optional[str] = None,
+    question_type: Optional[str] = None,
+    difficulty: Optional[int] = Query(default=None, ge=1, le=5),
+    exam_type: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search across question text, options, solutions and hints
+
+    Words are ANDed, "quoted phrases" are kept together and the last word
+    matches as a prefix. Results are ranked (bm25) with matches in <mark> tags.
+    Searches every exam type unless one is given (unfiltered searches never
+    leave the index).
+    """
+    filters = SearchFilters(exam_type=exam_type, subject=subject, question_type=question_type, difficulty=difficulty)
+    try:
+        found = search_questions(db, q, filters, limit=limit, offset=offset)
+    except SearchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"query": q, "limit": limit, "offset": offset, **found}
 
 
 @app.get("/api/questions/random", response_model=QuestionResponse)
 async def get_random_question(
+    response: Response,
     subject: Optional[str] = None,
     question_type: Optional[str] = None,
     difficulty: Optional[int] = None,
     exam_type: str = "11plus_gl",
+    nvr_format: str = Query(default="svg", pattern=NVR_FORMAT_PATTERN),
     db: Session = Depends(get_db)
 ):
     """Get a random question matching criteria"""
@@ -218,24 +432,522 @@ async def get_random_question(
     question = query.order_by(func.random()).first()
     if not question:
         raise HTTPException(status_code=404, detail="No questions found matching criteria")
-    return question
+    response.headers["Cache-Control"] = NO_STORE
+    return present_question(question, nvr_format=nvr_format)
+
+
+@app.get("/api/questions/{question_id}", response_model=QuestionResponse)
+async def get_question(
+    request: Request,
+    question_id: str,
+    nvr_format: str = Query(default="svg", pattern=NVR_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """Get a specific question (without answer)"""
+    pack = get_question_pack()
+    if pack is not None:
+        question = pack.get(question_id)
+    else:
+        question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return cached_json_response(
+        request,
+        present_question(question, nvr_format=nvr_format),
+        cache_control(settings.question_cache_max_age),
+        precompress=True,
+    )
+
+
+@app.get("/api/questions/{question_id}/stats")
+async def get_question_stats(question_id: str, response: Response, db: Session = Depends(get_db)):
+    """How often a question has been answered, and how well"""
+    response.headers["Cache-Control"] = NO_STORE
+
+    stats = db.query(DBQuestionStats).filter(DBQuestionStats.question_id == question_id).first()
+    if stats is None and not db.query(DBQuestion.id).filter(DBQuestion.id == question_id).first():
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    attempted = stats.times_attempted if stats else 0
+    correct = stats.times_correct if stats else 0
+    timed = stats.timed_attempts if stats else 0
+    return {
+        "question_id": question_id,
+        "times_attempted": attempted,
+        "times_correct": correct,
+        "success_rate": round(correct / attempted, 4) if attempted else None,
+        "avg_time_seconds": round(stats.total_time_seconds / timed, 1) if timed else None,
+        "updated_at": stats.updated_at.isoformat() if stats and stats.updated_at else None,
+    }
+
+
+@app.get("/api/questions/{question_id}/answer", response_model=QuestionWithAnswer)
+async def get_question_with_answer(
+    request: Request,
+    question_id: str,
+    nvr_format: str = Query(default="svg", pattern=NVR_FORMAT_PATTERN),
+    db: Session = Depends(get_db)
+):
+    """Get a question with its answer and solution"""
+    pack = get_question_pack()
+    if pack is not None:
+        question = pack.get(question_id)
+    else:
+        question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return cached_json_response(
+        request,
+        present_question(question, QuestionWithAnswer, nvr_format=nvr_format),
+        cache_control(settings.question_cache_max_age, private=True),
+        precompress=True,
+    )
+
+
+@app.get("/api/nvr/symbols")
+async def get_nvr_symbols(request: Request):
+    """Shared NVR shape library for clients that render nvr_format=scene themselves"""
+    return cached_json_response(
+        request,
+        {
+            "version": nvr.SCENE_VERSION,
+            "canvas_size": nvr.CANVAS_SIZE,
+            "defs": nvr.symbol_library(),
+        },
+        cache_control(settings.question_cache_max_age),
+    )
 
 
 # ============================================================================
-# Answer Submission
+# Static Question Packs
 # ============================================================================
 
-@app.post("/api/submit", response_model=AnswerResult)
-async def submit_answer(submission: AnswerSubmission, db: Session = Depends(get_db)):
-    """Submit an answer and get feedback"""
+# Short, so clients pick up a new export well before the files the old
+# manifest lists are deleted (they're kept for one more export)
+PACK_MANIFEST_MAX_AGE = 300
 
-    # Get the question
-    question = db.query(DBQuestion).filter(DBQuestion.id == submission.question_id).first()
+_pack_manifest: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+
+
+def load_pack_manifest() -> Optional[Dict[str, Any]]:
+    """Manifest written by scripts/export_static_packs.py, re-read when it changes"""
+    global _pack_manifest
+    path = Path(settings.static_pack_dir) / static_packs.MANIFEST_FILE
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if _pack_manifest[1] is None or _pack_manifest[0] != mtime:
+        _pack_manifest = (mtime, static_packs.load_manifest(settings.static_pack_dir))
+    return _pack_manifest[1]
+
+
+@app.get("/api/packs/manifest")
+async def get_pack_manifest(request: Request, exam_type: Optional[str] = None, subject: Optional[str] = None):
+    """
+    Where to fetch question packs from a static server
+
+    Each pack holds one (exam_type, subject, question_type, difficulty) group,
+    in the /api/questions format. Pack URLs are content-hashed and can be
+    cached indefinitely; .gz/.br variants sit next to each file.
+    """
+    manifest = load_pack_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Static packs have not been exported")
+    base_url = settings.static_pack_base_url.rstrip("/")
+    packs = [
+        {
+            **{key: pack[key] for key in ("name", "exam_type", "subject", "question_type", "difficulty", "count")},
+            "url": f"{base_url}/{pack['path']}",
+            "sha256": pack["sha256"],
+            "bytes": pack["bytes"],
+            "encodings": ["gzip"] + (["br"] if pack.get("brotli_path") else []),
+        }
+        for pack in manifest["packs"]
+        if (exam_type is None or pack["exam_type"] == exam_type) and (subject is None or pack["subject"] == subject)
+    ]
+    return cached_json_response(
+        request,
+        {"format": manifest["format"], "generated_at": manifest["generated_at"], "packs": packs},
+        cache_control(PACK_MANIFEST_MAX_AGE),
+    )
+
+
+# ============================================================================
+# Hints
+# ============================================================================
+
+_llm_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Shared LLM client (one connection pool for the process)"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = create_llm_client()
+    return _llm_client
+
+
+def require_feature(feature: str, detail: str):
+    """403 unless a (paid) feature is enabled; checked before any live LLM call"""
+    if not settings.get_enabled_features()[feature]:
+        raise HTTPException(status_code=403, detail=detail)
+
+
+@app.get("/api/questions/{question_id}/hint")
+async def get_question_hint(request: Request, question_id: str, db: Session = Depends(get_db)):
+    """
+    Get a hint (and explanation when available) for a question
+
+    Authored hints come first, then text precomputed by
+    scripts/precompute_hints.py for the configured model. Only a miss goes to
+    the LLM live, and its answer is stored so the next student gets a row read.
+    """
+    question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    stored = db.get(DBQuestionHint, (question_id, settings.llm_model, HINT_PROMPT_VERSION))
+    hint = question.hint or (stored.hint if stored else None)
+    explanation = stored.explanation if stored else None
+    source = "authored" if question.hint else "precomputed"
+
+    if not hint:
+        if question.subject == "non_verbal_reasoning":
+            raise HTTPException(status_code=404, detail="No hint available for this question")
+        require_feature("ai_tutor", "AI hints are not enabled")
+        try:
+            # Through the response cache, so concurrent misses for a question make one call
+            hint = await get_practice_agent().cached_llm.generate(
+                build_hint_prompt(question.question_text, question.question_type), temperature=0.3
+            )
+        except LLMError:
+            raise HTTPException(status_code=503, detail="Hint service unavailable, please try again")
+        source = "live"
+        save_question_hint(db, question_id, settings.llm_model, HINT_PROMPT_VERSION, hint)
+        db.commit()
+
+    return cached_json_response(
+        request,
+        {"question_id": question_id, "hint": hint, "explanation": explanation, "source": source},
+        cache_control(settings.content_cache_max_age, private=True),
+    )
+
+
+@app.post("/api/generate", response_model=List[QuestionResponse])
+async def generate_questions(payload: GenerateRequest, db: Session = Depends(get_db)):
+    """
+    Generate new questions with the LLM and add them to the bank
+
+    Batched prompts, concurrent calls and streamed parsing (see
+    src.agents.generation); questions are saved as they pass validation.
+    """
+    require_feature("ai_generation", "AI question generation is not enabled")
+
+    pipeline = GenerationPipeline(
+        get_llm_client(),
+        concurrency=settings.llm_generation_concurrency,
+        per_call=settings.llm_questions_per_call,
+    )
+    created = []
+    async for row in pipeline.stream(payload.subject, payload.question_type, payload.count, payload.difficulty):
+        question = DBQuestion(**row)
+        db.add(question)
+        created.append(question)
+    db.commit()
+
+    if not created and pipeline.stats.failed_calls:
+        raise HTTPException(status_code=503, detail="Question generator unavailable, please try again")
+    return [present_question(q) for q in created]
+
+
+# ============================================================================
+# Question Mimic
+# ============================================================================
+
+# Most questions one mimic asks the LLM for when no template fits
+MIMIC_LLM_MAX = 20
+# Most reference questions one websocket session works through
+MIMIC_MAX_REFERENCES = 200
+
+
+async def mimic_question(
+    db: Session, source: Dict[str, Any], count: int, save: bool = False, seed: Optional[int] = None,
+) -> Tuple[str, Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Variants of a question: (method, template, questions)
+
+    Template variants come from src.question_bank.mimic with no LLM call;
+    only a question no template fits goes to the LLM, and only when AI
+    generation is enabled (method "none" otherwise).
+    """
+    template, variants = await asyncio.to_thread(mimic.mimic, source, count, seed)
+    method = "template"
+    if template is None:
+        if not settings.get_enabled_features()["ai_generation"]:
+            return "none", None, []
+        pipeline = GenerationPipeline(
+            get_llm_client(),
+            concurrency=settings.llm_generation_concurrency,
+            per_call=settings.llm_questions_per_call,
+        )
+        variants = [
+            {"marks_available": 1, **row} async for row in pipeline.stream(
+                source["subject"], source["question_type"], min(count, MIMIC_LLM_MAX),
+                source.get("difficulty") or 3, source.get("exam_type") or "11plus_gl",
+            )
+        ]
+        method = "llm"
+    if save:
+        variants = mimic.save_variants(db, variants)
+    return method, template.describe() if template else None, variants
+
+
+@app.post("/api/questions/{question_id}/mimic")
+async def mimic_bank_question(question_id: str, payload: MimicRequest, db: Session = Depends(get_db)):
+    """
+    Generate questions like an existing one, with answers and worked solutions
+
+    Sequences, letter sequences, code words, arithmetic and fraction sums are
+    cloned from their inferred template (thousands per second, each answer
+    re-checked); other questions fall back to the LLM when it's enabled.
+    With save, variants are added to the bank (ones it already has are skipped).
+    """
+    question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    method, template, variants = await mimic_question(
+        db, mimic.question_dict(question), payload.count, payload.save, payload.seed,
+    )
+    if method == "none":
+        raise HTTPException(status_code=422, detail="No template fits this question and AI generation is not enabled")
+    return {
+        "question_id": question_id,
+        "method": method,
+        "template": template,
+        "saved": payload.save,
+        "questions": [QuestionWithAnswer.model_validate(v) for v in variants],
+    }
+
+
+def load_reference_questions(paper_path: str) -> List[Dict[str, Any]]:
+    """Questions from a JSON file or directory under data/questions (the import format)"""
+    from scripts.import_questions import DATA_DIR, question_fields
+
+    root = DATA_DIR.resolve()
+    path = (root / paper_path).resolve()
+    if not path.is_relative_to(root) or not path.exists():
+        raise ValueError(f"No question file or directory {paper_path!r} under data/questions")
+    references = []
+    for file in sorted(path.rglob("*.json")) if path.is_dir() else [path]:
+        data = json.loads(file.read_text())
+        references += [question_fields(q) for q in (data if isinstance(data, list) else [data])]
+    return references
+
+
+@app.websocket("/api/v1/question/mimic")
+async def mimic_questions_ws(websocket: WebSocket):
+    """
+    Mimic a set of reference questions, streaming each result (the web app's mimic mode)
+
+    The first message picks the references: {"question_ids": [...]} for bank
+    questions, or {"mode": "parsed", "paper_path": ...} for a question JSON
+    file/directory under data/questions; "max_questions" caps how many are
+    used, "variants_per_question" (default 1) and "save" are optional. PDF
+    uploads aren't supported - there's no paper parser in this app.
+    """
+    await websocket.accept()
+    db = SessionLocal()
+    try:
+        request = await websocket.receive_json()
+        await websocket.send_json({"type": "status", "stage": "init", "content": "Initializing Mimic Generator..."})
+        limit = min(int(request.get("max_questions") or MIMIC_MAX_REFERENCES), MIMIC_MAX_REFERENCES)
+        per_question = max(1, min(int(request.get("variants_per_question") or 1), 50))
+        if request.get("question_ids"):
+            ids = list(request["question_ids"])[:limit]
+            found = {q.id: q for q in db.query(DBQuestion).filter(DBQuestion.id.in_(ids))}
+            references = [mimic.question_dict(found[i]) for i in ids if i in found]
+        elif request.get("mode") == "parsed" and request.get("paper_path"):
+            await websocket.send_json({"type": "status", "stage": "parsing", "content": "Loading reference questions..."})
+            try:
+                references = (await asyncio.to_thread(load_reference_questions, request["paper_path"]))[:limit]
+            except (ValueError, json.JSONDecodeError) as e:
+                await websocket.send_json({"type": "error", "content": str(e)})
+                return
+        else:
+            await websocket.send_json({
+                "type": "error",
+                "content": "Send question_ids, or a question file under data/questions as paper_path; "
+                           "PDF papers can't be parsed",
+            })
+            return
+
+        total = len(references)
+        await websocket.send_json({
+            "type": "progress", "stage": "extracting", "status": "complete", "current": 0,
+            "total_questions": total, "message": f"{total} reference questions",
+            "reference_questions": [q["question_text"] for q in references],
+        })
+        successful = failed = 0
+        for index, reference in enumerate(references, 1):
+            await websocket.send_json({"type": "question_update", "index": index, "status": "generating"})
+            method, _, variants = await mimic_question(db, reference, per_question, bool(request.get("save")))
+            if not variants:
+                failed += 1
+                error = "No template fits this question" if method == "none" else "Generation failed"
+                await websocket.send_json({
+                    "type": "question_update", "index": index, "status": "failed", "error": error, "current": index,
+                })
+                continue
+            successful += 1
+            for variant in variants:
+                await websocket.send_json({
+                    "type": "result",
+                    "index": index,
+                    "current": index,
+                    "total": total,
+                    "question": jsonable_encoder(QuestionWithAnswer.model_validate(variant)),
+                    "validation": {"decision": "approve", "method": method},
+                    "rounds": 1,
+                    "reference_question": reference["question_text"],
+                    "extended": False,
+                })
+        await websocket.send_json({"type": "summary", "successful": successful, "failed": failed, "total_reference": total})
+        await websocket.send_json({"type": "complete"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        db.close()
+
+
+# ============================================================================
+# Streaming Tutor (SSE)
+# ============================================================================
+
+_practice_agent: Optional[PracticeAgent] = None
+
+
+def get_practice_agent() -> PracticeAgent:
+    """Shared agent on the shared LLM client, with the response cache"""
+    global _practice_agent
+    if _practice_agent is None:
+        _practice_agent = PracticeAgent(get_llm_client(), cache=create_llm_cache(), model=settings.llm_model)
+    return _practice_agent
+
+
+def agent_question(question: DBQuestion, hint: Optional[str] = None) -> Question:
+    """Convert a DB row to the agent's Question"""
+    return Question(
+        id=question.id,
+        exam_type=ExamType(question.exam_type),
+        subject=Subject(question.subject),
+        topic=question.topic or "general",
+        subtopic=question.subtopic,
+        question_type=question.question_type,
+        difficulty=Difficulty(question.difficulty or 3),
+        format=QuestionFormat.MULTIPLE_CHOICE if question.options else QuestionFormat.SHORT_ANSWER,
+        question_text=question.question_text,
+        context=question.context,
+        options=question.options,
+        correct_answer=question.correct_answer,
+        correct_answer_index=question.correct_index,
+        marks_available=question.marks_available or 1,
+        mark_scheme=question.mark_scheme,
+        worked_solution=question.worked_solution,
+        hint=hint or question.hint,
+    )
+
+
+def save_live_hint(question_id: str, hint: str):
+    """Store a streamed hint (own session: the request's may already be closed)"""
+    db = SessionLocal()
+    try:
+        save_question_hint(db, question_id, settings.llm_model, HINT_PROMPT_VERSION, hint)
+        db.commit()
+    finally:
+        db.close()
+
+
+@app.get("/api/questions/{question_id}/hint/stream")
+async def stream_question_hint(
+    request: Request,
+    question_id: str,
+    previous_attempt: Optional[str] = Query(None, max_length=500),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream a hint as Server-Sent Events
+
+    Stored hints arrive as a single token; otherwise tokens are forwarded as
+    the model writes them. Events: meta, token..., done (or error).
+    """
+    question = db.query(DBQuestion).filter(DBQuestion.id == question_id).first()
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
-    # Check answer - multiple methods for different question types
-    submitted_answer = submission.answer.strip()
+    stored = None if previous_attempt else db.get(DBQuestionHint, (question_id, settings.llm_model, HINT_PROMPT_VERSION))
+    hint = question.hint or (stored.hint if stored else None)
+    if not hint and question.subject == "non_verbal_reasoning":
+        raise HTTPException(status_code=404, detail="No hint available for this question")
+
+    if previous_attempt:
+        source, on_complete = "live", None
+    elif hint:
+        source, on_complete = ("authored" if question.hint else "precomputed"), None
+    else:
+        source, on_complete = "live", lambda text: save_live_hint(question_id, text)
+    if source == "live":
+        require_feature("ai_tutor", "AI hints are not enabled")
+
+    chunks = get_practice_agent().stream_hint(agent_question(question, hint), previous_attempt)
+    return sse_response(llm_events(
+        request, chunks, meta={"question_id": question_id, "source": source}, on_complete=on_complete,
+    ))
+
+
+@app.get("/api/explain/stream")
+async def stream_concept_explanation(
+    request: Request,
+    topic: str = Query(..., min_length=1, max_length=200),
+    subject: str = "verbal_reasoning",
+):
+    """Stream an age-appropriate explanation of a concept as Server-Sent Events"""
+    require_feature("ai_explanations", "AI explanations are not enabled")
+    try:
+        subject_enum = Subject(subject)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown subject: {subject}")
+
+    chunks = get_practice_agent().stream_explanation(topic, subject_enum)
+    return sse_response(llm_events(request, chunks, meta={"topic": topic, "subject": subject}))
+
+
+@app.post("/api/evaluate/stream")
+async def stream_answer_evaluation(request: Request, payload: EvaluationRequest, db: Session = Depends(get_db)):
+    """
+    Stream marking feedback for a written answer as Server-Sent Events
+
+    Multiple-choice questions are marked without the LLM and return a single
+    token. Nothing is recorded; use /api/submit for that.
+    """
+    question = db.query(DBQuestion).filter(DBQuestion.id == payload.question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    if not question.options:
+        require_feature("ai_tutor", "AI marking is not enabled")
+
+    chunks = get_practice_agent().stream_evaluation(agent_question(question), payload.answer)
+    return sse_response(llm_events(request, chunks, meta={"question_id": payload.question_id}))
+
+
+# ============================================================================
+# Answer Submission
+# ============================================================================
+
+def check_answer(question: DBQuestion, answer: str) -> bool:
+    """Mark an answer - multiple methods for different question types"""
+    submitted_answer = answer.strip()
     correct_answer = question.correct_answer.strip()
     is_correct = False
 
@@ -249,7 +961,8 @@ async def submit_answer(submission: AnswerSubmission, db: Session = Depends(get_
 
         # If submitted answer matches option at correct_index
         if question.correct_index < len(options):
-            correct_option = options[question.correct_index]
+            # NVR options are stored as scenes; clients submit the SVG they were shown
+            correct_option = nvr.render_value(options[question.correct_index])
             if submitted_answer == correct_option:
                 is_correct = True
             # Also check case-insensitive for text options
@@ -262,13 +975,25 @@ async def submit_answer(submission: AnswerSubmission, db: Session = Depends(get_
             if answer_index == question.correct_index:
                 is_correct = True
 
+    return is_correct
+
+
+@app.post("/api/submit", response_model=AnswerResult)
+async def submit_answer(submission: AnswerSubmission, db: Session = Depends(get_db)):
+    """Submit an answer and get feedback"""
+
+    # Get the question
+    question = db.query(DBQuestion).filter(DBQuestion.id == submission.question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    is_correct = check_answer(question, submission.answer)
     marks = question.marks_available if is_correct else 0
 
-    # Record the attempt
+    # Record the attempt (public ids are translated to the integer keys attempts store)
     attempt = DBAttempt(
-        id=str(uuid.uuid4()),
-        student_id=submission.student_id,
-        question_id=question.id,
+        student_pk=student_pk(db, submission.student_id, create=True),
+        question_pk=question.pk,
         student_answer=submission.answer,
         time_taken_seconds=submission.time_taken_seconds,
         is_correct=is_correct,
@@ -277,10 +1002,9 @@ async def submit_answer(submission: AnswerSubmission, db: Session = Depends(get_
     )
     db.add(attempt)
 
-    # Update question statistics (handle None values from newly generated questions)
-    question.times_attempted = (question.times_attempted or 0) + 1
-    if is_correct:
-        question.times_correct = (question.times_correct or 0) + 1
+    # Statistics live in question_stats; the question row itself is never written
+    # (time_taken_seconds defaults to 0 when the client didn't time the answer)
+    record_question_attempt(db, question.id, is_correct, submission.time_taken_seconds or None)
 
     db.commit()
 
@@ -305,12 +1029,34 @@ async def submit_answer(submission: AnswerSubmission, db: Session = Depends(get_
 # ============================================================================
 
 @app.get("/api/progress/{student_id}")
-async def get_progress(student_id: str, db: Session = Depends(get_db)):
+async def get_progress(student_id: str, response: Response, db: Session = Depends(get_db)):
     """Get student's overall progress"""
-
-    attempts = db.query(DBAttempt).filter(DBAttempt.student_id == student_id).all()
-
-    if not attempts:
+    response.headers["Cache-Control"] = NO_STORE
+
+    from sqlalchemy import func, case
+
+    pk = student_pk(db, student_id)
+    rows = []
+    if pk is not None:
+        rows = (
+            db.query(
+                DBQuestion.subject,
+                func.count(DBAttempt.id),
+                func.sum(case((DBAttempt.is_correct, 1), else_=0)),
+            )
+            .join(DBAttempt, DBAttempt.question_pk == DBQuestion.pk)
+            .filter(DBAttempt.student_pk == pk)
+            .group_by(DBQuestion.subject)
+            .all()
+        )
+        # Attempts moved to the archive (scripts/archive_attempts.py) still count
+        rows += (
+            db.query(ArchivedAttemptTotals.subject, ArchivedAttemptTotals.attempted, ArchivedAttemptTotals.correct)
+            .filter(ArchivedAttemptTotals.student_pk == pk)
+            .all()
+        )
+
+    if not rows:
         return {
             "student_id": student_id,
             "total_attempted": 0,
@@ -320,19 +1066,14 @@ async def get_progress(student_id: str, db: Session = Depends(get_db)):
             "recent_activity": []
         }
 
-    total = len(attempts)
-    correct = sum(1 for a in attempts if a.is_correct)
-
     # Group by subject
-    subjects = {}
-    for attempt in attempts:
-        question = db.query(DBQuestion).filter(DBQuestion.id == attempt.question_id).first()
-        if question:
-            if question.subject not in subjects:
-                subjects[question.subject] = {"attempted": 0, "correct": 0}
-            subjects[question.subject]["attempted"] += 1
-            if attempt.is_correct:
-                subjects[question.subject]["correct"] += 1
+    subjects: Dict[str, Dict[str, int]] = {}
+    for subject, attempted, correct in rows:
+        totals = subjects.setdefault(subject, {"attempted": 0, "correct": 0})
+        totals["attempted"] += attempted
+        totals["correct"] += correct or 0
+    total = sum(s["attempted"] for s in subjects.values())
+    correct = sum(s["correct"] for s in subjects.values())
 
     return {
         "student_id": student_id,
@@ -343,6 +1084,272 @@ async def get_progress(student_id: str, db: Session = Depends(get_db)):
     }
 
 
+# ============================================================================
+# Sync (offline clients)
+# ============================================================================
+
+# Lesson files as last scanned into the change log: (path, mtime) pairs
+_lesson_scan_signature: Optional[Tuple] = None
+
+
+def scan_lesson_files(db: Session):
+    """Log lesson file changes, rescanning only when a file was added, removed or touched"""
+    global _lesson_scan_signature
+    signature = tuple((key, path.stat().st_mtime_ns) for key, path in sync.lesson_files(LESSONS_DIR).items())
+    if signature != _lesson_scan_signature:
+        sync.scan_lessons(db, LESSONS_DIR)
+        _lesson_scan_signature = signature
+
+
+def sync_payload(entity: str, row: Any, nvr_format: str) -> Any:
+    if entity == sync.ENTITY_QUESTION:
+        return present_question(row, QuestionWithAnswer, nvr_format).model_dump()
+    if entity == sync.ENTITY_LESSON:
+        return {"subject": row.parent.name, "topic": row.stem, **load_content(row)}
+    return row
+
+
+@app.get("/api/sync")
+async def get_changes(
+    response: Response,
+    since: int = Query(default=0, ge=0),
+    student_id: Optional[str] = None,
+    since_attempt: int = Query(default=0, ge=0),
+    limit: int = Query(default=sync.DEFAULT_PAGE_SIZE, ge=1, le=sync.MAX_PAGE_SIZE),
+    nvr_format: str = Query(default="svg", pattern=NVR_FORMAT_PATTERN),
+    db: Session = Depends(get_db),
+):
+    """
+    Everything that changed after version `since`, oldest first
+
+    Shared content (questions, lessons) plus, with student_id, that student's
+    progress, and in `attempts` their attempts with an id above since_attempt.
+    Call again with since=version and since_attempt=attempt_id until has_more
+    is false. Questions include their answers so offline practice can be
+    marked on the device. reset=true means the server is behind the client
+    (e.g. a restored backup): discard local data and sync from 0.
+    """
+    response.headers["Cache-Control"] = NO_STORE
+    scan_lesson_files(db)
+
+    latest = sync.latest_version(db)
+    if since > latest or (student_id and since_attempt > sync.latest_attempt(db)):
+        return {"since": since, "version": 0, "latest": latest, "attempt_id": 0, "reset": True,
+                "has_more": False, "changes": [], "attempts": []}
+
+    pk = student_pk(db, student_id) if student_id else None
+    page, has_more = sync.read_changes(db, since, pk, limit)
+    attempts, more_attempts = sync.read_attempts(db, pk, since_attempt, limit) if pk is not None else ([], False)
+
+    live: Dict[str, List[str]] = {}
+    for change in page:
+        if not change.deleted and change.entity != sync.ENTITY_LESSON:
+            live.setdefault(change.entity, []).append(change.key)
+    rows = {entity: sync.load_rows(db, entity, keys) for entity, keys in live.items()}
+    rows[sync.ENTITY_LESSON] = sync.lesson_files(LESSONS_DIR)
+
+    changes = []
+    for change in page:
+        item = {"version": change.version, "entity": change.entity, "id": change.key, "deleted": change.deleted}
+        if not change.deleted:
+            row = rows[change.entity].get(change.key)
+            if row is None:
+                continue    # Gone since the log was read; a later version says so
+            item["data"] = sync_payload(change.entity, row, nvr_format)
+        changes.append(item)
+
+    return {
+        "since": since,
+        "version": page[-1].version if page else since,
+        "latest": latest,
+        "attempt_id": attempts[-1]["id"] if attempts else since_attempt,
+        "reset": False,
+        "has_more": has_more or more_attempts,
+        "changes": changes,
+        "attempts": attempts,
+    }
+
+
+@app.post("/api/sync/attempts")
+async def upload_attempts(upload: SyncUpload, db: Session = Depends(get_db)):
+    """
+    Apply a batch of attempts made offline, all or nothing
+
+    Answers are marked here, the same way as /api/submit. Re-sending a
+    batch_id that was already applied changes nothing (duplicate=true), so
+    clients can retry after a dropped connection.
+    """
+    from sqlalchemy.exc import IntegrityError
+
+    def duplicate(batch: SyncBatch) -> Dict[str, Any]:
+        return {"batch_id": batch.batch_id, "duplicate": True, "applied": batch.attempts, "skipped": [], "results": []}
+
+    pk = student_pk(db, upload.student_id, create=True)
+    applied = db.get(SyncBatch, (pk, upload.batch_id))
+    if applied is not None:
+        return duplicate(applied)
+
+    ids = {item.question_id for item in upload.attempts}
+    questions = {q.id: q for q in db.query(DBQuestion).filter(DBQuestion.id.in_(ids))}
+    now = datetime.utcnow()
+    results, attempts, skipped = [], [], []
+    for index, item in enumerate(upload.attempts):
+        question = questions.get(item.question_id)
+        if question is None:
+            skipped.append(item.question_id)
+            continue
+        answered_at = item.answered_at
+        if answered_at is not None and answered_at.tzinfo is not None:
+            answered_at = answered_at.astimezone(timezone.utc).replace(tzinfo=None)
+        is_correct = check_answer(question, item.answer)
+        attempt = DBAttempt(
+            student_pk=pk,
+            question_pk=question.pk,
+            timestamp=min(answered_at or now, now),    # Device clocks can run ahead
+            student_answer=item.answer,
+            time_taken_seconds=item.time_taken_seconds,
+            is_correct=is_correct,
+            marks_awarded=question.marks_available if is_correct else 0,
+            marks_available=question.marks_available,
+        )
+        db.add(attempt)
+        attempts.append(attempt)
+        record_question_attempt(db, question.id, is_correct, item.time_taken_seconds or None)
+        results.append({"index": index, "question_id": question.id, "is_correct": is_correct,
+                        "marks_awarded": attempt.marks_awarded})
+    db.add(SyncBatch(student_pk=pk, batch_id=upload.batch_id, attempts=len(results)))
+
+    try:
+        db.flush()
+        for result, attempt in zip(results, attempts):
+            result["attempt_id"] = attempt.id
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        applied = db.get(SyncBatch, (pk, upload.batch_id))
+        if applied is None:
+            raise
+        return duplicate(applied)    # The same batch was applied by a concurrent request
+
+    return {"batch_id": upload.batch_id, "duplicate": False, "applied": len(results), "skipped": skipped,
+            "results": results}
+
+
+# ============================================================================
+# Background Jobs
+# ============================================================================
+
+# Seconds between polls of a job's row while streaming its progress
+JOB_EVENTS_INTERVAL = 0.5
+
+
+class JobRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+def job_or_404(db: Session, job_id: str) -> DBJob:
+    job = db.get(DBJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(payload: JobRequest, db: Session = Depends(get_db)):
+    """Queue a background job (generate, mimic, import, validate, export_packs); poll or stream it by id"""
+    from pydantic import ValidationError
+
+    if payload.kind not in jobs.job_kinds():
+        raise HTTPException(status_code=400, detail=f"Unknown job kind; expected one of {jobs.job_kinds()}")
+    params = payload.params
+    if payload.kind == "generate":
+        require_feature("ai_generation", "AI question generation is not enabled")
+        try:
+            params = GenerateRequest.model_validate(params).model_dump()
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    elif payload.kind == "mimic":
+        try:
+            params = MimicJobRequest.model_validate(params).model_dump(exclude_none=True)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+        if not params.get("question_ids") and not params.get("question_type"):
+            raise HTTPException(status_code=422, detail="mimic needs question_ids or question_type")
+
+    job = jobs.enqueue_job(db, payload.kind, params)
+    if _job_runner is not None:
+        _job_runner.notify()
+    return jobs.job_dict(job)
+
+
+@app.get("/api/jobs")
+async def list_jobs(
+    response: Response,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """Recent jobs, newest first"""
+    response.headers["Cache-Control"] = NO_STORE
+    query = db.query(DBJob)
+    if status:
+        query = query.filter(DBJob.status == status)
+    if kind:
+        query = query.filter(DBJob.kind == kind)
+    return {"jobs": [jobs.job_dict(job) for job in query.order_by(DBJob.created_at.desc()).limit(limit)]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, response: Response, db: Session = Depends(get_db)):
+    response.headers["Cache-Control"] = NO_STORE
+    return jobs.job_dict(job_or_404(db, job_id))
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    """Cancel a queued job, or stop a running one at its next progress report"""
+    job_or_404(db, job_id)
+    job = jobs.request_cancel(db, job_id)
+    if _job_runner is not None:
+        _job_runner.cancel(job_id)
+    return jobs.job_dict(job)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job(request: Request, job_id: str, db: Session = Depends(get_db)):
+    """
+    A job's progress as Server-Sent Events
+
+    A "progress" event whenever the job changes, then "done" with the
+    finished job (status succeeded, failed or cancelled).
+    """
+    job_or_404(db, job_id)
+
+    async def events():
+        last = None
+        while not await request.is_disconnected():
+            session = SessionLocal()
+            try:
+                job = session.get(DBJob, job_id)
+                data = jsonable_encoder(jobs.job_dict(job)) if job is not None else None
+            finally:
+                session.close()
+            if data is None:
+                yield sse_event({"detail": "Job not found"}, "error")
+                return
+            finished = data["status"] in jobs.FINISHED
+            if finished or data != last:
+                yield sse_event(data, "done" if finished else "progress")
+                last = data
+            if finished:
+                return
+            await asyncio.sleep(JOB_EVENTS_INTERVAL)
+
+    return sse_response(events())
+
+
 # ============================================================================
 # Question Types Info
 # ============================================================================
@@ -408,42 +1415,126 @@ async def get_config():
     }
 
 
+# ============================================================================
+# Worksheets
+# ============================================================================
+
+_worksheet_pool: Optional[QuestionPool] = None
+_worksheet_pool_size = -1
+
+
+def get_worksheet_pool(db: Session) -> QuestionPool:
+    """Printable questions held in memory, reloaded when the bank changes size"""
+    global _worksheet_pool, _worksheet_pool_size
+
+    total = db.query(DBQuestion).count()
+    if _worksheet_pool is None or total != _worksheet_pool_size:
+        rows = db.query(*[getattr(DBQuestion, column) for column in POOL_COLUMNS]).all()
+        _worksheet_pool = QuestionPool(row._asdict() for row in rows)
+        _worksheet_pool_size = total
+    return _worksheet_pool
+
+
+def get_weak_question_types(db: Session, student_id: str, limit: int = 3, min_attempts: int = 3) -> List[str]:
+    """A student's lowest-accuracy question types"""
+    from sqlalchemy import func, case
+
+    pk = student_pk(db, student_id)
+    if pk is None:
+        return []
+    attempted = func.count(DBAttempt.id)
+    correct = func.sum(case((DBAttempt.is_correct, 1), else_=0))
+    rows = (
+        db.query(DBQuestion.question_type)
+        .join(DBAttempt, DBAttempt.question_pk == DBQuestion.pk)
+        .filter(DBAttempt.student_pk == pk)
+        .group_by(DBQuestion.question_type)
+        .having(attempted >= min_attempts)
+        .order_by(correct * 1.0 / attempted)
+        .limit(limit)
+        .all()
+    )
+    return [question_type for (question_type,) in rows]
+
+
+@app.get("/api/worksheet")
+async def get_worksheet(
+    subject: Optional[str] = None,
+    question_type: Optional[str] = None,
+    count: int = Query(default=20, ge=1, le=100),
+    student_id: Optional[str] = None,
+    answers: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Stream a printable HTML worksheet, personalised to weak topics when student_id is given"""
+    pool = get_worksheet_pool(db)
+
+    weak_types = get_weak_question_types(db, student_id) if student_id else []
+    if weak_types:
+        questions = pool.sample_personalised(count, weak_types)
+    else:
+        questions = pool.sample(count, subject=subject, question_type=question_type)
+
+    if not questions:
+        raise HTTPException(status_code=404, detail="No questions found matching criteria")
+
+    return StreamingResponse(
+        render_worksheet(questions, worksheet_title(subject, question_type), include_answers=answers),
+        media_type="text/html; charset=utf-8",
+        headers={"Cache-Control": NO_STORE},
+    )
+
+
 # ============================================================================
 # Strategy Guides Endpoints
 # ============================================================================
 
-import yaml
-from pathlib import Path as FilePath
+STRATEGIES_DIR = Path(__file__).parent.parent.parent / "data" / "strategies"
+LESSONS_DIR = Path(__file__).parent.parent.parent / "data" / "lessons"
+
+# Parsed YAML content by path, with the mtime it was read at
+_content_cache: Dict[Path, Tuple[float, Any]] = {}
+
+
+def load_content(path: Path) -> Any:
+    """Parse a strategy/lesson YAML file, reusing the parse until the file changes"""
+    import yaml
 
-STRATEGIES_DIR = FilePath(__file__).parent.parent.parent / "data" / "strategies"
-LESSONS_DIR = FilePath(__file__).parent.parent.parent / "data" / "lessons"
+    mtime = path.stat().st_mtime
+    cached = _content_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r") as f:
+            cached = (mtime, yaml.safe_load(f))
+        _content_cache[path] = cached
+    return cached[1]
 
 
 @app.get("/api/strategies")
-async def get_strategies():
+async def get_strategies(request: Request):
     """Get list of all strategy guides"""
     strategies = []
 
     if STRATEGIES_DIR.exists():
         for file in STRATEGIES_DIR.glob("*.yaml"):
             try:
-                with open(file, "r") as f:
-                    data = yaml.safe_load(f)
-                    strategies.append({
-                        "question_type": data.get("question_type"),
-                        "subject": data.get("subject"),
-                        "title": data.get("title"),
-                        "is_free": data.get("is_free", True),
-                        "difficulty_range": data.get("difficulty_range"),
-                    })
+                data = load_content(file)
+                strategies.append({
+                    "question_type": data.get("question_type"),
+                    "subject": data.get("subject"),
+                    "title": data.get("title"),
+                    "is_free": data.get("is_free", True),
+                    "difficulty_range": data.get("difficulty_range"),
+                })
             except Exception as e:
                 print(f"Error loading strategy {file}: {e}")
 
-    return {"strategies": strategies}
+    return cached_json_response(
+        request, {"strategies": strategies}, cache_control(settings.content_cache_max_age)
+    )
 
 
 @app.get("/api/strategies/{question_type}")
-async def get_strategy(question_type: str):
+async def get_strategy(request: Request, question_type: str):
     """Get a specific strategy guide"""
     file_path = STRATEGIES_DIR / f"{question_type}.yaml"
 
@@ -451,19 +1542,19 @@ async def get_strategy(question_type: str):
         raise HTTPException(status_code=404, detail=f"Strategy guide for '{question_type}' not found")
 
     try:
-        with open(file_path, "r") as f:
-            data = yaml.safe_load(f)
-            return data
+        data = load_content(file_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading strategy: {str(e)}")
 
+    return cached_json_response(request, data, cache_control(settings.content_cache_max_age))
+
 
 # ============================================================================
 # Learning Content Endpoints
 # ============================================================================
 
 @app.get("/api/learn/subjects")
-async def get_learn_subjects():
+async def get_learn_subjects(request: Request):
     """Get subjects available for learning with topic counts"""
     # Define the learning structure
     subjects = [
@@ -522,46 +1613,152 @@ async def get_learn_subjects():
         }
     ]
 
-    return {"subjects": subjects}
+    return cached_json_response(
+        request, {"subjects": subjects}, cache_control(settings.content_cache_max_age)
+    )
 
 
 @app.get("/api/learn/{subject}/{topic}")
-async def get_lesson(subject: str, topic: str):
+async def get_lesson(request: Request, subject: str, topic: str):
     """Get lesson content for a specific topic"""
     # First check if there's a YAML file for this lesson
     lesson_file = LESSONS_DIR / subject / f"{topic}.yaml"
 
     if lesson_file.exists():
         try:
-            with open(lesson_file, "r") as f:
-                return yaml.safe_load(f)
+            lesson = load_content(lesson_file)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error loading lesson: {str(e)}")
+        return cached_json_response(request, lesson, cache_control(settings.content_cache_max_age))
 
     # If no lesson file, check if there's a corresponding strategy guide
     strategy_file = STRATEGIES_DIR / f"{topic}.yaml"
     if strategy_file.exists():
         try:
-            with open(strategy_file, "r") as f:
-                data = yaml.safe_load(f)
-                # Convert strategy to lesson format
-                return {
-                    "subject": subject,
-                    "topic": topic,
-                    "title": data.get("title", topic.replace("_", " ").title()),
-                    "explanation": data.get("what_is_it", ""),
-                    "key_points": data.get("approach", []),
-                    "worked_examples": data.get("worked_examples", []),
-                    "tips": data.get("time_tips", []),
-                    "common_mistakes": data.get("common_mistakes", []),
-                    "is_free": data.get("is_free", True),
-                }
+            data = load_content(strategy_file)
+            # Convert strategy to lesson format
+            lesson = {
+                "subject": subject,
+                "topic": topic,
+                "title": data.get("title", topic.replace("_", " ").title()),
+                "explanation": data.get("what_is_it", ""),
+                "key_points": data.get("approach", []),
+                "worked_examples": data.get("worked_examples", []),
+                "tips": data.get("time_tips", []),
+                "common_mistakes": data.get("common_mistakes", []),
+                "is_free": data.get("is_free", True),
+            }
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error loading content: {str(e)}")
+        return cached_json_response(request, lesson, cache_control(settings.content_cache_max_age))
 
     raise HTTPException(status_code=404, detail=f"Lesson for '{subject}/{topic}' not found")
 
 
+# ============================================================================
+# Semantic Search
+# ============================================================================
+
+_semantic_index: Optional["SemanticIndex"] = None
+_embedding_client: Optional["EmbeddingClient"] = None
+
+
+def get_semantic_index() -> Optional["SemanticIndex"]:
+    """Index built by scripts/build_embeddings.py (memory-mapped; reloaded after a rebuild)"""
+    from src.knowledge.semantic_index import MANIFEST_FILE, SemanticIndex
+
+    global _semantic_index
+    try:
+        mtime = (Path(settings.embedding_index_dir) / MANIFEST_FILE).stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if _semantic_index is None or _semantic_index.manifest_mtime != mtime:
+        _semantic_index = SemanticIndex.load(settings.embedding_index_dir)
+    return _semantic_index
+
+
+def require_semantic_index() -> "SemanticIndex":
+    index = get_semantic_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Semantic search is not available yet")
+    return index
+
+
+def get_embedding_client(model: str) -> "EmbeddingClient":
+    """Shared embedding client for the model the index was built with"""
+    from src.knowledge.semantic_index import create_embedding_client
+
+    global _embedding_client
+    if _embedding_client is None or _embedding_client.model != model:
+        _embedding_client = create_embedding_client(model=model)
+    return _embedding_client
+
+
+@app.get("/api/questions/{question_id}/similar", response_model=List[QuestionResponse])
+async def get_similar_questions(
+    question_id: str,
+    limit: int = Query(default=5, ge=1, le=20),
+    db: Session = Depends(get_db),
+):
+    """More questions like this one (nearest neighbours by stored embedding, no model call)"""
+    from src.knowledge.semantic_index import KIND_QUESTION
+
+    index = require_semantic_index()
+    doc_id = f"{KIND_QUESTION}:{question_id}"
+    vector = index.vector(doc_id)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="Question not found in the search index")
+
+    hits = index.search(vector, limit, kinds=[KIND_QUESTION], exclude=[doc_id])
+    ids = [hit_id.split(":", 1)[1] for hit_id, _ in hits]
+    rows = {q.id: q for q in db.query(DBQuestion).filter(DBQuestion.id.in_(ids))}
+    return [present_question(rows[i]) for i in ids if i in rows]
+
+
+@app.post("/api/lessons/for-mistake")
+async def find_lessons_for_mistake(payload: MistakeQuery, db: Session = Depends(get_db)):
+    """
+    Lessons and strategy guides that best match a question the student got wrong
+
+    The question is embedded together with the wrong answer; if the embedding
+    service is unreachable, the question's stored vector is used instead.
+    """
+    from src.knowledge.semantic_index import KIND_QUESTION, KIND_LESSON, KIND_STRATEGY, question_document
+
+    index = require_semantic_index()
+    question = db.query(DBQuestion).filter(DBQuestion.id == payload.question_id).first()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    text = question_document({
+        "id": question.id, "subject": question.subject, "question_type": question.question_type,
+        "question_text": question.question_text, "options": question.options,
+    }).text
+    if payload.answer:
+        text += f"\nStudent answered: {payload.answer}"
+    try:
+        query = (await get_embedding_client(index.model).embed([text]))[0]
+    except LLMError:
+        query = index.vector(f"{KIND_QUESTION}:{question.id}")
+        if query is None:
+            raise HTTPException(status_code=503, detail="Semantic search is not available right now")
+
+    results = []
+    for doc_id, score in index.search(query, payload.limit, kinds=[KIND_LESSON, KIND_STRATEGY]):
+        kind = doc_id.split(":", 1)[0]
+        meta = index.meta.get(doc_id, {})
+        subject, topic = meta.get("subject"), meta.get("topic")
+        results.append({
+            "kind": kind,
+            "subject": subject,
+            "topic": topic,
+            "title": meta.get("title"),
+            "score": round(score, 4),
+            "url": f"/api/learn/{subject}/{topic}" if kind == KIND_LESSON else f"/api/strategies/{topic}",
+        })
+    return {"question_id": question.id, "results": results}
+
+
 # ============================================================================
 # Run
 # ============================================================================
@@ -0,0 +1,257 @@
+"""
+Request Metrics
+Per-route latency, SQL query counts/time and response sizes in Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Label used for requests that matched no route, so 404 scans can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+# Request header that asks for the per-request query count in the response, and
+# the values that turn it on
+DEBUG_REQUEST_HEADER = "x-debug-queries"
+DEBUG_REQUEST_VALUES = {b"1", b"true", b"yes", b"on"}
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_TIME_HEADER = "X-Query-Time-Ms"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# ============================================================================
+# Metric Types
+# ============================================================================
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            label_text = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text}le="{_format_value(bound)}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{label_text}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text.rstrip(',')}}} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{{{label_text.rstrip(',')}}} {cumulative}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge:
+    """A single unlabelled value that goes up and down"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value)}",
+        ]
+
+    def clear(self):
+        with self._lock:
+            self.value = 0
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    # Trailing comma so the caller can append le="..."
+    return "".join(f'{name}="{_escape_label(value)}",' for name, value in zip(names, values))
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+REQUEST_LABELS = ("method", "route", "status")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency by route", REQUEST_LABELS, LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    "http_response_size_bytes", "Response body size on the wire by route", REQUEST_LABELS, SIZE_BUCKETS,
+)
+request_queries = Histogram(
+    "db_queries_per_request", "SQL statements executed per request by route", ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+request_query_time = Histogram(
+    "db_query_duration_seconds", "Total SQL time per request by route", ("method", "route"), LATENCY_BUCKETS,
+)
+requests_in_progress = Gauge("http_requests_in_progress", "Requests currently being handled")
+
+METRICS = (request_duration, response_size, request_queries, request_query_time, requests_in_progress)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for metric in METRICS:
+        metric.clear()
+
+
+# ============================================================================
+# SQL Query Tracking
+# ============================================================================
+
+@dataclass
+class RequestStats:
+    """Query counters for the request currently being handled"""
+    queries: int = 0
+    query_seconds: float = 0.0
+
+
+# The middleware sets a fresh RequestStats per request. Sync endpoints run in a
+# threadpool with a copy of the context, which still points at the same object,
+# so queries issued there are counted against the right request.
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+
+def instrument_engine(engine: Engine):
+    """Count and time every statement executed through the engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ============================================================================
+# ASGI Middleware
+# ============================================================================
+
+class MetricsMiddleware:
+    """
+    Record latency, response size and SQL usage for every HTTP request
+
+    Written as plain ASGI rather than BaseHTTPMiddleware so streaming responses
+    (worksheets) pass through untouched and body size is measured as sent.
+    With debug_header on, clients that send "X-Debug-Queries: 1" get
+    X-Query-Count and X-Query-Time-Ms headers back (counted up to the moment
+    headers are sent).
+    """
+
+    def __init__(self, app, debug_header: bool = False):
+        self.app = app
+        self.debug_header = debug_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        want_debug = self.debug_header and any(
+            name == DEBUG_REQUEST_HEADER.encode() and value.strip().lower() in DEBUG_REQUEST_VALUES
+            for name, value in scope.get("headers", [])
+        )
+        status_code = 500
+        body_bytes = 0
+        start = time.perf_counter()
+        requests_in_progress.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if want_debug:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.queries).encode()))
+                    headers.append((
+                        QUERY_TIME_HEADER.lower().encode(),
+                        f"{stats.query_seconds * 1000:.2f}".encode(),
+                    ))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_progress.dec()
+            _current_request.reset(token)
+
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope.get("method", "")
+            request_duration.observe((method, route_label, str(status_code)), elapsed)
+            response_size.observe((method, route_label, str(status_code)), body_bytes)
+            request_queries.observe((method, route_label), stats.queries)
+            request_query_time.observe((method, route_label), stats.query_seconds)
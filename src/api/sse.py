@@ -0,0 +1,106 @@
+"""
+Server-Sent Events
+Forward LLM output to the browser token by token
+"""
+
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+
+from src.agents.llm_client import LLMError
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# no-store: tutor text is per request; X-Accel-Buffering: stop nginx buffering the stream
+SSE_HEADERS = {"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+
+# Placeholder encoding that makes GZipMiddleware pass a response through
+_PASS_ENCODING = (b"content-encoding", b"identity")
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Format one SSE message (JSON data, so newlines in tokens survive)"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def llm_events(
+    request: Request,
+    chunks: AsyncIterator[str],
+    meta: Optional[Dict[str, Any]] = None,
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    Relay an LLM stream as SSE
+
+    Events: "meta" (optional, first), one "token" per chunk, then "done" with
+    the full text, or "error" if the LLM fails mid-stream. When the client
+    disconnects the upstream LLM stream is closed, which stops generation on
+    the model server; on_complete only runs for complete responses.
+    """
+    parts = []
+    try:
+        if meta is not None:
+            yield sse_event(meta, "meta")
+        async for chunk in chunks:
+            if await request.is_disconnected():
+                return
+            parts.append(chunk)
+            yield sse_event({"text": chunk}, "token")
+        text = "".join(parts).strip()
+        if on_complete and text:
+            on_complete(text)
+        yield sse_event({"text": text}, "done")
+    except LLMError:
+        yield sse_event({"detail": "Tutor service unavailable, please try again"}, "error")
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+class SSEGZipMiddleware:
+    """
+    GZipMiddleware that never compresses Server-Sent Events
+
+    Starlette only skips text/event-stream itself from 0.46; before that each
+    event sits in the compressor's buffer instead of reaching the browser.
+    Every version passes through a response that already has a
+    Content-Encoding, so event streams get a placeholder one on the way into
+    GZipMiddleware, which is removed again on the way out.
+    """
+
+    def __init__(self, app, **options):
+        self.app = app
+        self.gzip = GZipMiddleware(self._mark_streams, **options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def unmark(message):
+            if message["type"] == "http.response.start" and _PASS_ENCODING in message.get("headers", []):
+                message = {**message, "headers": [h for h in message["headers"] if h != _PASS_ENCODING]}
+            await send(message)
+
+        await self.gzip(scope, receive, unmark)
+
+    async def _mark_streams(self, scope, receive, send):
+        async def mark(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                names = {name.lower(): value for name, value in headers}
+                if names.get(b"content-type", b"").startswith(SSE_MEDIA_TYPE.encode()) \
+                        and b"content-encoding" not in names:
+                    message = {**message, "headers": headers + [_PASS_ENCODING]}
+            await send(message)
+
+        await self.app(scope, receive, mark)
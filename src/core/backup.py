@@ -0,0 +1,260 @@
+"""
+Database Backup
+Online SQLite snapshots: gzip-compressed, SHA-256 checksummed, with
+retention, verification and restore
+
+Snapshots are taken with the SQLite backup API a few pages at a time. The
+app database runs in WAL mode, so the copy reads one pinned snapshot and
+submissions carry on while a backup is in progress.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+STEP_PAGES = 256              # Pages copied per step (1 MB at the default page size)
+STEP_PAUSE_SECONDS = 0.005    # Gap between steps, so waiting writers get the lock
+MAX_RESTARTS = 3              # A write restarts a stepped copy; after this many, finish in one step
+DEFAULT_KEEP = 14
+STARTUP_DELAY_SECONDS = 60    # Scheduled backups never run while the app is still warming up
+
+SNAPSHOT_SUFFIX = ".db.gz"
+CHECKSUM_SUFFIX = ".sha256"
+_STAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+_BUFFER = 1 << 20
+
+
+class BackupError(RuntimeError):
+    """A snapshot is missing, corrupt, or doesn't match its checksum"""
+
+
+class _Restarted(Exception):
+    pass
+
+
+@dataclass
+class Snapshot:
+    path: Path
+    created: datetime
+    bytes: int
+    database_bytes: int = 0
+    seconds: float = 0.0
+    restarts: int = 0
+
+
+def _checksum_path(snapshot: Path) -> Path:
+    return snapshot.with_name(snapshot.name + CHECKSUM_SUFFIX)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_BUFFER), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _copy_database(source: str, target: Path, pages: int = STEP_PAGES) -> int:
+    """Consistent copy of a live database; returns how many times writes restarted it"""
+    state = {"remaining": None, "restarts": 0}
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > MAX_RESTARTS:
+                raise _Restarted()
+        state["remaining"] = remaining
+        if remaining:
+            time.sleep(STEP_PAUSE_SECONDS)
+
+    src = sqlite3.connect(source, timeout=30, isolation_level=None)
+    dst = sqlite3.connect(target)
+    try:
+        if src.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # In WAL mode a read transaction held across the steps pins one
+            # snapshot: writers carry on and the copy never restarts
+            src.execute("BEGIN")
+            src.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        except _Restarted:
+            # Rollback journal and writes keep landing between steps: one step
+            # holds the read lock for a single full copy instead
+            src.backup(dst, pages=-1)
+        if src.in_transaction:
+            src.execute("COMMIT")
+    finally:
+        dst.close()
+        src.close()
+    return state["restarts"]
+
+
+def _check_database(path: Path, full: bool = False):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"{path.name} is not a valid database: {e}") from e
+    finally:
+        conn.close()
+    if result != "ok":
+        raise BackupError(f"{path.name} failed its integrity check: {result}")
+
+
+def list_snapshots(backup_dir: str, db_path: str) -> List[Snapshot]:
+    """Snapshots of db_path in backup_dir, oldest first"""
+    prefix = Path(db_path).stem + "-"
+    snapshots = []
+    for path in sorted(Path(backup_dir).glob(f"{prefix}*{SNAPSHOT_SUFFIX}")):
+        try:
+            created = datetime.strptime(path.name[len(prefix):-len(SNAPSHOT_SUFFIX)], _STAMP_FORMAT)
+        except ValueError:
+            continue
+        snapshots.append(Snapshot(path=path, created=created, bytes=path.stat().st_size))
+    return snapshots
+
+
+def backup_database(db_path: str, backup_dir: str, pages: int = STEP_PAGES) -> Snapshot:
+    """
+    Snapshot a (possibly busy) database into backup_dir
+
+    The copy is quick-checked before it's compressed, and the snapshot only
+    appears under its final name once it and its .sha256 file are complete.
+    """
+    if not Path(db_path).exists():
+        raise BackupError(f"No database at {db_path}")
+    target_dir = Path(backup_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    created = datetime.utcnow().replace(microsecond=0)
+    snapshot = target_dir / f"{Path(db_path).stem}-{created.strftime(_STAMP_FORMAT)}{SNAPSHOT_SUFFIX}"
+    if snapshot.exists():
+        raise BackupError(f"{snapshot.name} already exists")
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=target_dir, prefix=".backup-") as work:
+        copy = Path(work) / "copy.db"
+        restarts = _copy_database(db_path, copy, pages)
+        _check_database(copy)
+
+        staging = Path(work) / snapshot.name
+        with open(copy, "rb") as src, gzip.open(staging, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, _BUFFER)
+        digest = _sha256(staging)
+        _checksum_path(snapshot).write_text(f"{digest}  {snapshot.name}\n")
+        database_bytes = copy.stat().st_size
+        os.replace(staging, snapshot)
+
+    return Snapshot(
+        path=snapshot, created=created, bytes=snapshot.stat().st_size, database_bytes=database_bytes,
+        seconds=time.perf_counter() - start, restarts=restarts,
+    )
+
+
+def prune_snapshots(backup_dir: str, db_path: str, keep: int = DEFAULT_KEEP) -> List[Path]:
+    """Delete all but the newest `keep` snapshots; returns what was removed"""
+    snapshots = list_snapshots(backup_dir, db_path)
+    removed = []
+    for snapshot in snapshots[:-keep] if keep > 0 else []:
+        snapshot.path.unlink()
+        _checksum_path(snapshot.path).unlink(missing_ok=True)
+        removed.append(snapshot.path)
+    return removed
+
+
+def _extract(snapshot: Path, target: Path):
+    """Decompress a snapshot after checking it against its .sha256 file"""
+    checksum = _checksum_path(snapshot)
+    if not snapshot.exists():
+        raise BackupError(f"No snapshot at {snapshot}")
+    if not checksum.exists():
+        raise BackupError(f"{snapshot.name} has no {CHECKSUM_SUFFIX} file")
+    expected = checksum.read_text().split()[0]
+    if _sha256(snapshot) != expected:
+        raise BackupError(f"{snapshot.name} doesn't match its checksum")
+    try:
+        with gzip.open(snapshot, "rb") as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, _BUFFER)
+    except (OSError, EOFError) as e:
+        raise BackupError(f"{snapshot.name} could not be decompressed: {e}") from e
+
+
+def verify_snapshot(snapshot: str) -> dict:
+    """Checksum, decompress and fully integrity-check a snapshot; returns table row counts"""
+    path = Path(snapshot)
+    with tempfile.TemporaryDirectory(dir=path.parent, prefix=".verify-") as work:
+        copy = Path(work) / "verify.db"
+        _extract(path, copy)
+        _check_database(copy, full=True)
+        conn = sqlite3.connect(f"file:{copy}?mode=ro", uri=True)
+        try:
+            # type 'table' leaves out virtual tables and their shadow tables
+            tables = sorted(
+                row[1] for row in conn.execute("PRAGMA main.table_list")
+                if row[2] == "table" and not row[1].startswith("sqlite_")
+            )
+            return {table: conn.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0] for table in tables}
+        finally:
+            conn.close()
+
+
+def restore_snapshot(snapshot: str, db_path: str, backup_dir: Optional[str] = None) -> Optional[Snapshot]:
+    """
+    Replace db_path with a verified snapshot
+
+    The current database is snapshotted into backup_dir first (when given and
+    present). The restore goes through the backup API rather than a file copy,
+    so it's safe while the app has the database open: other connections see
+    the restored contents on their next transaction.
+    """
+    path = Path(snapshot)
+    safety = None
+    with tempfile.TemporaryDirectory(dir=Path(db_path).resolve().parent, prefix=".restore-") as work:
+        copy = Path(work) / "restore.db"
+        _extract(path, copy)
+        _check_database(copy, full=True)
+        if backup_dir and Path(db_path).exists():
+            safety = backup_database(db_path, backup_dir)
+
+        src = sqlite3.connect(copy)
+        dst = sqlite3.connect(db_path, timeout=30)
+        try:
+            src.backup(dst, pages=-1)
+        finally:
+            dst.close()
+            src.close()
+    _check_database(Path(db_path))
+    return safety
+
+
+def backup_loop(db_path: str, backup_dir: str, interval_hours: float, keep: int, stop: threading.Event):
+    """
+    Take a snapshot every interval_hours until `stop` is set (runs in a worker thread)
+
+    The schedule follows the newest existing snapshot, so restarting the app
+    doesn't trigger an extra backup.
+    """
+    interval = timedelta(hours=interval_hours)
+    while True:
+        snapshots = list_snapshots(backup_dir, db_path)
+        due = snapshots[-1].created + interval if snapshots else datetime.utcnow()
+        wait = max((due - datetime.utcnow()).total_seconds(), STARTUP_DELAY_SECONDS)
+        if stop.wait(wait):
+            return
+        try:
+            snapshot = backup_database(db_path, backup_dir)
+            prune_snapshots(backup_dir, db_path, keep)
+        except Exception as e:
+            print(f"Scheduled backup failed: {e}")
+            if stop.wait(interval.total_seconds()):
+                return
+            continue
+        print(f"Backup written: {snapshot.path.name} ({snapshot.bytes / 1e6:.1f} MB, {snapshot.seconds:.1f}s)")
@@ -4,11 +4,12 @@ SQLite database for questions, progress, and user data
 """
 
 import os
+import zlib
 from datetime import datetime
 from typing import Optional, List
 from pathlib import Path
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import create_engine, event, inspect, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
@@ -18,6 +19,13 @@ DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
 
 # Create engine
 engine = create_engine(DATABASE_URL, echo=False)
+
+if engine.url.get_backend_name() == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_wal(dbapi_connection, _record):
+        # WAL: readers (including online backups, src.core.backup) never block writers
+        dbapi_connection.execute("PRAGMA journal_mode = WAL")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -30,7 +38,8 @@ class Question(Base):
     """Question bank table"""
     __tablename__ = "questions"
 
-    id = Column(String, primary_key=True)
+    pk = Column(Integer, primary_key=True)                  # Internal key (the SQLite rowid), used for joins
+    id = Column(String, unique=True, nullable=False)        # Public id (UUID) exposed by the API
     exam_type = Column(String, nullable=False, index=True)  # 11plus_gl, gcse_aqa, etc.
     subject = Column(String, nullable=False, index=True)  # verbal_reasoning, maths, etc.
     topic = Column(String, index=True)
@@ -58,10 +67,6 @@ class Question(Base):
     tags = Column(JSON)  # List of tags
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # Statistics
-    times_attempted = Column(Integer, default=0)
-    times_correct = Column(Integer, default=0)
-
     # Relationships
     attempts = relationship("Attempt", back_populates="question")
 
@@ -70,7 +75,8 @@ class Student(Base):
     """Student profiles"""
     __tablename__ = "students"
 
-    id = Column(String, primary_key=True)
+    pk = Column(Integer, primary_key=True)                  # Internal key, used for joins
+    id = Column(String, unique=True, nullable=False)        # Public id exposed by the API
     name = Column(String)
     email = Column(String)
     age = Column(Integer)
@@ -97,9 +103,10 @@ class Attempt(Base):
     """Record of question attempts"""
     __tablename__ = "attempts"
 
-    id = Column(String, primary_key=True)
-    student_id = Column(String, ForeignKey("students.id"), nullable=False)
-    question_id = Column(String, ForeignKey("questions.id"), nullable=False)
+    # Integer keys throughout: this is the table that grows to millions of rows
+    id = Column(Integer, primary_key=True)
+    student_pk = Column(Integer, ForeignKey("students.pk"), nullable=False, index=True)
+    question_pk = Column(Integer, ForeignKey("questions.pk"), nullable=False, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     # Response
@@ -207,6 +214,149 @@ class LearningStreak(Base):
     topics_practiced = Column(JSON)
 
 
+class QuestionHint(Base):
+    """Precomputed LLM hints/explanations, versioned per model and prompt"""
+    __tablename__ = "question_hints"
+
+    question_id = Column(String, ForeignKey("questions.id"), primary_key=True)
+    model = Column(String, primary_key=True)              # LLM that produced the text
+    prompt_version = Column(Integer, primary_key=True)    # Bumped when the prompts change
+
+    hint = Column(Text)
+    explanation = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class QuestionStats(Base):
+    """
+    Answer statistics per question, kept off the questions row
+
+    Submissions only touch this narrow table (see record_question_attempt),
+    so question content is never rewritten and stays cacheable.
+    """
+    __tablename__ = "question_stats"
+
+    question_id = Column(String, ForeignKey("questions.id"), primary_key=True)
+    times_attempted = Column(Integer, nullable=False, default=0)
+    times_correct = Column(Integer, nullable=False, default=0)
+    timed_attempts = Column(Integer, nullable=False, default=0)    # Attempts that reported a time
+    total_time_seconds = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class QuestionTag(Base):
+    """
+    Question tags, one row per (tag, question), derived from questions.tags
+
+    Maintained by triggers (see create_question_tags), so every writer keeps
+    it in sync. The key leads with the tag: "questions tagged X" is an index
+    range scan rather than parsing every row's JSON.
+    """
+    __tablename__ = "question_tags"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    tag = Column(String, primary_key=True)    # Normalized: trimmed, lower-case
+    question_pk = Column(Integer, ForeignKey("questions.pk"), primary_key=True, index=True)
+
+
+class ArchivedAttemptTotals(Base):
+    """
+    Per-student, per-subject counts of attempts moved to the archive
+
+    Written in the same transaction that deletes the archived rows (see
+    src.progress.archive), so progress totals stay lifetime totals.
+    """
+    __tablename__ = "archived_attempt_totals"
+
+    student_pk = Column(Integer, ForeignKey("students.pk"), primary_key=True)
+    subject = Column(String, primary_key=True)
+    attempted = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+
+
+class AttemptArchiveFile(Base):
+    """One Parquet file of archived attempts; readers only trust files listed here"""
+    __tablename__ = "attempt_archive_files"
+
+    path = Column(String, primary_key=True)    # Relative to the archive directory
+    month = Column(String, nullable=False, index=True)    # YYYY-MM partition
+    rows = Column(Integer, nullable=False)
+    first_attempt_id = Column(Integer, nullable=False)
+    last_attempt_id = Column(Integer, nullable=False)
+    oldest = Column(DateTime, nullable=False)
+    newest = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ChangeLog(Base):
+    """
+    Sync change feed: one row per entity, holding the version of its latest change
+
+    A change replaces the entity's row with a fresh one, so versions only
+    grow (AUTOINCREMENT never reuses them) and a client that synced up to
+    version N needs exactly the rows above N. Database rows are logged by
+    triggers (see create_change_log); lessons, which are files, by
+    src.core.sync.scan_lessons.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_entity_key", "entity", "key", unique=True),
+        Index("ix_change_log_student_version", "student_pk", "version"),
+        {"sqlite_autoincrement": True},
+    )
+
+    version = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)       # question, lesson, topic_progress, ...
+    key = Column(String, nullable=False)          # The entity's public id
+    student_pk = Column(Integer)                  # Owner of per-student rows; NULL = shared content
+    deleted = Column(Boolean, nullable=False, default=False)
+    digest = Column(String)                       # Content hash, for entities that aren't rows (lessons)
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SyncBatch(Base):
+    """Offline attempt uploads already applied, so a retried upload isn't counted twice"""
+    __tablename__ = "sync_batches"
+
+    student_pk = Column(Integer, ForeignKey("students.pk"), primary_key=True)
+    batch_id = Column(String, primary_key=True)    # Chosen by the client
+    attempts = Column(Integer, nullable=False, default=0)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    """
+    Background job (generation, import, validation, export); see src.core.jobs
+
+    The table is the queue: runners claim queued rows with a conditional
+    update, and running rows carry a heartbeat so a restarted process can
+    tell dead jobs from ones another process is still working on.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_created", "status", "created_at"),)
+
+    id = Column(String, primary_key=True)                 # UUID
+    kind = Column(String, nullable=False, index=True)     # generate, import, validate, export_packs
+    params = Column(JSON)
+    status = Column(String, nullable=False, default="queued")    # queued, running, succeeded, failed, cancelled
+
+    # Progress, written by the job as it goes
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer)                      # NULL until the job knows
+    message = Column(String)
+
+    result = Column(JSON)
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)    # Runs started (interrupted runs are retried)
+    worker = Column(String)                               # Runner that claimed it: host:pid:instance
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+
+
 # ============================================================================
 # Learning Content Models
 # ============================================================================
@@ -339,10 +489,380 @@ class LessonProgress(Base):
 # Database Functions
 # ============================================================================
 
-def init_db():
-    """Initialize the database tables"""
+# Full-text index over question content: an external-content FTS5 table
+# (no second copy of the text) kept in sync by triggers. Only content
+# columns fire the update trigger, so metadata edits (tags, source) never
+# touch the index.
+QUESTION_SEARCH_TABLE = "questions_fts"
+QUESTION_SEARCH_COLUMNS = ("question_text", "options", "worked_solution", "hint")
+
+
+def _question_search_ddl() -> List[str]:
+    columns = ", ".join(QUESTION_SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{c}" for c in QUESTION_SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{c}" for c in QUESTION_SEARCH_COLUMNS)
+    table = QUESTION_SEARCH_TABLE
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            {columns}, content='questions', content_rowid='rowid',
+            tokenize='porter unicode61 remove_diacritics 2')""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON questions BEGIN
+            INSERT INTO {table}(rowid, {columns}) VALUES (new.rowid, {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON questions BEGIN
+            INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF {columns} ON questions BEGIN
+            INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO {table}(rowid, {columns}) VALUES (new.rowid, {new_values});
+        END""",
+    ]
+
+
+def create_question_search(bind=None) -> bool:
+    """
+    Create the FTS5 question index and its triggers (SQLite only)
+
+    Indexes the existing rows the first time. Returns False when the backend
+    has no FTS5.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return False
+    with bind.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (QUESTION_SEARCH_TABLE,)
+        ).first()
+        for statement in _question_search_ddl():
+            conn.exec_driver_sql(statement)
+        if not exists:
+            conn.exec_driver_sql(f"INSERT INTO {QUESTION_SEARCH_TABLE}({QUESTION_SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+# Tags are normalized the same way in SQL (triggers) and Python (normalize_tag);
+# rows whose tags aren't a valid JSON array are skipped rather than failing the write
+_TAG_ROWS = """
+    SELECT DISTINCT lower(trim(t.value)), {pk}
+    FROM {source}json_each(CASE WHEN json_valid({tags}) THEN {tags} END) AS t
+    WHERE t.type = 'text' AND trim(t.value) != ''
+"""
+
+
+# Tag frequencies are only compared, so counting stops here
+TAG_COUNT_CAP = 1000
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lower()
+
+
+def tagged_questions(db, tags: List[str]):
+    """
+    SELECT of question pks carrying every tag, for DBQuestion.pk.in_(...)
+
+    Drives from the rarest tag (capped counts, so measuring a common tag is
+    cheap); each other tag is a point lookup on the (tag, question_pk) key.
+    """
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import aliased
+
+    tags = sorted({normalize_tag(tag) for tag in tags})
+    if len(tags) > 1:
+        def capped_count(tag: str) -> int:
+            rows = select(QuestionTag.question_pk).where(QuestionTag.tag == tag).limit(TAG_COUNT_CAP).subquery()
+            return db.execute(select(func.count()).select_from(rows)).scalar()
+        tags.sort(key=capped_count)
+
+    driver = aliased(QuestionTag)
+    query = select(driver.question_pk).where(driver.tag == tags[0])
+    for tag in tags[1:]:
+        other = aliased(QuestionTag)
+        query = query.where(
+            select(other.question_pk).where(other.tag == tag, other.question_pk == driver.question_pk).exists()
+        )
+    return query
+
+
+def _question_tags_ddl() -> List[str]:
+    table = QuestionTag.__tablename__
+    new_rows = _TAG_ROWS.format(pk="new.pk", tags="new.tags", source="")
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON questions
+        WHEN new.tags IS NOT NULL BEGIN
+            INSERT OR IGNORE INTO {table}(tag, question_pk) {new_rows};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON questions BEGIN
+            DELETE FROM {table} WHERE question_pk = old.pk;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE OF tags ON questions BEGIN
+            DELETE FROM {table} WHERE question_pk = old.pk;
+            INSERT OR IGNORE INTO {table}(tag, question_pk) {new_rows};
+        END""",
+    ]
+
+
+def create_question_tags(bind=None) -> bool:
+    """
+    Create the triggers that keep question_tags in sync (SQLite json1 only)
+
+    Fills the table from questions.tags the first time. Returns False on
+    other backends.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return False
+    table = QuestionTag.__tablename__
+    with bind.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{table}_insert",)
+        ).first()
+        for statement in _question_tags_ddl():
+            conn.exec_driver_sql(statement)
+        if not exists:
+            rows = _TAG_ROWS.format(pk="q.pk", tags="q.tags", source="questions q, ")
+            conn.exec_driver_sql(f"DELETE FROM {table}")
+            conn.exec_driver_sql(f"INSERT OR IGNORE INTO {table}(tag, question_pk) {rows}")
+    return True
+
+
+# Tables logged to change_log: (table, entity, key, owning student pk). A
+# deleted row leaves a tombstone so clients drop it too. Attempts are
+# append-only with increasing ids, so sync reads them from attempts
+# directly and they aren't logged.
+_STUDENT_BY_ID = "(SELECT pk FROM students WHERE id = {row}.student_id)"
+CHANGE_LOG_SOURCES = (
+    ("questions", "question", "{row}.id", "NULL"),
+    ("topic_progress", "topic_progress", "{row}.id", _STUDENT_BY_ID),
+    ("lesson_progress", "lesson_progress", "{row}.id", _STUDENT_BY_ID),
+)
+_CHANGE_ROW = "'{entity}', {key}, {student}, {deleted}, datetime('now')"
+
+
+def _change_log_ddl() -> List[str]:
+    log = ChangeLog.__tablename__
+    columns = "entity, key, student_pk, deleted, changed_at"
+    statements = []
+    for table, entity, key, student in CHANGE_LOG_SOURCES:
+        new_row = _CHANGE_ROW.format(entity=entity, key=key, student=student, deleted=0).format(row="new")
+        old_row = _CHANGE_ROW.format(entity=entity, key=key, student=student, deleted=1).format(row="old")
+        statements += [
+            f"""CREATE TRIGGER IF NOT EXISTS {log}_{table}_insert AFTER INSERT ON {table} BEGIN
+                INSERT OR REPLACE INTO {log}({columns}) VALUES ({new_row});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {log}_{table}_update AFTER UPDATE ON {table} BEGIN
+                INSERT OR REPLACE INTO {log}({columns}) VALUES ({new_row});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {log}_{table}_delete AFTER DELETE ON {table} BEGIN
+                INSERT OR REPLACE INTO {log}({columns}) VALUES ({old_row});
+            END""",
+        ]
+    return statements
+
+
+def create_change_log(bind=None) -> bool:
+    """
+    Create the triggers that feed change_log (SQLite only)
+
+    The first time, every existing row is logged, so a client syncing from
+    version 0 gets the full set. Returns False on other backends.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return False
+    log = ChangeLog.__tablename__
+    with bind.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{log}_questions_insert",)
+        ).first()
+        for statement in _change_log_ddl():
+            conn.exec_driver_sql(statement)
+        # Earlier versions logged attempts as well
+        if conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{log}_attempts_insert",)
+        ).first():
+            for event in ("insert", "update", "delete"):
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {log}_attempts_{event}")
+            conn.exec_driver_sql(f"DELETE FROM {log} WHERE entity = 'attempt'")
+        if not exists:
+            for table, entity, key, student in CHANGE_LOG_SOURCES:
+                row = _CHANGE_ROW.format(entity=entity, key=key, student=student, deleted=0).format(row="t")
+                conn.exec_driver_sql(
+                    f"INSERT OR IGNORE INTO {log}(entity, key, student_pk, deleted, changed_at) "
+                    f"SELECT {row} FROM {table} t ORDER BY t.rowid"
+                )
+    return True
+
+
+def schema_version() -> int:
+    """Fingerprint of the declared tables, columns, indexes and trigger DDL"""
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(f"{c.name} {c.type!r} {c.nullable} {c.primary_key}" for c in table.columns)
+        parts.extend(sorted(str(index.name) for index in table.indexes))
+    parts.extend(_question_search_ddl())
+    parts.extend(_question_tags_ddl())
+    parts.extend(_change_log_ddl())
+    # PRAGMA user_version is a signed 32-bit int, and 0 means "never initialized"
+    return zlib.crc32("\n".join(parts).encode()) & 0x7FFFFFFF or 1
+
+
+# Databases from before question_stats and integer keys need these, in order
+UPGRADE_STEPS = (
+    "python scripts/migrate_question_stats.py --db {db}, "
+    "then python scripts/migrate_surrogate_keys.py --db {db}"
+)
+
+
+class LegacyDatabaseError(RuntimeError):
+    """The database has an old layout that only the migration scripts can upgrade"""
+
+
+def check_not_legacy():
+    """Stop with the upgrade steps if questions still has the pre-migration layout"""
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        if not inspector.has_table("questions"):
+            return
+        columns = {column["name"] for column in inspector.get_columns("questions")}
+    problems = []
+    if "times_attempted" in columns:
+        problems.append("answer counts are still on questions")
+    if "pk" not in columns:
+        problems.append("questions has no integer pk")
+    if problems:
+        db = engine.url.database or str(engine.url)
+        raise LegacyDatabaseError(
+            f"{db} predates the current schema ({'; '.join(problems)}). "
+            f"Back it up, run {UPGRADE_STEPS.format(db=db)}, then start the app again."
+        )
+
+
+def init_db(force: bool = False) -> bool:
+    """
+    Initialize the database tables
+
+    On SQLite the schema fingerprint is kept in PRAGMA user_version, so a
+    restart against an up-to-date database skips create_all. Returns True
+    when the schema was applied. Raises LegacyDatabaseError for a database
+    that needs the migration scripts first (see UPGRADE_STEPS).
+    """
+    version = schema_version()
+    is_sqlite = engine.dialect.name == "sqlite"
+    if is_sqlite and not force:
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA user_version").scalar() == version:
+                return False
+
+    check_not_legacy()
     Base.metadata.create_all(bind=engine)
+    create_question_search()
+    create_question_tags()
+    create_change_log()
+    if is_sqlite:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
     print(f"Database initialized at: {DB_PATH}")
+    return True
+
+
+def _upsert_insert(db):
+    """The dialect's INSERT with ON CONFLICT support, or None if it has none"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+
+def student_pk(db, student_id: str, create: bool = False) -> Optional[int]:
+    """
+    Internal key for a public student id
+
+    With create=True an unknown id gets a bare student row (clients may
+    submit answers before any profile exists), so this never returns None.
+    """
+    pk = db.query(Student.pk).filter(Student.id == student_id).scalar()
+    if pk is None and create:
+        now = datetime.utcnow()
+        row = {"id": student_id, "created_at": now, "last_active": now}
+        insert = _upsert_insert(db)
+        if insert is not None:
+            db.execute(insert(Student.__table__).values(**row).on_conflict_do_nothing(index_elements=["id"]))
+        else:
+            db.execute(Student.__table__.insert().values(**row))
+        pk = db.query(Student.pk).filter(Student.id == student_id).scalar()
+    return pk
+
+
+def record_question_attempt(db, question_id: str, is_correct: bool, time_taken_seconds: Optional[int] = None):
+    """
+    Add one attempt to a question's stats
+
+    A single upsert with in-SQL increments: no read-modify-write, so
+    concurrent submissions for a popular question can't lose counts.
+    """
+    table = QuestionStats.__table__
+    timed = time_taken_seconds is not None
+    first = {
+        "question_id": question_id,
+        "times_attempted": 1,
+        "times_correct": int(is_correct),
+        "timed_attempts": int(timed),
+        "total_time_seconds": time_taken_seconds or 0,
+        "updated_at": datetime.utcnow(),
+    }
+    increments = {
+        "times_attempted": table.c.times_attempted + 1,
+        "times_correct": table.c.times_correct + int(is_correct),
+        "timed_attempts": table.c.timed_attempts + int(timed),
+        "total_time_seconds": table.c.total_time_seconds + (time_taken_seconds or 0),
+        "updated_at": first["updated_at"],
+    }
+
+    insert = _upsert_insert(db)
+    if insert is None:
+        updated = db.execute(table.update().where(table.c.question_id == question_id).values(**increments))
+        if not updated.rowcount:
+            db.execute(table.insert().values(**first))
+        return
+    db.execute(
+        insert(table).values(**first)
+        .on_conflict_do_update(index_elements=[table.c.question_id], set_=increments)
+    )
+
+
+def save_question_hint(db, question_id: str, model: str, prompt_version: int, hint: str):
+    """
+    Store a live hint for a question
+
+    An upsert, so concurrent requests that each generated a hint for the
+    same question can't collide on the primary key (the last one wins).
+    """
+    table = QuestionHint.__table__
+    row = {
+        "question_id": question_id, "model": model, "prompt_version": prompt_version,
+        "hint": hint, "created_at": datetime.utcnow(),
+    }
+    insert = _upsert_insert(db)
+    if insert is None:
+        updated = db.execute(
+            table.update()
+            .where(table.c.question_id == question_id, table.c.model == model, table.c.prompt_version == prompt_version)
+            .values(hint=hint)
+        )
+        if not updated.rowcount:
+            db.execute(table.insert().values(**row))
+        return
+    db.execute(
+        insert(table).values(**row).on_conflict_do_update(
+            index_elements=[table.c.question_id, table.c.model, table.c.prompt_version], set_={"hint": hint},
+        )
+    )
 
 
 def get_db():
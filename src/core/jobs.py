@@ -0,0 +1,371 @@
+"""
+Background Jobs
+In-process job runner backed by the jobs table
+
+Long tasks (generation, import, validation, export) are queued as rows and
+run by a small pool of worker threads, off the request path. Jobs report
+progress and check for cancellation through their JobContext. A runner
+heartbeats the jobs it holds; a job whose heartbeat stops (the process
+died) is queued again, up to MAX_ATTEMPTS runs.
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.database import Job, SessionLocal
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+POLL_SECONDS = 2.0                # Fallback check for jobs queued by other processes
+HEARTBEAT_SECONDS = 10.0
+STALE_SECONDS = 60.0              # A running job with no heartbeat for this long has lost its runner
+PROGRESS_INTERVAL_SECONDS = 0.5   # Progress writes are throttled to one per interval
+MAX_ATTEMPTS = 3
+RETENTION_DAYS = 30               # Finished jobs older than this are deleted
+SHUTDOWN_WAIT_SECONDS = 5.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled (or the runner is stopping)"""
+
+
+class _Handler:
+    def __init__(self, fn: Callable, restartable: bool):
+        self.fn = fn
+        self.restartable = restartable
+
+
+_handlers: Dict[str, _Handler] = {}
+
+
+def job_handler(kind: str, restartable: bool = True):
+    """
+    Register fn(ctx, params) -> result (JSON-serializable) as the handler for a job kind
+
+    restartable=False for jobs that can't safely run twice: an interrupted
+    run fails instead of being queued again.
+    """
+    def register(fn):
+        _handlers[kind] = _Handler(fn, restartable)
+        return fn
+    return register
+
+
+def job_kinds() -> List[str]:
+    return sorted(_handlers)
+
+
+def job_dict(job: Job) -> Dict[str, Any]:
+    """API representation of a job row"""
+    total = job.progress_total
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params or {},
+        "progress": {
+            "current": job.progress_current,
+            "total": total,
+            "percent": round(job.progress_current / total * 100, 1) if total else None,
+            "message": job.message,
+        },
+        "result": job.result,
+        "error": job.error,
+        "cancel_requested": job.cancel_requested,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def enqueue_job(db, kind: str, params: Optional[Dict[str, Any]] = None) -> Job:
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(id=str(uuid.uuid4()), kind=kind, params=params or {}, status=QUEUED, created_at=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    return job
+
+
+def request_cancel(db, job_id: str) -> Optional[Job]:
+    """Cancel a queued job now, or ask a running one to stop; None if there's no such job"""
+    now = datetime.utcnow()
+    db.query(Job).filter(Job.id == job_id, Job.status == QUEUED).update(
+        {"status": CANCELLED, "finished_at": now, "cancel_requested": True}
+    )
+    db.query(Job).filter(Job.id == job_id, Job.status == RUNNING).update({"cancel_requested": True})
+    db.commit()
+    return db.get(Job, job_id)
+
+
+# ============================================================================
+# Context
+# ============================================================================
+
+class JobContext:
+    """What a handler sees: its job id and params, progress reporting and cancellation"""
+
+    def __init__(self, runner: "JobRunner", job_id: str, params: Dict[str, Any]):
+        self.runner = runner
+        self.job_id = job_id
+        self.params = params
+        self._cancel = threading.Event()
+        self.interrupted = False      # Set when the runner is stopping rather than the job cancelled
+        self._current = 0
+        self._total: Optional[int] = None
+        self._message: Optional[str] = None
+        self._written = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self, interrupted: bool = False):
+        self.interrupted = self.interrupted or interrupted
+        self._cancel.set()
+
+    def check(self):
+        """Raise JobCancelled if the job should stop"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, current: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Report progress (stored at most every PROGRESS_INTERVAL_SECONDS); also a cancellation point"""
+        self._current = current
+        if total is not None:
+            self._total = total
+        if message is not None:
+            self._message = message
+        if time.monotonic() - self._written >= PROGRESS_INTERVAL_SECONDS:
+            self.flush()
+        self.check()
+
+    def flush(self):
+        self._written = time.monotonic()
+        written = self.runner._update(self.job_id, {
+            "progress_current": self._current, "progress_total": self._total, "message": self._message,
+        })
+        if not written:
+            # Another runner took the job over (our heartbeat lapsed): stop working on it
+            self.cancel(interrupted=True)
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+class JobRunner:
+    """
+    Worker threads that claim and run queued jobs, plus a housekeeping thread
+
+    Several processes (API workers, a separate runner) can share one
+    database: claims are conditional updates, so a job only runs once.
+    """
+
+    def __init__(self, workers: int = 2, session_factory=SessionLocal):
+        self.workers = workers
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Dict[str, JobContext] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _update(self, job_id: str, values: Dict[str, Any]) -> int:
+        """Update our own running job; returns 0 if it's no longer ours"""
+        db = self.session_factory()
+        try:
+            count = db.query(Job).filter(
+                Job.id == job_id, Job.worker == self.worker_id, Job.status == RUNNING
+            ).update(values)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[Job]:
+        db = self.session_factory()
+        try:
+            for _ in range(3):
+                job = (
+                    db.query(Job)
+                    .filter(Job.status == QUEUED, Job.kind.in_(list(_handlers)))
+                    .order_by(Job.created_at)
+                    .first()
+                )
+                if job is None:
+                    return None
+                now = datetime.utcnow()
+                claimed = db.query(Job).filter(Job.id == job.id, Job.status == QUEUED).update({
+                    "status": RUNNING, "worker": self.worker_id, "attempts": Job.attempts + 1,
+                    "started_at": now, "heartbeat_at": now, "cancel_requested": False, "error": None,
+                })
+                db.commit()
+                if claimed:
+                    db.refresh(job)
+                    db.expunge(job)
+                    return job
+            return None    # Lost every race; try again on the next wake-up
+        finally:
+            db.close()
+
+    def _owner_dead(self, worker: Optional[str]) -> bool:
+        """A job held by an earlier process on this host (its pid is gone, or it's our pid from before a restart)"""
+        if not worker or worker == self.worker_id:
+            return False
+        host, pid, _ = (worker.split(":") + ["", ""])[:3]
+        if host != socket.gethostname() or not pid.isdigit():
+            return False
+        if int(pid) == os.getpid():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def recover(self) -> int:
+        """Queue again (or fail) running jobs whose runner is gone; returns how many"""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=STALE_SECONDS)
+            recovered = 0
+            for job in db.query(Job).filter(Job.status == RUNNING, Job.worker != self.worker_id):
+                if not (job.heartbeat_at is None or job.heartbeat_at < cutoff or self._owner_dead(job.worker)):
+                    continue
+                handler = _handlers.get(job.kind)
+                retry = (handler is not None and handler.restartable and not job.cancel_requested
+                         and job.attempts < MAX_ATTEMPTS)
+                values = (
+                    {"status": QUEUED, "worker": None, "message": "Queued again after an interrupted run"} if retry
+                    else {"status": CANCELLED if job.cancel_requested else FAILED, "finished_at": datetime.utcnow(),
+                          "error": None if job.cancel_requested else "Interrupted (the process running it stopped)"}
+                )
+                recovered += db.query(Job).filter(Job.id == job.id, Job.worker == job.worker, Job.status == RUNNING) \
+                    .update(values)
+            db.query(Job).filter(
+                Job.status.in_(FINISHED), Job.finished_at < datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+            ).delete(synchronize_session=False)
+            db.commit()
+            if recovered:
+                self._wake.set()
+            return recovered
+        finally:
+            db.close()
+
+    def start(self):
+        self.recover()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._housekeeping, name="job-housekeeping", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        """Stop taking jobs and interrupt running ones; they're queued again for the next start"""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            for ctx in self._running.values():
+                ctx.cancel(interrupted=True)
+        deadline = time.monotonic() + SHUTDOWN_WAIT_SECONDS
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+
+    def notify(self):
+        """Wake an idle worker (call after enqueueing)"""
+        self._wake.set()
+
+    def cancel(self, job_id: str):
+        """Stop a job this runner is running without waiting for housekeeping (after request_cancel)"""
+        with self._lock:
+            ctx = self._running.get(job_id)
+        if ctx is not None:
+            ctx.cancel()
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"Job claim failed: {e}")
+                job = None
+            if job is None:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: Job):
+        ctx = JobContext(self, job.id, job.params or {})
+        with self._lock:
+            self._running[job.id] = ctx
+        values: Dict[str, Any]
+        try:
+            result = _handlers[job.kind].fn(ctx, ctx.params)
+            values = {"status": SUCCEEDED, "result": result}
+        except JobCancelled:
+            if not ctx.interrupted:
+                values = {"status": CANCELLED}
+            elif _handlers[job.kind].restartable and job.attempts < MAX_ATTEMPTS:
+                values = {"status": QUEUED, "worker": None, "message": "Queued again after the server stopped"}
+            else:
+                values = {"status": FAILED, "error": "Interrupted (the server stopped)"}
+        except Exception as e:
+            traceback.print_exc()
+            values = {"status": FAILED, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+
+        if values["status"] != QUEUED:
+            values.update(finished_at=datetime.utcnow(), progress_current=ctx._current,
+                          progress_total=ctx._total, message=ctx._message)
+        try:
+            self._update(job.id, values)
+        except Exception as e:
+            print(f"Could not record the end of job {job.id}: {e}")
+
+    def _housekeeping(self):
+        """Pass on cancellations, heartbeat our jobs, recover abandoned ones"""
+        last_beat = last_recover = time.monotonic()
+        while not self._stop.wait(POLL_SECONDS):
+            with self._lock:
+                running = dict(self._running)
+            try:
+                if running:
+                    db = self.session_factory()
+                    try:
+                        ids = list(running)
+                        if time.monotonic() - last_beat >= HEARTBEAT_SECONDS:
+                            last_beat = time.monotonic()
+                            db.query(Job).filter(Job.id.in_(ids), Job.worker == self.worker_id) \
+                                .update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+                            db.commit()
+                        cancelled = db.query(Job.id).filter(Job.id.in_(ids), Job.cancel_requested).all()
+                    finally:
+                        db.close()
+                    for (job_id,) in cancelled:
+                        running[job_id].cancel()
+                if time.monotonic() - last_recover >= HEARTBEAT_SECONDS:
+                    last_recover = time.monotonic()
+                    self.recover()
+            except Exception as e:
+                print(f"Job housekeeping failed: {e}")
@@ -0,0 +1,143 @@
+"""
+Delta Sync
+Change feed for offline clients: what changed since a version, a page at a time
+
+Writes to questions and progress are logged to change_log by triggers;
+lessons are YAML files, so scan_lessons logs theirs. Each entity has one
+log row carrying its latest version, so a sync reads one row per entity
+changed since the client's version - its cost follows the amount of
+change, not the size of the bank. Attempts are never changed once written,
+so they aren't logged: a student's new ones are read from attempts by id.
+"""
+
+import hashlib
+import heapq
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from src.core.database import Attempt, ChangeLog, LessonProgress, Question, TopicProgress
+
+ENTITY_QUESTION = "question"
+ENTITY_TOPIC_PROGRESS = "topic_progress"
+ENTITY_LESSON_PROGRESS = "lesson_progress"
+ENTITY_LESSON = "lesson"
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+
+def latest_version(db) -> int:
+    return db.query(func.max(ChangeLog.version)).scalar() or 0
+
+
+def latest_attempt(db) -> int:
+    return db.query(func.max(Attempt.id)).scalar() or 0
+
+
+def read_changes(db, since: int, student_pk: Optional[int], limit: int) -> Tuple[List[ChangeLog], bool]:
+    """
+    The first `limit` changes after `since`, oldest first, and whether there are more
+
+    Shared content and the student's own rows are read as two range scans
+    on (student_pk, version) and merged, so other students' activity is
+    never read.
+    """
+    def page(scope):
+        return (
+            db.query(ChangeLog)
+            .filter(scope, ChangeLog.version > since)
+            .order_by(ChangeLog.version)
+            .limit(limit + 1)
+            .all()
+        )
+
+    changes = page(ChangeLog.student_pk.is_(None))
+    if student_pk is not None:
+        changes = list(heapq.merge(changes, page(ChangeLog.student_pk == student_pk), key=lambda c: c.version))
+    return changes[:limit], len(changes) > limit
+
+
+def read_attempts(db, student_pk: int, since: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    The student's first `limit` attempts with an id above `since`, oldest
+    first, and whether there are more
+
+    Attempt ids only grow, so the last id returned is the next cursor.
+    """
+    rows = (
+        db.query(Attempt, Question.id)
+        .join(Question, Question.pk == Attempt.question_pk)
+        .filter(Attempt.student_pk == student_pk, Attempt.id > since)
+        .order_by(Attempt.id)
+        .limit(limit + 1)
+        .all()
+    )
+    attempts = [
+        {
+            "id": attempt.id,
+            "question_id": question_id,
+            "timestamp": attempt.timestamp,
+            "student_answer": attempt.student_answer,
+            "time_taken_seconds": attempt.time_taken_seconds,
+            "is_correct": attempt.is_correct,
+            "marks_awarded": attempt.marks_awarded,
+            "marks_available": attempt.marks_available,
+            "hint_used": attempt.hint_used,
+            "solution_viewed": attempt.solution_viewed,
+        }
+        for attempt, question_id in rows
+    ]
+    return attempts[:limit], len(attempts) > limit
+
+
+def _log(db, entity: str, key: str, deleted: bool = False, digest: Optional[str] = None):
+    # Same as the triggers' INSERT OR REPLACE: the entity's old row goes, a new version is issued
+    db.query(ChangeLog).filter(ChangeLog.entity == entity, ChangeLog.key == key).delete()
+    db.add(ChangeLog(entity=entity, key=key, deleted=deleted, digest=digest, changed_at=datetime.utcnow()))
+    db.flush()
+
+
+def lesson_files(lessons_dir) -> Dict[str, Path]:
+    """Lesson YAML files by sync key ("subject/topic")"""
+    return {f"{path.parent.name}/{path.stem}": path for path in sorted(Path(lessons_dir).glob("*/*.yaml"))}
+
+
+def scan_lessons(db, lessons_dir) -> int:
+    """Log lesson files added, changed or removed since the last scan; returns how many"""
+    files = lesson_files(lessons_dir)
+    logged = {row.key: row for row in db.query(ChangeLog).filter(ChangeLog.entity == ENTITY_LESSON)}
+    changed = 0
+    for key, path in files.items():
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        row = logged.get(key)
+        if row is None or row.deleted or row.digest != digest:
+            _log(db, ENTITY_LESSON, key, digest=digest)
+            changed += 1
+    for key, row in logged.items():
+        if key not in files and not row.deleted:
+            _log(db, ENTITY_LESSON, key, deleted=True)
+            changed += 1
+    if changed:
+        db.commit()
+    return changed
+
+
+def _columns(row) -> Dict[str, Any]:
+    return {column.name: getattr(row, column.name) for column in row.__table__.columns}
+
+
+def load_rows(db, entity: str, keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Current rows for logged keys: Question objects for questions, dicts otherwise
+
+    Keys whose row has gone since the log was read are left out; the
+    change that removed them has a later version of its own.
+    """
+    keys = list(keys)
+    if entity == ENTITY_QUESTION:
+        return {q.id: q for q in db.query(Question).filter(Question.id.in_(keys))}
+    model = {ENTITY_TOPIC_PROGRESS: TopicProgress, ENTITY_LESSON_PROGRESS: LessonProgress}[entity]
+    return {row.id: _columns(row) for row in db.query(model).filter(model.id.in_(keys))}
@@ -0,0 +1,357 @@
+"""
+Semantic Index
+Embeds questions, lessons and strategy guides, stores the vectors as a
+memory-mapped NumPy matrix and answers top-k cosine-similarity queries
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+import yaml
+
+from src.agents.llm_client import LLMError
+from src.agents.practice_agent import question_prompt_text
+
+MANIFEST_FILE = "manifest.json"
+
+KIND_QUESTION = "question"
+KIND_LESSON = "lesson"
+KIND_STRATEGY = "strategy"
+
+
+# ============================================================================
+# Embedding Client
+# ============================================================================
+
+class EmbeddingClient:
+    """Batch text embeddings from Ollama (/api/embed) or an OpenAI-compatible server (/embeddings)"""
+
+    def __init__(self, binding: str, host: str, model: str, api_key: Optional[str] = None, timeout: float = 120.0):
+        if binding not in ("openai", "ollama"):
+            raise ValueError(f"Unsupported embedding binding: {binding!r}")
+        self.binding = binding
+        self.host = host.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """One request for the whole batch; returns a (len(texts), dim) float32 matrix"""
+        try:
+            if self.binding == "ollama":
+                response = await self._client.post(
+                    f"{self.host}/api/embed", json={"model": self.model, "input": list(texts)},
+                )
+                response.raise_for_status()
+                vectors = response.json()["embeddings"]
+            else:
+                response = await self._client.post(
+                    f"{self.host}/embeddings",
+                    headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else {},
+                    json={"model": self.model, "input": list(texts)},
+                )
+                response.raise_for_status()
+                data = sorted(response.json()["data"], key=lambda item: item["index"])
+                vectors = [item["embedding"] for item in data]
+        except httpx.HTTPError as e:
+            raise LLMError(f"{self.binding} embedding request failed: {e}") from e
+        except (KeyError, TypeError, ValueError) as e:
+            raise LLMError(f"Unexpected embedding response: {response.text[:200]}") from e
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(texts):
+            raise LLMError(f"Expected {len(texts)} embeddings, got shape {matrix.shape}")
+        return matrix
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def create_embedding_client(**overrides: Any) -> EmbeddingClient:
+    """Build a client from settings (embedding_binding, embedding_host, embedding_model, embedding_api_key)"""
+    from settings import settings
+
+    config = {
+        "binding": settings.embedding_binding,
+        "host": settings.embedding_host,
+        "model": settings.embedding_model,
+        "api_key": settings.embedding_api_key,
+    }
+    config.update(overrides)
+    return EmbeddingClient(**config)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Unit-length rows, so a dot product is cosine similarity"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# ============================================================================
+# Documents
+# ============================================================================
+
+@dataclass
+class Document:
+    """One piece of content to embed"""
+    doc_id: str       # "question:<id>", "lesson:<subject>/<topic>", "strategy:<type>"
+    kind: str
+    text: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def content_hash(self, model: str) -> str:
+        return hashlib.sha256(f"{model}\n{self.text}".encode("utf-8")).hexdigest()[:24]
+
+
+def question_document(row: Dict[str, Any]) -> Document:
+    """Document for a question row (id, subject, question_type, question_text, options)"""
+    options = row.get("options")
+    if isinstance(options, str):
+        try:
+            options = json.loads(options)
+        except ValueError:
+            options = None
+    parts = [
+        f"{row['subject'].replace('_', ' ')}: {row['question_type'].replace('_', ' ')}",
+        question_prompt_text(row["question_text"]),
+    ]
+    if options and all(isinstance(o, str) for o in options):
+        parts.append("Options: " + ", ".join(options))
+    return Document(f"{KIND_QUESTION}:{row['id']}", KIND_QUESTION, "\n".join(parts))
+
+
+def _yaml_text(data: Dict[str, Any], keys: Iterable[str]) -> str:
+    parts = []
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, list):
+            parts.extend(str(v) if not isinstance(v, dict) else " ".join(map(str, v.values())) for v in value)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def lesson_documents(lessons_dir: Path) -> Iterator[Document]:
+    for path in sorted(Path(lessons_dir).glob("*/*.yaml")):
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+        subject, topic = path.parent.name, path.stem
+        yield Document(
+            f"{KIND_LESSON}:{subject}/{topic}",
+            KIND_LESSON,
+            _yaml_text(data, ("title", "explanation", "key_points", "common_mistakes", "tips")),
+            {"subject": subject, "topic": topic, "title": data.get("title")},
+        )
+
+
+def strategy_documents(strategies_dir: Path) -> Iterator[Document]:
+    for path in sorted(Path(strategies_dir).glob("*.yaml")):
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+        topic = data.get("question_type") or path.stem
+        yield Document(
+            f"{KIND_STRATEGY}:{topic}",
+            KIND_STRATEGY,
+            _yaml_text(data, ("title", "what_is_it", "approach", "common_mistakes", "time_tips")),
+            {"subject": data.get("subject"), "topic": topic, "title": data.get("title")},
+        )
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+@dataclass
+class BuildStats:
+    documents: int = 0
+    embedded: int = 0
+    reused: int = 0
+    removed: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+class SemanticIndex:
+    """
+    Read side: a memory-mapped (rows, dim) float32 matrix of unit vectors plus
+    a JSON manifest (ids, content hashes, kinds, metadata)
+
+    Loading maps the file instead of reading it, so startup cost doesn't grow
+    with the corpus; pages are faulted in by the first queries.
+    """
+
+    def __init__(self, directory: Path, manifest: Dict[str, Any], vectors: np.ndarray, manifest_mtime: float = 0.0):
+        self.directory = Path(directory)
+        self.model: str = manifest["model"]
+        self.ids: List[str] = manifest["ids"]
+        self.hashes: List[str] = manifest["hashes"]
+        self.kinds: List[str] = manifest["kinds"]
+        self.meta: Dict[str, Dict[str, Any]] = manifest.get("meta", {})
+        self.vectors = vectors
+        self.row_of = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        kinds = np.asarray(self.kinds)
+        self.rows_by_kind = {kind: np.flatnonzero(kinds == kind) for kind in set(self.kinds)}
+        self.manifest_mtime = manifest_mtime
+
+    @classmethod
+    def load(cls, directory) -> Optional["SemanticIndex"]:
+        """Open an index directory, or None if nothing has been built there"""
+        directory = Path(directory)
+        manifest_path = directory / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        mtime = manifest_path.stat().st_mtime
+        manifest = json.loads(manifest_path.read_text())
+        vectors = np.load(directory / manifest["vectors_file"], mmap_mode="r")
+        return cls(directory, manifest, vectors, mtime)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def vector(self, doc_id: str) -> Optional[np.ndarray]:
+        row = self.row_of.get(doc_id)
+        return None if row is None else np.asarray(self.vectors[row])
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        kinds: Optional[Sequence[str]] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, cosine score) for a query vector, optionally limited to some kinds"""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm == 0 or not len(self.ids):
+            return []
+        query = query / norm
+
+        if kinds is None:
+            rows = None
+            scores = self.vectors @ query
+        else:
+            rows = np.concatenate([self.rows_by_kind.get(kind, np.empty(0, dtype=np.intp)) for kind in kinds])
+            if not len(rows):
+                return []
+            scores = self.vectors[rows] @ query
+
+        excluded = {self.row_of[d] for d in exclude if d in self.row_of}
+        want = min(k + len(excluded), len(scores))
+        top = np.argpartition(-scores, want - 1)[:want]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            row = int(rows[i]) if rows is not None else int(i)
+            if row in excluded:
+                continue
+            results.append((self.ids[row], float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+
+async def build_index(
+    directory,
+    documents: Sequence[Document],
+    embed: Callable[[List[str]], Awaitable[np.ndarray]],
+    model: str,
+    batch_size: int = 32,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> BuildStats:
+    """
+    Write (or update) the index in `directory`
+
+    Only documents whose content hash changed (or that are new) are sent to
+    the embedding model, in batches of `batch_size`; unchanged rows are copied
+    across from the previous matrix. The new matrix gets a new file name and
+    the manifest is swapped in last, so readers never see a half-built index.
+    """
+    start = time.perf_counter()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stats = BuildStats(documents=len(documents))
+
+    previous = SemanticIndex.load(directory)
+    if previous is not None and previous.model != model:
+        previous = None
+    hashes = [doc.content_hash(model) for doc in documents]
+
+    reuse: Dict[int, int] = {}
+    pending: List[int] = []
+    for i, (doc, content_hash) in enumerate(zip(documents, hashes)):
+        old_row = previous.row_of.get(doc.doc_id) if previous else None
+        if old_row is not None and previous.hashes[old_row] == content_hash:
+            reuse[i] = old_row
+        else:
+            pending.append(i)
+    stats.reused = len(reuse)
+    stats.removed = len(set(previous.ids) - {d.doc_id for d in documents}) if previous else 0
+
+    if previous is not None and not pending and not stats.removed:
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    # Embed changed documents first: the dimension is only known from the model
+    new_vectors: Dict[int, np.ndarray] = {}
+    for offset in range(0, len(pending), batch_size):
+        batch = pending[offset:offset + batch_size]
+        matrix = normalize_rows(await embed([documents[i].text for i in batch]))
+        for i, vector in zip(batch, matrix):
+            new_vectors[i] = vector
+        stats.batches += 1
+        stats.embedded += len(batch)
+        if progress:
+            progress(stats.embedded, len(pending))
+
+    if new_vectors:
+        dim = len(next(iter(new_vectors.values())))
+    elif previous is not None:
+        dim = previous.vectors.shape[1]
+    else:
+        dim = 0
+
+    vectors_file = f"vectors-{int(time.time() * 1000)}.npy"
+    matrix = np.lib.format.open_memmap(
+        directory / vectors_file, mode="w+", dtype=np.float32, shape=(len(documents), dim),
+    )
+    for i in range(len(documents)):
+        matrix[i] = new_vectors[i] if i in new_vectors else previous.vectors[reuse[i]]
+    matrix.flush()
+    del matrix
+
+    manifest = {
+        "model": model,
+        "dim": dim,
+        "vectors_file": vectors_file,
+        "built_at": time.time(),
+        "ids": [doc.doc_id for doc in documents],
+        "hashes": hashes,
+        "kinds": [doc.kind for doc in documents],
+        "meta": {doc.doc_id: doc.meta for doc in documents if doc.meta},
+    }
+    tmp_path = directory / (MANIFEST_FILE + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, separators=(",", ":")))
+    os.replace(tmp_path, directory / MANIFEST_FILE)
+
+    # Old matrices are unreferenced now (open maps keep working on POSIX)
+    for old in directory.glob("vectors-*.npy"):
+        if old.name != vectors_file:
+            old.unlink()
+
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,249 @@
+"""
+Attempt Archive
+Moves old attempts out of the live database into compressed Parquet files
+and reads live and archived attempts back as one table
+
+Files are partitioned by month (<archive dir>/month=YYYY-MM/part-*.parquet,
+hive-style, so pyarrow/DuckDB/Spark pick the partition up from the path)
+and listed in attempt_archive_files. Per-student subject counts are added to
+archived_attempt_totals before the rows are deleted, so progress totals
+don't change.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 50_000
+COMPRESSION = "zstd"
+
+# One schema for every file, whatever a chunk happens to contain (all-NULL
+# columns would otherwise be written as a different type)
+ARCHIVE_DTYPES = {
+    "attempt_id": "int64",
+    "student_id": "string",
+    "question_id": "string",
+    "subject": "string",
+    "question_type": "string",
+    "timestamp": "datetime64[us]",
+    "student_answer": "string",
+    "time_taken_seconds": "Int64",
+    "is_correct": "boolean",
+    "marks_awarded": "Int64",
+    "marks_available": "Int64",
+    "feedback": "string",
+    "hint_used": "boolean",
+    "solution_viewed": "boolean",
+}
+
+# Public ids rather than internal keys: archived rows must stay meaningful
+# after the live tables are rebuilt. Questions are denormalised for the same reason.
+_SELECT = """
+    SELECT a.id AS attempt_id, s.id AS student_id, q.id AS question_id,
+           q.subject, q.question_type, a.timestamp, a.student_answer,
+           a.time_taken_seconds, a.is_correct, a.marks_awarded, a.marks_available,
+           a.feedback, a.hint_used, a.solution_viewed
+    FROM attempts a
+    LEFT JOIN students s ON s.pk = a.student_pk
+    LEFT JOIN questions q ON q.pk = a.question_pk
+"""
+
+# One chunk: attempts are append-only, so the same bounds select (and later
+# delete) exactly the same rows
+_CHUNK = "a.id > :after AND a.id < :newest AND a.timestamp < :cutoff"
+
+
+def _stamp(value: datetime) -> str:
+    """Timestamp text as SQLAlchemy stores it in SQLite"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _typed(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], format="ISO8601")
+    return frame.astype(ARCHIVE_DTYPES)
+
+
+def archived_files(conn: sqlite3.Connection, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> List[str]:
+    """Archive files (relative paths) that may hold attempts in [since, until)"""
+    query = "SELECT path FROM attempt_archive_files WHERE 1 = 1"
+    params: list = []
+    if since is not None:
+        query += " AND newest >= ?"
+        params.append(_stamp(since))
+    if until is not None:
+        query += " AND oldest < ?"
+        params.append(_stamp(until))
+    return [row[0] for row in conn.execute(query + " ORDER BY first_attempt_id", params)]
+
+
+def remove_orphans(conn: sqlite3.Connection, archive_dir: Path) -> int:
+    """
+    Delete part files the manifest doesn't list
+
+    They're left by a run that stopped between writing a file and committing
+    its delete; those rows are still live and will be archived again.
+    """
+    listed = set(archived_files(conn))
+    removed = 0
+    for path in archive_dir.glob("month=*/part-*.parquet*"):
+        if path.relative_to(archive_dir).as_posix() not in listed:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def _write_chunk(chunk: pd.DataFrame, archive_dir: Path) -> List[Dict]:
+    """Write one file per month in the chunk; returns their manifest rows"""
+    frame = _typed(chunk)
+    files = []
+    for month, part in frame.groupby(frame["timestamp"].dt.strftime("%Y-%m"), sort=True):
+        first, last = int(part["attempt_id"].iloc[0]), int(part["attempt_id"].iloc[-1])
+        relative = f"month={month}/part-{first:010d}-{last:010d}.parquet"
+        target = archive_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = target.with_name(target.name + ".tmp")
+        part.to_parquet(staging, compression=COMPRESSION, index=False)
+        os.replace(staging, target)
+        files.append({
+            "path": relative,
+            "month": month,
+            "rows": len(part),
+            "first_attempt_id": first,
+            "last_attempt_id": last,
+            "oldest": _stamp(part["timestamp"].min().to_pydatetime()),
+            "newest": _stamp(part["timestamp"].max().to_pydatetime()),
+            "created_at": _stamp(datetime.utcnow()),
+            "bytes": target.stat().st_size,
+        })
+    return files
+
+
+def archive_attempts(
+    db_path: str,
+    before: datetime,
+    archive_dir: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dry_run: bool = False,
+) -> Dict:
+    """
+    Move attempts older than `before` to Parquet, one chunk at a time
+
+    Each chunk's files are written first, then one transaction records them,
+    adds the chunk to archived_attempt_totals and deletes its rows, so a crash
+    loses nothing and at worst leaves orphan files for the next run to clear.
+    Memory is bounded by chunk_size. The newest attempt always stays live, so
+    attempt ids are never reused.
+    """
+    root = Path(archive_dir)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    stats = {"attempts": 0, "files": 0, "bytes": 0, "orphans_removed": 0}
+    try:
+        newest = conn.execute("SELECT max(id) FROM attempts").fetchone()[0] or 0
+        params = {"after": 0, "newest": newest, "cutoff": _stamp(before)}
+        if dry_run:
+            stats["attempts"] = conn.execute(
+                f"SELECT count(*) FROM attempts a WHERE {_CHUNK}", params
+            ).fetchone()[0]
+            return stats
+
+        stats["orphans_removed"] = remove_orphans(conn, root)
+        while True:
+            chunk = pd.read_sql_query(
+                f"{_SELECT} WHERE {_CHUNK} ORDER BY a.id LIMIT :limit", conn, params={**params, "limit": chunk_size}
+            )
+            if chunk.empty:
+                break
+            bounds = {**params, "last": int(chunk["attempt_id"].iloc[-1])}
+            files = _write_chunk(chunk, root)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    INSERT INTO attempt_archive_files (
+                        path, month, rows, first_attempt_id, last_attempt_id, oldest, newest, created_at
+                    ) VALUES (
+                        :path, :month, :rows, :first_attempt_id, :last_attempt_id, :oldest, :newest, :created_at
+                    )
+                """, files)
+                conn.execute(f"""
+                    INSERT INTO archived_attempt_totals (student_pk, subject, attempted, correct)
+                    SELECT a.student_pk, q.subject, count(*), sum(CASE WHEN a.is_correct THEN 1 ELSE 0 END)
+                    FROM attempts a JOIN questions q ON q.pk = a.question_pk
+                    WHERE {_CHUNK} AND a.id <= :last
+                    GROUP BY a.student_pk, q.subject
+                    ON CONFLICT(student_pk, subject) DO UPDATE SET
+                        attempted = attempted + excluded.attempted,
+                        correct = correct + excluded.correct
+                """, bounds)
+                deleted = conn.execute(
+                    f"DELETE FROM attempts AS a WHERE {_CHUNK} AND a.id <= :last", bounds
+                ).rowcount
+                if deleted != len(chunk):
+                    raise RuntimeError(f"Archived {len(chunk)} attempts but {deleted} matched for delete")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                for file in files:
+                    (root / file["path"]).unlink(missing_ok=True)
+                raise
+
+            params["after"] = bounds["last"]
+            stats["attempts"] += len(chunk)
+            stats["files"] += len(files)
+            stats["bytes"] += sum(file["bytes"] for file in files)
+    finally:
+        conn.close()
+    return stats
+
+
+def read_attempts(
+    db_path: str,
+    archive_dir: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    student_id: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Live and archived attempts in [since, until) as one DataFrame, oldest first
+
+    Only archive files whose time range overlaps the window are opened. For
+    ad-hoc SQL, point DuckDB at the same files, e.g.
+    read_parquet('<archive dir>/month=*/*.parquet', hive_partitioning = true),
+    and UNION ALL the live attempts table.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conditions, params = [], {}
+        if since is not None:
+            conditions.append("a.timestamp >= :since")
+            params["since"] = _stamp(since)
+        if until is not None:
+            conditions.append("a.timestamp < :until")
+            params["until"] = _stamp(until)
+        if student_id is not None:
+            conditions.append("s.id = :student_id")
+            params["student_id"] = student_id
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        live = _typed(pd.read_sql_query(f"{_SELECT}{where}", conn, params=params))
+        paths = archived_files(conn, since, until)
+    finally:
+        conn.close()
+
+    frames = []
+    for relative in paths:
+        frame = pd.read_parquet(Path(archive_dir) / relative)
+        if since is not None:
+            frame = frame[frame["timestamp"] >= since]
+        if until is not None:
+            frame = frame[frame["timestamp"] < until]
+        if student_id is not None:
+            frame = frame[frame["student_id"] == student_id]
+        frames.append(frame.astype(ARCHIVE_DTYPES))
+    frames.append(live)
+    return pd.concat(frames, ignore_index=True).sort_values(["timestamp", "attempt_id"], ignore_index=True)
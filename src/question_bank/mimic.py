@@ -0,0 +1,649 @@
+"""
+Question Mimic
+Clones a question by inferring the parametric template behind it and
+filling in fresh parameters - no LLM call
+
+A family (arithmetic, number sequences, letter sequences, code words,
+fraction sums) parses the question text into parameters plus the text spans
+they came from, and solves them. A question is only used as a template when
+the solved answer matches its stored answer. Variants keep the source's
+wording, option count and answer notation; each one is re-parsed and solved
+again before it's accepted, and its distractors are checked to be distinct
+from the answer and each other.
+"""
+
+import random
+import re
+import uuid
+from dataclasses import dataclass, field
+from fractions import Fraction
+from math import lcm
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.core.database import Question
+
+# Words for code_words variants (shared with scripts/generate_code_words.py)
+CODE_WORDS = [
+    # 4-letter words
+    "WORD", "MATH", "BOOK", "FISH", "BIRD", "TREE", "HAND", "FACE", "DOOR", "LAKE",
+    "FIRE", "WIND", "RAIN", "SNOW", "STAR", "MOON", "GOLD", "PINK", "BLUE", "GRAY",
+    "KING", "JUMP", "WALK", "TALK", "PLAY", "READ", "SING", "DRAW", "SWIM", "RIDE",
+    "CAMP", "HELP", "LIFT", "PUSH", "PULL", "KICK", "WAVE", "CLAP", "SPIN", "FLIP",
+    "BEAR", "DUCK", "FROG", "GOAT", "LION", "WOLF", "DEER", "SEAL", "CRAB", "MOTH",
+
+    # 5-letter words
+    "HOUSE", "SMART", "BRAIN", "DANCE", "MUSIC", "LIGHT", "NIGHT", "DREAM", "PEACE",
+    "EARTH", "WATER", "PLANT", "FRUIT", "BREAD", "CHAIR", "TABLE", "CLOCK", "PHONE",
+    "SMILE", "LAUGH", "THINK", "LEARN", "TEACH", "WRITE", "SPEAK", "SLEEP", "CLIMB",
+    "HORSE", "SHEEP", "SNAKE", "WHALE", "TIGER", "ZEBRA", "PANDA", "CAMEL", "MOUSE",
+    "CLOUD", "STORM", "FROST", "BEACH", "RIVER", "OCEAN", "MOUNT", "FIELD", "GRASS",
+
+    # 6-letter words
+    "TARGET", "FRIEND", "SCHOOL", "FAMILY", "GARDEN", "ANIMAL", "BRIDGE", "CASTLE",
+    "FLOWER", "MONKEY", "RABBIT", "DRAGON", "PLANET", "SUMMER", "WINTER", "SPRING",
+    "AUTUMN", "ORANGE", "PURPLE", "YELLOW", "SILVER", "GOLDEN", "BRIGHT", "SISTER",
+    "BROTHER", "PARENT", "MARKET", "ISLAND", "FOREST", "DESERT", "JUNGLE", "STREAM",
+]
+
+# Tries per requested variant before giving up (duplicates and rejected samples use them up)
+ATTEMPTS_PER_VARIANT = 20
+# Misses in a row that mean the template's parameter space has run out
+MAX_MISSES = 200
+
+
+def apply_cipher(word: str, shift: int) -> str:
+    """Apply Caesar cipher with given shift."""
+    result = []
+    for c in word.upper():
+        if c.isalpha():
+            shifted = (ord(c) - ord('A') + shift) % 26
+            result.append(chr(shifted + ord('A')))
+        else:
+            result.append(c)
+    return ''.join(result)
+
+
+def _near(value: int, rng: random.Random, spread: float = 0.5, minimum: int = 1, width: int = 1) -> int:
+    """
+    A number of about the same size as value (same sign), so variants keep
+    the source's difficulty; small values get at least `width` to range over
+    """
+    sign = -1 if value < 0 else 1
+    size = abs(value)
+    lo = max(minimum, int(size * (1 - spread)))
+    hi = max(lo + width, int(round(size * (1 + spread))))
+    return sign * rng.randint(lo, hi)
+
+
+_LAYOUT = re.compile(r"\s+|\\\(|\\\)")
+
+
+def _normalize(answer: str) -> str:
+    return _LAYOUT.sub("", str(answer)).upper()
+
+
+# ============================================================================
+# Families
+# ============================================================================
+
+Spans = List[Tuple[int, int]]
+
+
+class Family:
+    """One parametric question structure"""
+    name = ""
+
+    def parse(self, text: str) -> Optional[Tuple[Dict[str, Any], Spans]]:
+        """Parameters and the text spans holding them, or None if the text doesn't fit"""
+        raise NotImplementedError
+
+    def solve(self, params: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def fields(self, params: Dict[str, Any]) -> List[str]:
+        """Replacement text for each span, in order"""
+        raise NotImplementedError
+
+    def sample(self, params: Dict[str, Any], rng: random.Random) -> Optional[Dict[str, Any]]:
+        """New parameters shaped like params (None: this draw didn't work out)"""
+        raise NotImplementedError
+
+    def distractors(self, params: Dict[str, Any], answer: str, rng: random.Random) -> List[str]:
+        """Plausible wrong answers, most plausible first"""
+        raise NotImplementedError
+
+    def explain(self, params: Dict[str, Any], answer: str) -> str:
+        raise NotImplementedError
+
+    def answer_key(self, answer: str) -> Any:
+        """What two answers must share to be the same answer"""
+        return _normalize(answer)
+
+
+_OPERATORS = {"+": "+", "-": "-", "−": "-", "×": "*", "x": "*", "*": "*", "÷": "/", "/": "/"}
+
+
+class ArithmeticFamily(Family):
+    """One two-operand calculation, e.g. "Calculate: 622 + 37 = ?" """
+    name = "arithmetic"
+    pattern = re.compile(r"(?<![\d.,/])(\d+)\s*([+\-−×x*÷/])\s*(\d+)(?![\d.,/])")
+
+    def parse(self, text):
+        matches = list(self.pattern.finditer(text))
+        if len(matches) != 1:
+            return None
+        m = matches[0]
+        a, b = int(m.group(1)), int(m.group(3))
+        op = _OPERATORS[m.group(2)]
+        if op == "/" and (b == 0 or a % b):
+            return None
+        return {"a": a, "b": b, "op": op}, [m.span(1), m.span(3)]
+
+    def solve(self, params):
+        a, b, op = params["a"], params["b"], params["op"]
+        return str({"+": a + b, "-": a - b, "*": a * b, "/": a // b if b else 0}[op])
+
+    def fields(self, params):
+        return [str(params["a"]), str(params["b"])]
+
+    def sample(self, params, rng):
+        a, b, op = params["a"], params["b"], params["op"]
+        if op == "/":
+            divisor = _near(b, rng, minimum=2, width=10)
+            return {"a": divisor * _near(a // b, rng, minimum=2, width=10), "b": divisor, "op": op}
+        minimum = 2 if op == "*" else 1
+        new_a, new_b = _near(a, rng, minimum=minimum, width=10), _near(b, rng, minimum=minimum, width=10)
+        if op == "-" and new_b >= new_a:
+            new_a, new_b = new_b, new_a
+            if new_a == new_b:
+                return None
+        return {"a": new_a, "b": new_b, "op": op}
+
+    def distractors(self, params, answer, rng):
+        value, a, b = int(answer), params["a"], params["b"]
+        near = [value - 1, value + 1, value - 10, value + 10, value - 2, value + 2]
+        if params["op"] == "*":
+            near = [value - a, value + a, value - b, value + b] + near
+        elif params["op"] == "/":
+            near = [value - 1, value + 1, value * 2, a - b] + near
+        return [str(n) for n in near if n > 0]
+
+    def explain(self, params, answer):
+        symbol = {"+": "+", "-": "-", "*": "×", "/": "÷"}[params["op"]]
+        return f"{params['a']} {symbol} {params['b']} = {answer}"
+
+
+class NumberSequenceFamily(Family):
+    """What comes next: constant difference, steadily changing difference, or constant ratio"""
+    name = "number_sequence"
+    pattern = re.compile(r"(?<![\d/])(-?\d+(?:\s*,\s*-?\d+){3,})(?![\d/])")
+
+    def parse(self, text):
+        matches = list(self.pattern.finditer(text))
+        if len(matches) != 1:
+            return None
+        terms = [int(t) for t in re.split(r"\s*,\s*", matches[0].group(1))]
+        diffs = [b - a for a, b in zip(terms, terms[1:])]
+        second = [b - a for a, b in zip(diffs, diffs[1:])]
+        if len(set(diffs)) == 1 and diffs[0] != 0:
+            params = {"kind": "linear", "start": terms[0], "step": diffs[0], "length": len(terms)}
+        elif len(set(second)) == 1 and second[0] != 0:
+            params = {"kind": "quadratic", "start": terms[0], "step": diffs[0], "change": second[0],
+                      "length": len(terms)}
+        elif 0 not in terms and all(b % a == 0 for a, b in zip(terms, terms[1:])) \
+                and len({b // a for a, b in zip(terms, terms[1:])}) == 1 and terms[1] // terms[0] not in (0, 1):
+            params = {"kind": "geometric", "start": terms[0], "ratio": terms[1] // terms[0], "length": len(terms)}
+        else:
+            return None
+        return params, [matches[0].span(1)]
+
+    @staticmethod
+    def terms(params) -> List[int]:
+        terms = [params["start"]]
+        step = params.get("step")
+        for _ in range(params["length"]):
+            if params["kind"] == "geometric":
+                terms.append(terms[-1] * params["ratio"])
+            else:
+                terms.append(terms[-1] + step)
+                if params["kind"] == "quadratic":
+                    step += params["change"]
+        return terms    # length + 1 terms: the shown ones and the answer
+
+    def solve(self, params):
+        return str(self.terms(params)[-1])
+
+    def fields(self, params):
+        return [", ".join(str(t) for t in self.terms(params)[:-1])]
+
+    def sample(self, params, rng):
+        if params["kind"] == "geometric":
+            new = dict(params, start=_near(params["start"], rng, width=9))
+            if params["ratio"] >= 2:
+                new["ratio"] = max(2, params["ratio"] + rng.choice([-1, 0, 1]))
+            return new
+        # Where the sequence starts hardly changes how hard it is; the steps do
+        new = dict(params, start=_near(params["start"], rng, spread=1.0, minimum=0 if params["start"] <= 0 else 1, width=30))
+        new["step"] = _near(params["step"], rng, width=4)
+        if params["kind"] == "quadratic":
+            new["change"] = _near(params["change"], rng, width=2)
+        return new
+
+    def distractors(self, params, answer, rng):
+        terms = self.terms(params)
+        value, last = terms[-1], terms[-2]
+        step = value - last
+        previous = last - terms[-3]
+        wrong = [last + previous, value + 1, value - 1, value + 2, value - 2, value + step, value - step // 2]
+        return [str(n) for n in wrong]
+
+    def explain(self, params, answer):
+        terms = self.terms(params)
+        last = terms[-2]
+        if params["kind"] == "linear":
+            step = params["step"]
+            return (f"This is an arithmetic sequence where each number {'increases' if step > 0 else 'decreases'} "
+                    f"by {abs(step)}.\n{last} {'+' if step > 0 else '-'} {abs(step)} = {answer}")
+        if params["kind"] == "quadratic":
+            change, step = params["change"], terms[-1] - last
+            return (f"The differences {'increase' if change > 0 else 'decrease'} by {abs(change)} each time.\n"
+                    f"Next difference: {step}, so {last} + {step} = {answer}")
+        return f"Each number is multiplied by {params['ratio']}.\n{last} × {params['ratio']} = {answer}"
+
+
+def _letters(value: int) -> str:
+    return chr(ord("A") + value % 26)
+
+
+class LetterSequenceFamily(Family):
+    """Letter groups where each position moves a fixed number of places, e.g. "GK, IN, KQ, MT, ___" """
+    name = "letter_sequence"
+    pattern = re.compile(r"(?<![A-Za-z])([A-Z]{1,4}(?:\s*,\s*[A-Z]{1,4}){3,})(?![A-Za-z])")
+
+    def parse(self, text):
+        matches = list(self.pattern.finditer(text))
+        if len(matches) != 1:
+            return None
+        terms = re.split(r"\s*,\s*", matches[0].group(1))
+        width = len(terms[0])
+        if any(len(t) != width for t in terms):
+            return None
+        starts, steps = [], []
+        for position in range(width):
+            values = [ord(t[position]) - ord("A") for t in terms]
+            moves = {(b - a) % 26 for a, b in zip(values, values[1:])}
+            if len(moves) != 1:
+                return None
+            move = moves.pop()
+            starts.append(values[0])
+            steps.append(move - 26 if move > 13 else move)
+        if not any(steps):
+            return None
+        return {"starts": starts, "steps": steps, "length": len(terms)}, [matches[0].span(1)]
+
+    @staticmethod
+    def term(params, index: int) -> str:
+        return "".join(_letters(s + index * step) for s, step in zip(params["starts"], params["steps"]))
+
+    def solve(self, params):
+        return self.term(params, params["length"])
+
+    def fields(self, params):
+        return [", ".join(self.term(params, i) for i in range(params["length"]))]
+
+    def sample(self, params, rng):
+        steps = []
+        for step in params["steps"]:
+            if step == 0:
+                steps.append(0)
+                continue
+            size = min(max(abs(step) + rng.choice([-1, 0, 1]), 1), 6)
+            steps.append(size if step > 0 else -size)
+        # Starts are picked so no position runs past A or Z
+        starts = []
+        for step in steps:
+            travel = step * params["length"]
+            low, high = max(0, -travel), min(25, 25 - travel)
+            if low > high:
+                return None
+            starts.append(rng.randint(low, high))
+        return dict(params, starts=starts, steps=steps)
+
+    def distractors(self, params, answer, rng):
+        wrong = []
+        for position in range(len(answer)):
+            for delta in (1, -1, 2):
+                letters = list(answer)
+                letters[position] = _letters(ord(letters[position]) - ord("A") + delta)
+                wrong.append("".join(letters))
+        wrong.append(self.term(params, params["length"] + 1))
+        rng.shuffle(wrong)
+        return wrong
+
+    def explain(self, params, answer):
+        def move(step):
+            return f"{'advance' if step >= 0 else 'go back'} by {abs(step)}"
+        if len(params["steps"]) == 1:
+            return f"Each letter moves {'forward' if params['steps'][0] > 0 else 'back'} {abs(params['steps'][0])}. Answer: {answer}"
+        if len(params["steps"]) == 2:
+            first, second = params["steps"]
+            return f"First letters {move(first)}, second {move(second).split(' ', 1)[1] if first * second > 0 else move(second)}. Answer: {answer}"
+        parts = ", ".join(f"letter {i + 1} {move(step)}" for i, step in enumerate(params["steps"]))
+        return f"In each group, {parts}. Answer: {answer}"
+
+
+class CodeWordsFamily(Family):
+    """Caesar-shift codes: "If WORD is coded as YQTF, what is the code for TREE?" """
+    name = "code_words"
+    pattern = re.compile(r"(?<![A-Za-z])([A-Z]{3,})(?![A-Za-z])")
+
+    def parse(self, text):
+        words = list(self.pattern.finditer(text))
+        if len(words) != 3:
+            return None
+        example, coded, target = (m.group(1) for m in words)
+        if len(example) != len(coded):
+            return None
+        shifts = {(ord(c) - ord(e)) % 26 for e, c in zip(example, coded)}
+        if len(shifts) != 1 or 0 in shifts:
+            return None
+        params = {"example": example, "target": target, "shift": shifts.pop()}
+        return params, [w.span(1) for w in words]
+
+    def solve(self, params):
+        return apply_cipher(params["target"], params["shift"])
+
+    def fields(self, params):
+        return [params["example"], apply_cipher(params["example"], params["shift"]), params["target"]]
+
+    def sample(self, params, rng):
+        example = rng.choice(self.words_like(params["example"]))
+        target = rng.choice(self.words_like(params["target"]))
+        if target == example:
+            return None
+        size = params["shift"] if params["shift"] <= 13 else params["shift"] - 26
+        new = size + rng.choice([-1, 0, 1])
+        if new == 0 or abs(new) > 6:
+            new = size
+        return {"example": example, "target": target, "shift": new % 26}
+
+    @staticmethod
+    def words_like(word: str) -> List[str]:
+        """Words as long as word, or of the nearest length there are words for"""
+        length = min({len(w) for w in CODE_WORDS}, key=lambda n: (abs(n - len(word)), n))
+        return [w for w in CODE_WORDS if len(w) == length]
+
+    def distractors(self, params, answer, rng):
+        shift = params["shift"]
+        wrong = [apply_cipher(params["target"], s) for s in (shift + 1, shift - 1, -shift, shift + 2) if s % 26]
+        for _ in range(4):
+            letters = list(answer)
+            i, j = rng.sample(range(len(letters)), 2)
+            letters[i], letters[j] = letters[j], letters[i]
+            wrong.append("".join(letters))
+        for position in range(len(answer)):
+            letters = list(answer)
+            letters[position] = _letters(ord(letters[position]) - ord("A") + rng.choice([-1, 1]))
+            wrong.append("".join(letters))
+        return wrong
+
+    def explain(self, params, answer):
+        size = params["shift"] if params["shift"] <= 13 else params["shift"] - 26
+        places = f"{abs(size)} place{'s' if abs(size) != 1 else ''}"
+        steps = ", ".join(f"{a}->{b}" for a, b in zip(params["target"], answer))
+        return (f"Each letter is shifted {'forward' if size > 0 else 'backward'} by {places} in the alphabet. "
+                f"Applying this to {params['target']}: {steps}, giving {answer}.")
+
+
+_FRACTION = re.compile(r"\\frac\{(\d+)\}\{(\d+)\}|(?<![\d/\\{])(\d+)/(\d+)(?![\d/])")
+_DENOMINATORS = (2, 3, 4, 5, 6, 8, 9, 10, 12)
+
+
+def _parse_fraction(text: str) -> Optional[Fraction]:
+    m = _FRACTION.search(text)
+    if m is None or _normalize(_FRACTION.sub("", text)):
+        return None
+    top, bottom = (m.group(1), m.group(2)) if m.group(1) else (m.group(3), m.group(4))
+    return Fraction(int(top), int(bottom)) if int(bottom) else None
+
+
+class FractionSumFamily(Family):
+    r"""Sum or difference of two fractions, as \frac{a}{b} or a/b"""
+    name = "fraction_sum"
+
+    def parse(self, text):
+        matches = list(_FRACTION.finditer(text))
+        if len(matches) != 2:
+            return None
+        fractions = []
+        for m in matches:
+            latex = m.group(1) is not None
+            top, bottom = (int(m.group(1)), int(m.group(2))) if latex else (int(m.group(3)), int(m.group(4)))
+            if bottom == 0:
+                return None
+            fractions.append((top, bottom))
+        between = text[matches[0].end():matches[1].start()]
+        lowered = text.lower()
+        if "-" in between or "−" in between or "subtract" in lowered or "difference" in lowered:
+            op = "-"
+        elif "+" in between or "add" in lowered or "sum" in lowered or "and" in between:
+            op = "+"
+        else:
+            return None
+        params = {"fractions": fractions, "op": op, "latex": matches[0].group(1) is not None}
+        return params, [m.span() for m in matches]
+
+    @staticmethod
+    def value(params) -> Fraction:
+        (a, b), (c, d) = params["fractions"]
+        return Fraction(a, b) + Fraction(c, d) if params["op"] == "+" else Fraction(a, b) - Fraction(c, d)
+
+    @staticmethod
+    def format(value: Fraction, latex: bool, wrapped: bool = False) -> str:
+        text = f"\\frac{{{value.numerator}}}{{{value.denominator}}}" if latex else f"{value.numerator}/{value.denominator}"
+        return f"\\({text}\\)" if wrapped else text
+
+    def solve(self, params):
+        return self.format(self.value(params), params.get("answer_latex", params["latex"]),
+                           params.get("answer_wrapped", False))
+
+    def fields(self, params):
+        return [f"\\frac{{{a}}}{{{b}}}" if params["latex"] else f"{a}/{b}" for a, b in params["fractions"]]
+
+    def answer_key(self, answer):
+        return _parse_fraction(answer) or _normalize(answer)
+
+    def sample(self, params, rng):
+        fractions = []
+        for _, bottom in params["fractions"]:
+            choices = [d for d in _DENOMINATORS if abs(d - bottom) <= max(2, bottom // 2)] or list(_DENOMINATORS)
+            denominator = rng.choice(choices)
+            fractions.append((rng.randint(1, denominator - 1), denominator))
+        new = dict(params, fractions=fractions)
+        value, source = self.value(new), self.value(params)
+        if value <= 0 or (source < 1) != (value < 1) or value.denominator == 1:
+            return None
+        return new
+
+    def distractors(self, params, answer, rng):
+        (a, b), (c, d) = params["fractions"]
+        value = self.value(params)
+        common = lcm(b, d)
+        sign = 1 if params["op"] == "+" else -1
+        candidates = [
+            Fraction(a + sign * c, b + d) if b + d else None,            # Added tops and bottoms
+            Fraction(a + sign * c, max(b, d)),                           # Kept one denominator
+            value + Fraction(1, common),
+            value - Fraction(1, common),
+            Fraction(a * d + sign * c * b, b * d) + Fraction(1, b * d),
+            value * 2,
+        ]
+        latex, wrapped = params.get("answer_latex", params["latex"]), params.get("answer_wrapped", False)
+        return [self.format(v, latex, wrapped) for v in candidates if v is not None and v > 0 and v != value]
+
+    def explain(self, params, answer):
+        (a, b), (c, d) = params["fractions"]
+        common = lcm(b, d)
+        top = a * common // b + (1 if params["op"] == "+" else -1) * c * common // d
+        value = self.value(params)
+        steps = (f"Use a common denominator of {common}: {a}/{b} = {a * common // b}/{common} and "
+                 f"{c}/{d} = {c * common // d}/{common}. {'Adding' if params['op'] == '+' else 'Subtracting'} "
+                 f"gives {top}/{common}")
+        if Fraction(top, common).denominator != common:
+            steps += f", which simplifies to {value.numerator}/{value.denominator}"
+        return steps + "."
+
+
+FAMILIES: Sequence[Family] = (
+    CodeWordsFamily(), LetterSequenceFamily(), NumberSequenceFamily(), FractionSumFamily(), ArithmeticFamily(),
+)
+
+
+# ============================================================================
+# Templates
+# ============================================================================
+
+@dataclass
+class Template:
+    """A question's family, its inferred parameters and the text around them"""
+    family: Family
+    params: Dict[str, Any]
+    source: Dict[str, Any]
+    pieces: List[str] = field(default_factory=list)    # Text between the parameter spans
+
+    def describe(self) -> Dict[str, Any]:
+        return {"family": self.family.name, "params": self.params}
+
+
+def infer_template(question: Dict[str, Any]) -> Optional[Template]:
+    """
+    The template behind a question (dict with the questions-table columns), or
+    None if no family fits or the question's own answer doesn't check out
+    """
+    text = question.get("question_text") or ""
+    answer = str(question.get("correct_answer") or "")
+    for family in FAMILIES:
+        parsed = family.parse(text)
+        if parsed is None:
+            continue
+        params, spans = parsed
+        if isinstance(family, FractionSumFamily):
+            # Answers keep the notation the source used for its answer
+            params = dict(params, answer_latex="\\frac" in answer, answer_wrapped=answer.strip().startswith("\\("))
+        if family.answer_key(family.solve(params)) != family.answer_key(answer):
+            continue
+        pieces, position = [], 0
+        for start, end in spans:
+            pieces.append(text[position:start])
+            position = end
+        pieces.append(text[position:])
+        return Template(family, params, question, pieces)
+    return None
+
+
+def _render(template: Template, params: Dict[str, Any]) -> str:
+    parts = [template.pieces[0]]
+    for value, piece in zip(template.family.fields(params), template.pieces[1:]):
+        parts += [value, piece]
+    return "".join(parts)
+
+
+def instantiate(template: Template, rng: random.Random) -> Optional[Dict[str, Any]]:
+    """One verified variant, or None if this draw failed a check"""
+    family = template.family
+    params = family.sample(template.params, rng)
+    if params is None:
+        return None
+    text = _render(template, params)
+    answer = family.solve(params)
+
+    # Verify: the rendered text parses back to the same answer
+    parsed = family.parse(text)
+    if parsed is None:
+        return None
+    reparsed = dict(parsed[0], **{k: v for k, v in params.items() if k.startswith("answer_")})
+    key = family.answer_key(answer)
+    if family.answer_key(family.solve(reparsed)) != key:
+        return None
+
+    option_count = len(template.source.get("options") or []) or 5
+    options, keys = [answer], {key}
+    for wrong in family.distractors(params, answer, rng):
+        if len(options) == option_count:
+            break
+        wrong_key = family.answer_key(wrong)
+        if wrong_key not in keys:
+            options.append(wrong)
+            keys.add(wrong_key)
+    if len(options) < option_count:
+        return None
+    options = options[:1] + rng.sample(options[1:], len(options) - 1)
+    correct_index = rng.randrange(option_count)
+    options.insert(correct_index, options.pop(0))
+
+    source = template.source
+    return {
+        "id": str(uuid.uuid4()),
+        "exam_type": source.get("exam_type") or "11plus_gl",
+        "subject": source["subject"],
+        "topic": source.get("topic"),
+        "question_type": source["question_type"],
+        "difficulty": source.get("difficulty") or 3,
+        "question_text": text,
+        "options": options,
+        "correct_answer": answer,
+        "correct_index": correct_index,
+        "marks_available": source.get("marks_available") or 1,
+        "worked_solution": family.explain(params, answer),
+        "tags": source.get("tags"),
+        "source": "mimic",
+        "source_reference": source.get("id"),
+    }
+
+
+def mimic(question: Dict[str, Any], count: int, seed: Optional[int] = None,
+          exclude: Sequence[str] = ()) -> Tuple[Optional[Template], List[Dict[str, Any]]]:
+    """
+    Up to `count` distinct verified variants of a question (fewer when its
+    parameter space runs out); the template is None when none was found
+
+    Variants never repeat the source's text or anything in `exclude`.
+    """
+    template = infer_template(question)
+    if template is None:
+        return None, []
+    rng = random.Random(seed)
+    seen = {question.get("question_text"), *exclude}
+    variants, misses = [], 0
+    for _ in range(count * ATTEMPTS_PER_VARIANT):
+        if len(variants) == count or misses == MAX_MISSES:
+            break
+        variant = instantiate(template, rng)
+        if variant is None or variant["question_text"] in seen:
+            misses += 1
+            continue
+        misses = 0
+        seen.add(variant["question_text"])
+        variants.append(variant)
+    return template, variants
+
+
+# ============================================================================
+# Saving
+# ============================================================================
+
+def question_dict(question: Question) -> Dict[str, Any]:
+    """A bank question as the dict infer_template/mimic take"""
+    return {column.name: getattr(question, column.name) for column in Question.__table__.columns}
+
+
+def save_variants(db, variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add variants to the bank (committed), skipping any whose text it already has; returns those added"""
+    texts = {v["question_text"] for v in variants}
+    existing = set()
+    for chunk in (list(texts)[i:i + 500] for i in range(0, len(texts), 500)):
+        existing.update(text for (text,) in db.query(Question.question_text).filter(Question.question_text.in_(chunk)))
+    added = [v for v in variants if v["question_text"] not in existing]
+    db.add_all(Question(**v) for v in added)
+    db.commit()
+    return added
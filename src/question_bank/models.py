@@ -84,8 +84,8 @@ class Question:
     # Answer options (for multiple choice)
     options: Optional[List[str]] = None
 
-    # Correct answer
-    correct_answer: str
+    # Correct answer (defaulted only so it can follow the optional fields above)
+    correct_answer: str = ""
     correct_answer_index: Optional[int] = None  # For multiple choice
 
     # Mark scheme
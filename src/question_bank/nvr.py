@@ -0,0 +1,284 @@
+"""
+NVR Scene Model
+Compact shape descriptions for Non-Verbal Reasoning questions, rendered to SVG on demand
+"""
+
+import json
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Canvas used by every NVR tile (matches the original SVGShapeGenerator)
+CANVAS_SIZE = 80
+CENTER = CANVAS_SIZE // 2
+DEFAULT_SIZE = CENTER - 5        # Outer radius / half-width of a full-size shape
+DEFAULT_INNER_SIZE = 14
+STROKE_WIDTH = 2
+
+SCENE_VERSION = 1
+# Bumped when the SVG rendered from a scene changes, so static packs are rebuilt
+SVG_VERSION = 2
+
+# ============================================================================
+# Symbol Library
+# ============================================================================
+
+# Unit shapes (radius 1, centred on the origin), placed with a
+# translate/rotate/scale transform instead of absolute points for every size
+# and rotation. Rendered tiles draw them inline: several tiles sit on one
+# page, and ids inside each would clash. Clients rendering nvr_format=scene
+# themselves load the library once (symbol_library) and <use> it.
+_TRI_H = 2 / math.sqrt(3)
+
+
+def _polygon_path(points: List[Tuple[float, float]]) -> str:
+    return "M" + "L".join(f"{_fmt(x)} {_fmt(y)}" for x, y in points) + "Z"
+
+
+def _regular_points(sides: int, inner_ratio: Optional[float] = None) -> List[Tuple[float, float]]:
+    count = sides * 2 if inner_ratio else sides
+    points = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count - math.pi / 2
+        radius = inner_ratio if inner_ratio and i % 2 else 1
+        points.append((radius * math.cos(angle), radius * math.sin(angle)))
+    return points
+
+
+def _fmt(value: float) -> str:
+    """Format a number compactly (no trailing zeros, at most 3 decimals)"""
+    text = f"{value:.3f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+SYMBOLS: Dict[str, Dict[str, str]] = {
+    "circle": {"tag": "circle", "attrs": 'r="1"', "stroke": "#1E40AF"},
+    "square": {"tag": "path", "attrs": 'd="M-1 -1H1V1H-1Z"', "stroke": "#B91C1C"},
+    "triangle": {
+        "tag": "path",
+        "attrs": f'd="{_polygon_path([(0, -_TRI_H), (-1, _TRI_H / 2), (1, _TRI_H / 2)])}"',
+        "stroke": "#047857",
+    },
+    "pentagon": {"tag": "path", "attrs": f'd="{_polygon_path(_regular_points(5))}"', "stroke": "#B45309"},
+    "hexagon": {"tag": "path", "attrs": f'd="{_polygon_path(_regular_points(6))}"', "stroke": "#6D28D9"},
+    "star": {"tag": "path", "attrs": f'd="{_polygon_path(_regular_points(5, 0.4))}"', "stroke": "#BE185D"},
+    "diamond": {"tag": "path", "attrs": 'd="M0 -1L1 0L0 1L-1 0Z"', "stroke": "#0E7490"},
+}
+
+
+def symbol_def(shape: str) -> str:
+    """The <defs> entry for a shape in the shared symbol library"""
+    symbol = SYMBOLS[shape]
+    return f'<{symbol["tag"]} id="nvr-{shape}" {symbol["attrs"]} stroke="{symbol["stroke"]}"/>'
+
+
+def symbol_library() -> str:
+    """All shape symbols as a single <defs> block"""
+    return "<defs>" + "".join(symbol_def(shape) for shape in SYMBOLS) + "</defs>"
+
+
+# ============================================================================
+# Scene Model
+# ============================================================================
+
+@dataclass(frozen=True)
+class Shape:
+    """A single NVR tile: one shape, optionally with a smaller shape inside it"""
+    shape: str
+    fill: str = "#3B82F6"
+    rotation: float = 0
+    size: float = DEFAULT_SIZE
+    inner: Optional["Shape"] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Shape":
+        if data.get("shape") not in SYMBOLS:
+            raise ValueError(f"Unknown NVR shape: {data.get('shape')!r}")
+        inner = data.get("inner")
+        return cls(
+            shape=data["shape"],
+            fill=data.get("fill", cls.fill),
+            rotation=data.get("rotation", 0),
+            size=data.get("size", DEFAULT_SIZE),
+            inner=cls.from_dict({"size": DEFAULT_INNER_SIZE, **inner}) if inner else None,
+        )
+
+    def to_dict(self, is_inner: bool = False) -> Dict[str, Any]:
+        """Compact dict form - default values are omitted"""
+        data: Dict[str, Any] = {"shape": self.shape, "fill": self.fill}
+        if self.rotation:
+            data["rotation"] = self.rotation
+        if self.size != (DEFAULT_INNER_SIZE if is_inner else DEFAULT_SIZE):
+            data["size"] = self.size
+        if self.inner:
+            data["inner"] = self.inner.to_dict(is_inner=True)
+        return data
+
+
+def is_scene(value: Any) -> bool:
+    """True if the value is a scene dict rather than pre-rendered SVG markup"""
+    return isinstance(value, dict) and "shape" in value
+
+
+# ============================================================================
+# Rendering
+# ============================================================================
+
+def _element(shape: Shape) -> str:
+    symbol = SYMBOLS[shape.shape]
+    transform = f"translate({CENTER} {CENTER})"
+    if shape.rotation:
+        transform += f" rotate({_fmt(shape.rotation)})"
+    transform += f" scale({_fmt(shape.size)})"
+    # Shapes are unit-sized, so the 2px outline is expressed in unit space
+    stroke_width = _fmt(STROKE_WIDTH / shape.size)
+    return (
+        f'<{symbol["tag"]} {symbol["attrs"]} fill="{shape.fill}" stroke="{symbol["stroke"]}" '
+        f'stroke-width="{stroke_width}" transform="{transform}"/>'
+    )
+
+
+@lru_cache(maxsize=4096)
+def render_shape(shape: Shape) -> str:
+    """Render a tile to a standalone SVG string with no ids (cached per distinct shape)"""
+    body = _element(shape) + (_element(shape.inner) if shape.inner else "")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {CANVAS_SIZE} {CANVAS_SIZE}" '
+        f'width="{CANVAS_SIZE}" height="{CANVAS_SIZE}">{body}</svg>'
+    )
+
+
+def render_value(value: Any) -> Any:
+    """Render a scene dict to SVG; legacy SVG strings and plain text pass through"""
+    if is_scene(value):
+        return render_shape(Shape.from_dict(value))
+    return value
+
+
+# Keys inside an NVR question_text payload that hold tiles
+_TILE_KEYS = ("sequence", "shapes", "pair1", "pair2_first")
+
+
+def _map_payload(payload: Dict[str, Any], func) -> Dict[str, Any]:
+    result = dict(payload)
+    for key in _TILE_KEYS:
+        if key not in result:
+            continue
+        value = result[key]
+        result[key] = [func(v) for v in value] if isinstance(value, list) else func(value)
+    return result
+
+
+def render_question(question_text: str, options: Optional[List[Any]]) -> Tuple[str, Optional[List[Any]]]:
+    """
+    Expand the scenes in an NVR question into SVG markup
+
+    Returns (question_text, options) in the same shape the frontend has always
+    received, so stored scenes are invisible to clients.
+    """
+    rendered_options = [render_value(o) for o in options] if options else options
+    try:
+        payload = json.loads(question_text)
+    except (TypeError, ValueError):
+        return question_text, rendered_options
+    if not isinstance(payload, dict) or "scene_version" not in payload:
+        return question_text, rendered_options
+
+    payload = _map_payload(payload, render_value)
+    payload.pop("scene_version")
+    return json.dumps(payload), rendered_options
+
+
+# ============================================================================
+# Legacy SVG Conversion
+# ============================================================================
+
+_ELEMENT_RE = re.compile(r"<(circle|rect|polygon)\b([^>]*)/>")
+_ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+_ROTATE_RE = re.compile(r"rotate\(\s*([-\d.]+)")
+_POLYGON_SHAPES = {3: "triangle", 4: "diamond", 5: "pentagon", 6: "hexagon", 10: "star"}
+
+
+def _parse_element(tag: str, attr_text: str) -> Optional[Shape]:
+    attrs = dict(_ATTR_RE.findall(attr_text))
+    rotation_match = _ROTATE_RE.search(attrs.get("transform", ""))
+    rotation = float(rotation_match.group(1)) if rotation_match else 0
+    fill = attrs.get("fill", Shape.fill)
+
+    if tag == "circle":
+        shape, size = "circle", float(attrs["r"])
+    elif tag == "rect":
+        shape, size = "square", float(attrs["width"]) / 2
+    else:
+        points = [tuple(map(float, p.split(","))) for p in attrs["points"].split()]
+        shape = _POLYGON_SHAPES.get(len(points))
+        if not shape:
+            return None
+        cx = sum(x for x, _ in points) / len(points)
+        cy = sum(y for _, y in points) / len(points)
+        radius = max(math.hypot(x - cx, y - cy) for x, y in points)
+        size = radius / _TRI_H if shape == "triangle" else radius
+
+    size = round(size, 1)
+    return Shape(
+        shape=shape,
+        fill=fill,
+        rotation=int(rotation) if rotation == int(rotation) else rotation,
+        size=int(size) if size == int(size) else size,
+    )
+
+
+def svg_to_scene(svg: str) -> Optional[Dict[str, Any]]:
+    """
+    Convert a tile produced by the old SVGShapeGenerator into a scene dict
+
+    Returns None for markup that does not match the generator's output, so
+    callers can keep the original SVG for anything hand-made.
+    """
+    if not isinstance(svg, str) or not svg.lstrip().startswith("<svg"):
+        return None
+    elements = _ELEMENT_RE.findall(svg)
+    if not 1 <= len(elements) <= 2:
+        return None
+    try:
+        shapes = [_parse_element(tag, attrs) for tag, attrs in elements]
+    except (KeyError, ValueError):
+        return None
+    if any(s is None for s in shapes):
+        return None
+
+    outer = shapes[0]
+    if len(shapes) == 2:
+        outer = Shape(outer.shape, outer.fill, outer.rotation, outer.size, inner=shapes[1])
+    return outer.to_dict()
+
+
+def compact_question(question_text: str, options: Optional[List[Any]]) -> Tuple[str, Optional[List[Any]]]:
+    """
+    Replace inline SVG in an NVR question with scene dicts for storage
+
+    Tiles that cannot be converted are left as SVG; the renderer passes them
+    through unchanged.
+    """
+    def compact(value: Any) -> Any:
+        return svg_to_scene(value) or value
+
+    compact_options = [compact(o) for o in options] if options else options
+    try:
+        payload = json.loads(question_text)
+    except (TypeError, ValueError):
+        return question_text, compact_options
+    if not isinstance(payload, dict) or "type" not in payload:
+        return question_text, compact_options
+
+    payload = _map_payload(payload, compact)
+    payload["scene_version"] = SCENE_VERSION
+    return json.dumps(payload, separators=(",", ":")), compact_options
+
+
+def storage_size(question_text: str, options: Optional[List[Any]]) -> int:
+    """Bytes a question's content occupies when stored (used for reporting)"""
+    return len(question_text.encode()) + len(json.dumps(options or []).encode())
+
@@ -0,0 +1,287 @@
+"""
+Question Pack
+Read-only, memory-mapped binary copy of the question bank for low-power devices
+
+Built by scripts/build_question_pack.py. Opening a pack maps the file and
+reads the header and facet directory; records and strings are only decoded
+when a request touches them, so startup is near-instant and resident memory
+stays at the pages actually read.
+
+Layout (little-endian):
+
+    header          magic, version, record size, counts, section offsets
+    string offsets  (strings + 1) x u32, into the string data
+    string data     UTF-8, every distinct value stored once
+    records         one fixed-size struct per question, in bank order
+    id order        record numbers sorted by question id (binary search)
+    facets          (facet, value string, start, count) x u32, sorted
+    postings        record numbers per facet value, ascending
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.core.database import normalize_tag
+
+MAGIC = b"QPAK"
+VERSION = 1
+NULL = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHHII7Q")
+_FACET = struct.Struct("<4I")
+_RECORD_STRINGS = (
+    "id", "exam_type", "subject", "topic", "question_type", "question_text", "options",
+    "correct_answer", "worked_solution", "hint", "tags",
+)
+_JSON_FIELDS = ("options", "tags")
+# String references, then difficulty, marks_available and correct_index (-1 = none)
+_RECORD = struct.Struct(f"<{len(_RECORD_STRINGS)}IBBh")
+
+# Facet codes; difficulty values are stored as strings ("3")
+FACETS = ("exam_type", "subject", "question_type", "difficulty", "tag")
+
+
+class PackError(ValueError):
+    """The file isn't a question pack this version can read"""
+
+
+@dataclass
+class PackedQuestion:
+    """One question from a pack; has the attributes the API serializes from a DB row"""
+    id: str
+    exam_type: str
+    subject: str
+    topic: Optional[str]
+    question_type: str
+    difficulty: int
+    question_text: str
+    options: Optional[List[Any]]
+    correct_answer: str
+    correct_index: Optional[int]
+    marks_available: int
+    worked_solution: Optional[str]
+    hint: Optional[str]
+    tags: Optional[List[str]]
+
+
+# ============================================================================
+# Reader
+# ============================================================================
+
+class QuestionPack:
+    """A memory-mapped pack; safe to share between threads"""
+
+    def __init__(self, path, mtime: float = 0.0):
+        if sys.byteorder != "little":
+            raise PackError("Question packs can only be read on little-endian machines")
+        self.path = Path(path)
+        self.mtime = mtime
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise PackError(f"{self.path} is too small to be a question pack")
+        (magic, version, record_size, self.count, string_count, string_offsets, string_data, records,
+         id_order, facets, postings, end) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != _RECORD.size or end != len(self._map):
+            raise PackError(f"{self.path} is not a version {VERSION} question pack")
+
+        view = memoryview(self._map)
+        self._string_offsets = view[string_offsets:string_data].cast("I")
+        self._string_data = string_data
+        self._records = records
+        self._id_order = view[id_order:facets].cast("I")
+        self._postings = view[postings:end].cast("I")
+        # The facet directory is small (one entry per distinct value); decode it once
+        self._facets: Dict[tuple, tuple] = {}
+        for offset in range(facets, postings, _FACET.size):
+            code, value, start, count = _FACET.unpack_from(self._map, offset)
+            self._facets[(FACETS[code], self._string(value))] = (start, count)
+
+    @classmethod
+    def load(cls, path) -> Optional["QuestionPack"]:
+        """Open a pack, or None if there's no file at path"""
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        return cls(path, mtime)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == NULL:
+            return None
+        start = self._string_data + self._string_offsets[index]
+        end = self._string_data + self._string_offsets[index + 1]
+        return str(self._map[start:end], "utf-8")
+
+    def question(self, record: int) -> PackedQuestion:
+        fields = _RECORD.unpack_from(self._map, self._records + record * _RECORD.size)
+        values = {name: self._string(ref) for name, ref in zip(_RECORD_STRINGS, fields)}
+        for name in _JSON_FIELDS:
+            if values[name] is not None:
+                values[name] = json.loads(values[name])
+        difficulty, marks, correct_index = fields[len(_RECORD_STRINGS):]
+        return PackedQuestion(
+            difficulty=difficulty, marks_available=marks,
+            correct_index=None if correct_index < 0 else correct_index, **values,
+        )
+
+    def get(self, question_id: str) -> Optional[PackedQuestion]:
+        """Look a question up by id (binary search over the id order)"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._id_order[mid]
+            found = self._string(_RECORD.unpack_from(self._map, self._records + record * _RECORD.size)[0])
+            if found == question_id:
+                return self.question(record)
+            if found < question_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _posting(self, facet: str, value: str) -> Sequence[int]:
+        start, count = self._facets.get((facet, value), (0, 0))
+        return self._postings[start:start + count]
+
+    def _postings_for(self, filters: Dict[str, Any], tags: Iterable[str]) -> List[Sequence[int]]:
+        """One posting list per filter, shortest first"""
+        lists = [self._posting(facet, str(value)) for facet, value in filters.items() if value]
+        lists += [self._posting("tag", normalize_tag(tag)) for tag in tags if tag.strip()]
+        return sorted(lists, key=len)
+
+    def _matches(self, filters: Dict[str, Any], tags: Iterable[str] = ()) -> Iterator[int]:
+        """Record numbers matching every filter, in bank order"""
+        lists = self._postings_for(filters, tags)
+        if not lists:
+            yield from range(self.count)
+            return
+        # Walk the shortest list, checking the others by binary search, so a
+        # page can stop as soon as it's full
+        driver, others = lists[0], lists[1:]
+        for record in driver:
+            for other in others:
+                i = bisect.bisect_left(other, record)
+                if i == len(other) or other[i] != record:
+                    break
+            else:
+                yield record
+
+    def select(self, filters: Dict[str, Any], tags: Iterable[str] = (), offset: int = 0,
+               limit: int = 10) -> List[PackedQuestion]:
+        """A page of questions matching the filters (facet name -> value) and all tags"""
+        page = []
+        for i, record in enumerate(self._matches(filters, tags)):
+            if i >= offset + limit:
+                break
+            if i >= offset:
+                page.append(self.question(record))
+        return page
+
+    def count_matching(self, filters: Dict[str, Any], tags: Iterable[str] = ()) -> int:
+        lists = self._postings_for(filters, tags)
+        if not lists:
+            return self.count
+        if len(lists) == 1:
+            return len(lists[0])
+        # Counting has to see every match anyway; set intersection does it in C
+        return len(set(lists[0]).intersection(*lists[1:]))
+
+    def close(self):
+        self._string_offsets.release()
+        self._id_order.release()
+        self._postings.release()
+        self._map.close()
+
+
+# ============================================================================
+# Builder
+# ============================================================================
+
+def build_pack(questions: Iterable[Dict[str, Any]], path) -> Dict[str, int]:
+    """
+    Write questions (dicts with the questions-table columns) to a pack file
+
+    Questions keep the order given, which is the order the API pages through.
+    The file is written next to the target and renamed into place, so a
+    serving process never maps a half-written pack.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return NULL
+        return strings.setdefault(value, len(strings))
+
+    records = []
+    ids = []
+    facets: Dict[tuple, List[int]] = {}
+    for number, q in enumerate(questions):
+        tags = sorted({normalize_tag(t) for t in q.get("tags") or [] if isinstance(t, str) and t.strip()})
+        values = dict(q, tags=tags or None)
+        refs = [
+            intern(json.dumps(values[name], separators=(",", ":")) if name in _JSON_FIELDS and values.get(name) is not None
+                   else values.get(name))
+            for name in _RECORD_STRINGS
+        ]
+        correct_index = q.get("correct_index")
+        records.append(_RECORD.pack(
+            *refs, int(q.get("difficulty") or 0), int(q.get("marks_available") or 1),
+            -1 if correct_index is None else int(correct_index),
+        ))
+        ids.append((q["id"], number))
+        for facet in FACETS[:-1]:
+            if q.get(facet) is not None:
+                facets.setdefault((FACETS.index(facet), str(q[facet])), []).append(number)
+        for tag in tags:
+            facets.setdefault((FACETS.index("tag"), tag), []).append(number)
+
+    directory = []
+    postings: List[int] = []
+    for (code, value), numbers in sorted(facets.items()):
+        directory.append(_FACET.pack(code, intern(value), len(postings), len(numbers)))
+        postings.extend(numbers)
+
+    data = bytearray()
+    offsets = []
+    for value in strings:    # Insertion order == string index
+        offsets.append(len(data))
+        data += value.encode("utf-8")
+    offsets.append(len(data))
+
+    def u32(values: List[int]) -> bytes:
+        return struct.pack(f"<{len(values)}I", *values)
+
+    sections = [
+        u32(offsets),
+        bytes(data) + b"\0" * (-len(data) % 4),    # Keep the following sections 4-byte aligned
+        b"".join(records),
+        u32([number for _, number in sorted(ids)]),
+        b"".join(directory),
+        u32(postings),
+    ]
+    starts = []
+    position = _HEADER.size
+    for section in sections:
+        starts.append(position)
+        position += len(section)
+    header = _HEADER.pack(MAGIC, VERSION, _RECORD.size, len(records), len(strings), *starts, position)
+
+    target = Path(path)
+    staging = target.with_name(target.name + ".tmp")
+    with open(staging, "wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(staging, target)
+    return {"questions": len(records), "strings": len(strings), "facet_values": len(directory), "bytes": position}
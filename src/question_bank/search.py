@@ -0,0 +1,147 @@
+"""
+Question Search
+Ranked full-text search over the question bank (SQLite FTS5, see
+create_question_search in src.core.database)
+"""
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, text as sql_text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.core.database import QUESTION_SEARCH_TABLE
+
+# bm25 column weights, in QUESTION_SEARCH_COLUMNS order: a hit in the question
+# itself counts for more than one in the options, solution or hint
+RANK_WEIGHTS = (10.0, 4.0, 1.0, 1.0)
+
+# Highlight markers FTS5 inserts; swapped for <mark> after HTML-escaping the text
+_OPEN, _CLOSE = "\x02", "\x03"
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+# Matches are counted up to this many; beyond it the UI shows "1000+"
+COUNT_LIMIT = 1000
+
+
+class SearchError(ValueError):
+    """The search text couldn't be turned into a query"""
+
+
+@dataclass
+class SearchFilters:
+    exam_type: Optional[str] = None
+    subject: Optional[str] = None
+    question_type: Optional[str] = None
+    difficulty: Optional[int] = None
+
+
+def fts_query(text: str, prefix_last: bool = True) -> str:
+    """
+    Turn user text into an FTS5 query
+
+    Words are ANDed, "quoted phrases" stay phrases, and the last bare word
+    matches as a prefix so results appear while typing. Everything is quoted,
+    so FTS5 operators in the input are treated as plain words.
+    """
+    terms = []
+    matches = list(_TERM_RE.finditer(text))
+    for i, match in enumerate(matches):
+        phrase, word = match.groups()
+        value = (phrase or word).replace('"', "").strip()
+        if not value:
+            continue
+        term = '"' + value + '"'
+        if word and prefix_last and i == len(matches) - 1:
+            term += "*"
+        terms.append(term)
+    if not terms:
+        raise SearchError("Search text is empty")
+    return " ".join(terms)
+
+
+def _marked(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return html.escape(text).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def search_questions(
+    db: Session,
+    text: str,
+    filters: SearchFilters,
+    limit: int = 20,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    Best matches first (bm25), with the matched words in <mark> tags
+
+    Returns {"total": n, "more": bool, "results": [...]}, where total stops at
+    COUNT_LIMIT and `more` says there were further matches. Each result has the question
+    fields an author needs plus `highlight` (the full question text) and
+    `snippet` (the best matching fragment from any indexed column).
+    """
+    fts = QUESTION_SEARCH_TABLE
+    conditions = [f"{fts} MATCH :query"]
+    params: Dict[str, Any] = {"query": fts_query(text)}
+    for column in ("exam_type", "subject", "question_type", "difficulty"):
+        value = getattr(filters, column)
+        if value is not None:
+            conditions.append(f"q.{column} = :{column}")
+            params[column] = value
+    # The join is only needed to filter; unfiltered searches stay inside the index
+    source = f"{fts} JOIN questions q ON q.rowid = {fts}.rowid" if len(conditions) > 1 else fts
+    matches = f"{source} WHERE " + " AND ".join(conditions)
+    weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+
+    try:
+        # Rank every match, but fetch rows and build highlights for one page only
+        ranked = db.execute(sql_text(f"""
+            SELECT {fts}.rowid AS rowid, bm25({fts}, {weights}) AS rank
+            FROM {matches}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """), {**params, "limit": limit, "offset": offset}).all()
+        total = db.execute(
+            sql_text(f"SELECT count(*) FROM (SELECT 1 FROM {matches} LIMIT {COUNT_LIMIT + 1})"), params
+        ).scalar()
+
+        rows = {}
+        if ranked:
+            page = db.execute(sql_text(f"""
+                SELECT q.rowid AS rowid, q.id, q.exam_type, q.subject, q.question_type, q.difficulty,
+                       q.question_text,
+                       highlight({fts}, 0, :open, :close) AS highlight,
+                       snippet({fts}, -1, :open, :close, '...', 16) AS snippet
+                FROM {fts} JOIN questions q ON q.rowid = {fts}.rowid
+                WHERE {fts} MATCH :query AND {fts}.rowid IN :rowids
+            """).bindparams(bindparam("rowids", expanding=True)), {
+                "query": params["query"], "open": _OPEN, "close": _CLOSE,
+                "rowids": [r.rowid for r in ranked],
+            }).mappings().all()
+            rows = {row["rowid"]: row for row in page}
+    except OperationalError as e:
+        if "fts5" in str(e).lower() or "syntax" in str(e).lower():
+            raise SearchError("Could not understand the search text") from e
+        raise
+
+    results: List[Dict[str, Any]] = []
+    for hit in ranked:
+        row = rows.get(hit.rowid)
+        if row is None:
+            continue
+        results.append({
+            "id": row["id"],
+            "exam_type": row["exam_type"],
+            "subject": row["subject"],
+            "question_type": row["question_type"],
+            "difficulty": row["difficulty"],
+            "question_text": row["question_text"],
+            "highlight": _marked(row["highlight"]),
+            "snippet": _marked(row["snippet"]),
+            "score": round(-hit.rank, 4),
+        })
+    return {"total": min(total, COUNT_LIMIT), "more": total > COUNT_LIMIT, "results": results}
@@ -0,0 +1,174 @@
+"""
+Static Question Packs
+Exports the question bank as content-hashed JSON files for a static server/CDN
+
+One pack per (exam_type, subject, question_type, difficulty), holding the
+questions exactly as /api/questions returns them (no answers). Each pack is
+written as name.<hash>.json plus .json.gz and, when brotli is installed,
+.json.br, so a server with precompressed-file support (nginx gzip_static /
+brotli_static, most CDNs) serves them without compressing. Filenames change
+with content, so packs can be cached forever; manifest.json lists them and
+is served by /api/packs/manifest.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.question_bank import nvr
+
+try:
+    import brotli
+except ImportError:    # Optional: packs are still written with gzip
+    brotli = None
+
+MANIFEST_FILE = "manifest.json"
+# Bump when the pack JSON changes shape; part of every source hash, so all packs rebuild
+PACK_FORMAT = 1
+
+# QuestionResponse fields, in order
+PACK_FIELDS = (
+    "id", "exam_type", "subject", "topic", "question_type", "difficulty",
+    "question_text", "options", "marks_available", "hint",
+)
+GROUP_FIELDS = ("exam_type", "subject", "question_type", "difficulty")
+_HASH_LENGTH = 16
+
+# Brotli's best quality is ~7% smaller on typical packs but far too slow on
+# multi-megabyte ones (minutes, and no smaller), so big packs use quality 9
+BROTLI_QUALITY = 11
+BROTLI_LARGE_QUALITY = 9
+BROTLI_LARGE_BYTES = 1 << 20
+
+
+def _encode(content: Any) -> bytes:
+    # Same bytes the API sends (see src.api.http_cache)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _question(row: Dict[str, Any]) -> Dict[str, Any]:
+    question = {field: row[field] for field in PACK_FIELDS}
+    question["options"] = json.loads(row["options"]) if row["options"] else None
+    if question["subject"] == "non_verbal_reasoning":
+        question["question_text"], question["options"] = nvr.render_question(
+            question["question_text"], question["options"]
+        )
+    return question
+
+
+def load_manifest(out_dir) -> Optional[Dict[str, Any]]:
+    path = Path(out_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _pack_name(group: Tuple) -> str:
+    exam_type, subject, question_type, difficulty = group
+    return f"{exam_type}/{subject}/{question_type}-d{difficulty}"
+
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(path.name + ".tmp")
+    staging.write_bytes(data)
+    os.replace(staging, path)
+
+
+def export_packs(db_path: str, out_dir: str, force: bool = False,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """
+    Write packs for every group, skipping groups whose questions haven't changed
+
+    A group is unchanged when the hash of its source rows (plus PACK_FORMAT and
+    the NVR scene version) matches the manifest and its files still exist.
+    Files from the previous manifest are kept for one more export, so clients
+    holding the old manifest don't get 404s; anything older is deleted.
+    progress(done, total) is called after each pack.
+    """
+    root = Path(out_dir)
+    previous = load_manifest(root) or {"packs": []}
+    known = {pack["name"]: pack for pack in previous["packs"]}
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        total = 0
+        if progress is not None:
+            total = conn.execute(
+                f"SELECT count(*) FROM (SELECT 1 FROM questions GROUP BY {', '.join(GROUP_FIELDS)})"
+            ).fetchone()[0]
+        order = "pk" if "pk" in {row[1] for row in conn.execute("PRAGMA table_info(questions)")} else "rowid"
+        rows = conn.execute(f"""
+            SELECT {', '.join(PACK_FIELDS)} FROM questions
+            ORDER BY {', '.join(GROUP_FIELDS)}, {order}
+        """)
+        stats = {"packs": 0, "written": 0, "unchanged": 0, "removed": 0, "questions": 0, "bytes": 0}
+        packs: List[Dict[str, Any]] = []
+        for group, members in groupby(rows, key=lambda row: tuple(row[f] for f in GROUP_FIELDS)):
+            members = [dict(row) for row in members]
+            name = _pack_name(group)
+            source = hashlib.sha256(f"{PACK_FORMAT}:{nvr.SCENE_VERSION}:{nvr.SVG_VERSION}".encode())
+            for row in members:
+                source.update(_encode([row[field] for field in PACK_FIELDS]))
+            source_hash = source.hexdigest()
+
+            entry = known.get(name)
+            files = [root / entry[key] for key in ("path", "gzip_path", "brotli_path") if entry and entry.get(key)]
+            if (not force and entry and entry["source_hash"] == source_hash
+                    and all(path.exists() for path in files)
+                    and (brotli is None or entry.get("brotli_path"))):
+                packs.append(entry)
+                stats["unchanged"] += 1
+            else:
+                body = _encode([_question(row) for row in members])
+                digest = hashlib.sha256(body).hexdigest()
+                path = f"{name}.{digest[:_HASH_LENGTH]}.json"
+                compressed = gzip.compress(body, compresslevel=9, mtime=0)
+                _write(root / path, body)
+                _write(root / f"{path}.gz", compressed)
+                entry = {
+                    "name": name,
+                    **dict(zip(GROUP_FIELDS, group)),
+                    "count": len(members),
+                    "path": path,
+                    "gzip_path": f"{path}.gz",
+                    "bytes": len(body),
+                    "gzip_bytes": len(compressed),
+                    "sha256": digest,
+                    "source_hash": source_hash,
+                }
+                if brotli is not None:
+                    quality = BROTLI_QUALITY if len(body) <= BROTLI_LARGE_BYTES else BROTLI_LARGE_QUALITY
+                    compressed = brotli.compress(body, quality=quality)
+                    _write(root / f"{path}.br", compressed)
+                    entry.update(brotli_path=f"{path}.br", brotli_bytes=len(compressed))
+                packs.append(entry)
+                stats["written"] += 1
+            stats["packs"] += 1
+            stats["questions"] += entry["count"]
+            stats["bytes"] += entry["bytes"]
+            if progress is not None:
+                progress(stats["packs"], total)
+    finally:
+        conn.close()
+
+    manifest = {"format": PACK_FORMAT, "generated_at": datetime.utcnow().isoformat(), "packs": packs}
+    if packs != previous["packs"]:
+        _write(root / MANIFEST_FILE, json.dumps(manifest, indent=1).encode("utf-8"))
+
+    # Keep the files both manifests reference; drop the rest
+    keep = {MANIFEST_FILE}
+    for pack in packs + previous["packs"]:
+        keep.update(pack[key] for key in ("path", "gzip_path", "brotli_path") if pack.get(key))
+    for path in root.rglob("*.json*"):
+        if path.relative_to(root).as_posix() not in keep:
+            path.unlink()
+            stats["removed"] += 1
+    return stats
@@ -0,0 +1,665 @@
+"""
+Worksheet Engine
+Printable HTML worksheets rendered from a shared template and an in-memory question pool
+"""
+
+import html
+import json
+import random
+import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+# Question types that don't work on paper
+EXCLUDED_SUBJECTS = {"non_verbal_reasoning"}      # SVG doesn't print well without special handling
+EXCLUDED_TYPES = {"comprehension"}                 # Passages too long for worksheets
+
+POOL_COLUMNS = ("id", "subject", "question_type", "difficulty", "question_text", "options", "correct_index")
+
+# Share of a personalised worksheet drawn from the student's weak topics
+WEAK_TOPIC_SHARE = 0.7
+
+
+# ============================================================================
+# Template (compiled once at import)
+# ============================================================================
+
+_STYLE = """
+        @media print {
+            body { margin: 0; }
+            .no-print { display: none; }
+            .page-break { page-break-after: always; }
+        }
+
+        body {
+            font-family: Arial, sans-serif;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            line-height: 1.4;
+        }
+
+        .header {
+            text-align: center;
+            margin-bottom: 30px;
+            border-bottom: 2px solid #333;
+            padding-bottom: 15px;
+        }
+
+        .header h1 {
+            margin: 0;
+            font-size: 24px;
+        }
+
+        .header p {
+            margin: 5px 0;
+            color: #666;
+        }
+
+        .student-info {
+            display: flex;
+            gap: 20px;
+            margin-bottom: 20px;
+        }
+
+        .student-info label {
+            display: flex;
+            align-items: center;
+            gap: 10px;
+        }
+
+        .student-info input {
+            border: none;
+            border-bottom: 1px solid #333;
+            width: 150px;
+            padding: 5px;
+        }
+
+        .question {
+            margin-bottom: 25px;
+            padding-bottom: 15px;
+            border-bottom: 1px solid #eee;
+        }
+
+        .question-number {
+            font-weight: bold;
+            color: #333;
+        }
+
+        .question-text {
+            margin: 10px 0;
+            font-size: 14px;
+        }
+
+        .options {
+            display: grid;
+            grid-template-columns: repeat(2, 1fr);
+            gap: 8px;
+            margin-top: 10px;
+        }
+
+        .option {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }
+
+        .option-circle {
+            width: 18px;
+            height: 18px;
+            border: 2px solid #333;
+            border-radius: 50%;
+            flex-shrink: 0;
+        }
+
+        .answer-section {
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 2px solid #333;
+        }
+
+        .answer-section h2 {
+            font-size: 16px;
+            margin-bottom: 15px;
+        }
+
+        .answers {
+            display: grid;
+            grid-template-columns: repeat(5, 1fr);
+            gap: 10px;
+            font-size: 12px;
+        }
+
+        .answer-item {
+            padding: 5px;
+            background: #f5f5f5;
+            border-radius: 4px;
+        }
+
+        .instructions {
+            background: #f9f9f9;
+            padding: 15px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+            font-size: 13px;
+        }
+
+        .score-box {
+            float: right;
+            border: 2px solid #333;
+            padding: 15px;
+            text-align: center;
+            min-width: 80px;
+        }
+
+        .score-box .score {
+            font-size: 24px;
+            font-weight: bold;
+        }
+"""
+
+_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>$title</title>
+    <style>""" + _STYLE.replace("$", "$$") + """    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>$title</h1>
+        <p>Date: $date | Questions: $count</p>
+    </div>
+
+    <div class="student-info no-print">
+        <label>Name: <input type="text" value="$student_name"></label>
+        <label>Time: <input type="text" placeholder="__ minutes"></label>
+        <div class="score-box">
+            <div class="score">__/$count</div>
+            <div>Score</div>
+        </div>
+    </div>
+
+    <div class="instructions">
+        <strong>Instructions:</strong> Read each question carefully. Fill in the circle next to your chosen answer.
+        Work through all questions before checking your answers. Time yourself if practicing for the exam.
+    </div>
+
+    <div class="questions">
+""")
+
+_QUESTION_OPEN = Template("""
+        <div class="question">
+            <span class="question-number">Q$number.</span>
+            <span class="question-type" style="color: #888; font-size: 11px;">($question_type)</span>
+            <div class="question-text">$text</div>
+            <div class="options">
+""")
+
+_OPTION = Template("""
+                <div class="option">
+                    <div class="option-circle"></div>
+                    <span><strong>$letter.</strong> $text</span>
+                </div>
+""")
+
+_QUESTION_CLOSE = """
+            </div>
+        </div>
+"""
+
+_ANSWERS_OPEN = """
+    <div class="page-break"></div>
+    <div class="answer-section">
+        <h2>Answer Key (for parents - tear off before giving to child)</h2>
+        <div class="answers">
+"""
+
+_ANSWER_ITEM = Template("""
+            <div class="answer-item">
+                <strong>Q$number:</strong> $letter
+            </div>
+""")
+
+_ANSWERS_CLOSE = """
+        </div>
+    </div>
+"""
+
+_QUESTIONS_CLOSE = """
+    </div>
+"""
+
+_DOCUMENT_CLOSE = """</body>
+</html>
+"""
+
+
+def _display_text(question_text: str) -> str:
+    """Pull the readable question out of JSON-encoded question types"""
+    if question_text.startswith("{"):
+        try:
+            parsed = json.loads(question_text)
+            return parsed.get("question", parsed.get("instruction", question_text))
+        except (ValueError, AttributeError):
+            pass
+    return question_text
+
+
+def _options(question: dict) -> list:
+    options = question["options"]
+    return json.loads(options) if isinstance(options, str) else (options or [])
+
+
+def answer_letter(question: dict) -> str:
+    """Letter of the correct option (A-E)"""
+    correct_idx = question["correct_index"] if question["correct_index"] is not None else 0
+    return chr(65 + correct_idx)
+
+
+def render_worksheet(
+    questions: Sequence[dict],
+    title: str = "11+ Practice Worksheet",
+    student_name: str = "",
+    include_answers: bool = True,
+) -> Iterator[str]:
+    """
+    Render a worksheet as a stream of HTML chunks
+
+    Each question is yielded as soon as it's rendered, so callers can write
+    straight to a file or HTTP response without holding the whole document.
+    """
+    count = len(questions)
+    yield _HEAD.substitute(
+        title=html.escape(title),
+        date=datetime.now().strftime("%d %B %Y"),
+        count=count,
+        student_name=html.escape(student_name, quote=True),
+    )
+
+    for i, q in enumerate(questions, 1):
+        parts = [_QUESTION_OPEN.substitute(
+            number=i,
+            question_type=q["question_type"].replace("_", " ").title(),
+            text=html.escape(_display_text(q["question_text"])),
+        )]
+        for j, opt in enumerate(_options(q)):
+            # Truncate long options (like SVG)
+            display_opt = str(opt)[:100] + "..." if len(str(opt)) > 100 else str(opt)
+            parts.append(_OPTION.substitute(letter=chr(65 + j), text=html.escape(display_opt)))
+        parts.append(_QUESTION_CLOSE)
+        yield "".join(parts)
+
+    yield _QUESTIONS_CLOSE
+    if include_answers:
+        yield _ANSWERS_OPEN + "".join(
+            _ANSWER_ITEM.substitute(number=i, letter=answer_letter(q))
+            for i, q in enumerate(questions, 1)
+        ) + _ANSWERS_CLOSE
+    yield _DOCUMENT_CLOSE
+
+
+def write_worksheet(out: TextIO, questions: Sequence[dict], **kwargs) -> int:
+    """Stream a worksheet to an open text file; returns characters written"""
+    written = 0
+    for chunk in render_worksheet(questions, **kwargs):
+        written += out.write(chunk)
+    return written
+
+
+def worksheet_title(subject: Optional[str] = None, question_type: Optional[str] = None) -> str:
+    if question_type:
+        return f"11+ Practice: {question_type.replace('_', ' ').title()}"
+    if subject:
+        return f"11+ Practice: {subject.replace('_', ' ').title()}"
+    return "11+ Mixed Practice Worksheet"
+
+
+# ============================================================================
+# Question Pool
+# ============================================================================
+
+class QuestionPool:
+    """
+    Printable questions held in memory and indexed by subject and type
+
+    Loaded with a single query, then sampled with random.sample instead of
+    ORDER BY RANDOM() per worksheet.
+    """
+
+    def __init__(self, questions: Iterable[dict]):
+        self.questions: List[dict] = []
+        self.by_subject: Dict[str, List[int]] = defaultdict(list)
+        self.by_type: Dict[str, List[int]] = defaultdict(list)
+
+        for q in questions:
+            if q["subject"] in EXCLUDED_SUBJECTS or q["question_type"] in EXCLUDED_TYPES:
+                continue
+            idx = len(self.questions)
+            self.questions.append(q)
+            self.by_subject[q["subject"]].append(idx)
+            self.by_type[q["question_type"]].append(idx)
+
+    @classmethod
+    def from_sqlite(cls, db_path: str) -> "QuestionPool":
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f"SELECT {', '.join(POOL_COLUMNS)} FROM questions").fetchall()
+        finally:
+            conn.close()
+        return cls(dict(row) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def _candidates(self, subject: Optional[str] = None, question_type: Optional[str] = None) -> List[int]:
+        if question_type:
+            indices = self.by_type.get(question_type, [])
+            if subject:
+                indices = [i for i in indices if self.questions[i]["subject"] == subject]
+            return indices
+        if subject:
+            return self.by_subject.get(subject, [])
+        return range(len(self.questions))
+
+    def sample(
+        self,
+        count: int,
+        subject: Optional[str] = None,
+        question_type: Optional[str] = None,
+        rng: Optional[random.Random] = None,
+        exclude: Optional[set] = None,
+    ) -> List[dict]:
+        """Pick up to count distinct questions matching the filters"""
+        rng = rng or random
+        candidates = self._candidates(subject, question_type)
+        if exclude:
+            candidates = [i for i in candidates if i not in exclude]
+        picked = rng.sample(candidates, min(count, len(candidates)))
+        if exclude is not None:
+            exclude.update(picked)
+        return [self.questions[i] for i in picked]
+
+    def sample_personalised(
+        self,
+        count: int,
+        weak_types: Sequence[str],
+        rng: Optional[random.Random] = None,
+    ) -> List[dict]:
+        """Weight a worksheet towards a student's weak question types, topping up with mixed questions"""
+        rng = rng or random
+        used: set = set()
+        questions: List[dict] = []
+
+        weak_types = [t for t in weak_types if t in self.by_type]
+        if weak_types:
+            weak_count = round(count * WEAK_TOPIC_SHARE)
+            per_type, extra = divmod(weak_count, len(weak_types))
+            for i, question_type in enumerate(weak_types):
+                n = per_type + (1 if i < extra else 0)
+                questions.extend(self.sample(n, question_type=question_type, rng=rng, exclude=used))
+
+        questions.extend(self.sample(count - len(questions), rng=rng, exclude=used))
+        rng.shuffle(questions)
+        return questions
+
+
+def weak_topics_by_student(
+    db_path: str,
+    student_ids: Optional[Sequence[str]] = None,
+    limit: int = 3,
+    min_attempts: int = 3,
+) -> Dict[str, List[str]]:
+    """Each student's lowest-accuracy question types, from one grouped query"""
+    query = """
+        SELECT s.id, q.question_type,
+               COUNT(*) AS attempted,
+               SUM(CASE WHEN a.is_correct THEN 1 ELSE 0 END) AS correct
+        FROM attempts a
+        JOIN questions q ON q.pk = a.question_pk
+        JOIN students s ON s.pk = a.student_pk
+    """
+    params: list = []
+    if student_ids:
+        query += f" WHERE s.id IN ({', '.join('?' for _ in student_ids)})"
+        params.extend(student_ids)
+    query += """
+        GROUP BY a.student_pk, q.question_type
+        HAVING COUNT(*) >= ?
+        ORDER BY a.student_pk, CAST(correct AS REAL) / attempted ASC
+    """
+    params.append(min_attempts)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    weak: Dict[str, List[str]] = defaultdict(list)
+    for student_id, question_type, _, _ in rows:
+        if question_type in EXCLUDED_TYPES or len(weak[student_id]) >= limit:
+            continue
+        weak[student_id].append(question_type)
+    return dict(weak)
+
+
+# ============================================================================
+# Batch Generation
+# ============================================================================
+
+@dataclass
+class WorksheetJob:
+    """One worksheet to render in a batch"""
+    output_path: str
+    title: str
+    count: int = 20
+    student_name: str = ""
+    weak_types: List[str] = field(default_factory=list)
+    subject: Optional[str] = None
+    question_type: Optional[str] = None
+    seed: Optional[int] = None
+    include_answers: bool = True
+
+
+# Set in each worker process by _init_worker so the pool is sent once per worker
+_worker_pool: Optional[QuestionPool] = None
+
+
+def _init_worker(pool: QuestionPool):
+    global _worker_pool
+    _worker_pool = pool
+
+
+def run_job(job: WorksheetJob, pool: Optional[QuestionPool] = None) -> int:
+    """Sample questions for a job and stream the worksheet to disk; returns question count"""
+    pool = pool or _worker_pool
+    rng = random.Random(job.seed)
+    if job.weak_types:
+        questions = pool.sample_personalised(job.count, job.weak_types, rng=rng)
+    else:
+        questions = pool.sample(job.count, subject=job.subject, question_type=job.question_type, rng=rng)
+
+    with open(job.output_path, "w", encoding="utf-8") as f:
+        write_worksheet(
+            f, questions,
+            title=job.title,
+            student_name=job.student_name,
+            include_answers=job.include_answers,
+        )
+    return len(questions)
+
+
+def run_batch(jobs: Sequence[WorksheetJob], pool: QuestionPool, workers: int = 4) -> List[int]:
+    """Render many worksheets in parallel worker processes"""
+    if workers <= 1 or len(jobs) <= 1:
+        return [run_job(job, pool) for job in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pool,)) as executor:
+        return list(executor.map(run_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+# ============================================================================
+# Class Bundles
+# ============================================================================
+
+_TABLE_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>$title</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        h1 { font-size: 20px; }
+        table { border-collapse: collapse; font-size: 12px; }
+        th, td { border: 1px solid #333; padding: 4px 6px; text-align: center; }
+        th:first-child, td:first-child { text-align: left; white-space: nowrap; }
+        td.blank { width: 22px; height: 18px; }
+    </style>
+</head>
+<body>
+    <h1>$title</h1>
+    <table>
+        <tr><th>Student</th>$header</tr>
+""")
+
+_TABLE_CLOSE = """    </table>
+</body>
+</html>
+"""
+
+
+@dataclass
+class BundleStats:
+    """Timing and size metrics for a class bundle"""
+    variants: int = 0
+    questions: int = 0
+    unique_questions: int = 0
+    sample_seconds: float = 0.0
+    write_seconds: float = 0.0
+    bytes_written: int = 0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.sample_seconds + self.write_seconds
+
+    @property
+    def overlapping(self) -> bool:
+        return self.unique_questions < self.questions
+
+
+def assign_question_sets(
+    pool: QuestionPool,
+    variants: int,
+    count: int,
+    subject: Optional[str] = None,
+    question_type: Optional[str] = None,
+    rng: Optional[random.Random] = None,
+) -> List[List[dict]]:
+    """
+    Give each variant its own question set with one shuffle of the candidates
+
+    Sets don't overlap while the pool has variants * count questions; beyond
+    that questions are reused round-robin, still never twice in one variant.
+    """
+    rng = rng or random
+    candidates = list(pool._candidates(subject, question_type))
+    if not candidates:
+        return [[] for _ in range(variants)]
+    rng.shuffle(candidates)
+
+    per_variant = min(count, len(candidates))
+    total = len(candidates)
+    return [
+        [pool.questions[candidates[(v * per_variant + k) % total]] for k in range(per_variant)]
+        for v in range(variants)
+    ]
+
+
+def _table_header(count: int, extra: str = "") -> str:
+    return "".join(f"<th>Q{i}</th>" for i in range(1, count + 1)) + extra
+
+
+def render_answer_key(names: Sequence[str], question_sets: Sequence[Sequence[dict]], title: str) -> Iterator[str]:
+    """One row of correct letters per variant"""
+    width = max((len(qs) for qs in question_sets), default=0)
+    yield _TABLE_PAGE.substitute(title=html.escape(f"Answer Key - {title}"), header=_table_header(width))
+    for name, questions in zip(names, question_sets):
+        cells = "".join(f"<td>{answer_letter(q)}</td>" for q in questions)
+        yield f"        <tr><td>{html.escape(name)}</td>{cells}</tr>\n"
+    yield _TABLE_CLOSE
+
+
+def render_marking_grid(names: Sequence[str], question_sets: Sequence[Sequence[dict]], title: str) -> Iterator[str]:
+    """Blank ticks grid with a total column for marking by hand"""
+    width = max((len(qs) for qs in question_sets), default=0)
+    yield _TABLE_PAGE.substitute(
+        title=html.escape(f"Marking Grid - {title}"),
+        header=_table_header(width, "<th>Total</th>"),
+    )
+    for name, questions in zip(names, question_sets):
+        cells = '<td class="blank"></td>' * len(questions)
+        yield f'        <tr><td>{html.escape(name)}</td>{cells}<td class="blank">/{len(questions)}</td></tr>\n'
+    yield _TABLE_CLOSE
+
+
+def _safe_filename(name: str) -> str:
+    cleaned = "".join(c if c.isalnum() or c in "-_" else "_" for c in name.strip())
+    return cleaned or "student"
+
+
+def write_class_bundle(
+    output,
+    names: Sequence[str],
+    pool: QuestionPool,
+    count: int = 20,
+    subject: Optional[str] = None,
+    question_type: Optional[str] = None,
+    title: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> BundleStats:
+    """
+    Write one variant worksheet per name plus a combined answer key and marking grid into a zip
+
+    output may be a path or a writable binary file (including unseekable streams).
+    Every document is streamed straight into its zip entry, so no worksheet is
+    ever held in memory in full.
+    """
+    import time
+    import zipfile
+
+    stats = BundleStats(variants=len(names))
+    title = title or worksheet_title(subject, question_type)
+
+    start = time.perf_counter()
+    question_sets = assign_question_sets(pool, len(names), count, subject, question_type, random.Random(seed))
+    stats.sample_seconds = time.perf_counter() - start
+    stats.questions = sum(len(qs) for qs in question_sets)
+    stats.unique_questions = len({q["id"] for qs in question_sets for q in qs})
+
+    start = time.perf_counter()
+    width = len(str(len(names)))
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as bundle:
+        def write_entry(filename: str, chunks: Iterable[str]):
+            with bundle.open(filename, "w") as entry:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8")
+                    entry.write(data)
+                    stats.bytes_written += len(data)
+
+        for i, (name, questions) in enumerate(zip(names, question_sets), 1):
+            write_entry(
+                f"worksheets/{i:0{width}d}_{_safe_filename(name)}.html",
+                render_worksheet(questions, title, student_name=name, include_answers=False),
+            )
+        write_entry("answer_key.html", render_answer_key(names, question_sets, title))
+        write_entry("marking_grid.html", render_marking_grid(names, question_sets, title))
+    stats.write_seconds = time.perf_counter() - start
+
+    return stats
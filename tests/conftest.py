@@ -0,0 +1,17 @@
+"""
+Shared test setup: make the repo importable the way the scripts do, and
+point the app at a throwaway database and LLM cache (before src.core.database
+creates its engine)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_scratch = tempfile.mkdtemp(prefix="elevenplustutor-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_scratch}/test.db")
+os.environ.setdefault("LLM_CACHE_PATH", f"{_scratch}/llm_cache.db")
+os.environ.setdefault("JOB_WORKERS", "0")
@@ -0,0 +1,55 @@
+"""init_db against databases from before question_stats and integer keys"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.core import database
+from src.core.database import LegacyDatabaseError, init_db
+
+
+@pytest.fixture
+def legacy_engine(tmp_path, monkeypatch):
+    def make(columns: str):
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute(f"CREATE TABLE questions ({columns})")
+        conn.commit()
+        conn.close()
+        engine = create_engine(f"sqlite:///{path}")
+        monkeypatch.setattr(database, "engine", engine)
+        return path
+
+    yield make
+    database.engine.dispose()
+
+
+@pytest.mark.parametrize("columns, problem", [
+    ("id TEXT PRIMARY KEY, text TEXT, times_attempted INTEGER, times_correct INTEGER",
+     "answer counts are still on questions"),
+    ("id TEXT PRIMARY KEY, text TEXT", "questions has no integer pk"),
+])
+def test_legacy_layout_stops_with_upgrade_steps(legacy_engine, columns, problem):
+    path = legacy_engine(columns)
+
+    with pytest.raises(LegacyDatabaseError) as error:
+        init_db()
+
+    message = str(error.value)
+    assert problem in message
+    assert message.index("migrate_question_stats.py") < message.index("migrate_surrogate_keys.py")
+    assert f"--db {path}" in message
+    # Nothing was created alongside the old tables
+    conn = sqlite3.connect(path)
+    assert [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")] == ["questions"]
+    conn.close()
+
+
+def test_empty_database_initializes(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+
+    assert init_db() is True
+    assert init_db() is False
+    engine.dispose()
@@ -0,0 +1,148 @@
+"""GenerationPipeline against the stub LLM server, and StreamingObjectParser chunking"""
+
+import asyncio
+import json
+import random
+import socket
+
+import pytest
+
+from scripts.stub_llm_server import BackgroundServer, StubConfig
+from src.agents.generation import GenerationPipeline
+from src.agents.llm_client import LLMClient
+from src.agents.practice_agent import BATCH_COUNT_MARKER
+from src.agents.structured import StreamingObjectParser
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def stub():
+    """Start a fast stub server with the given invalid rate; yields (url, prompts)"""
+    servers = []
+
+    def start(invalid_rate: float = 0.0, seed: int = 0):
+        config = StubConfig(
+            first_token_seconds=0, prefill_tokens_per_second=0, tokens_per_second=0,
+            parallel=8, invalid_rate=invalid_rate, seed=seed,
+        )
+        server = BackgroundServer(config, port=free_port()).__enter__()
+        servers.append(server)
+        return server.url, server.app.state.prompts
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def run_pipeline(url: str, count: int, **options):
+    async def run():
+        client = LLMClient("openai", url, "stub")
+        pipeline = GenerationPipeline(client, **options)
+        try:
+            rows = await pipeline.generate("mathematics", "arithmetic", count)
+        finally:
+            await client.close()
+        return rows, pipeline.stats
+
+    return asyncio.run(run())
+
+
+def asked(prompts):
+    """How many questions each call asked for, in call order"""
+    return [
+        int(line[len(BATCH_COUNT_MARKER):])
+        for prompt in prompts for line in prompt.splitlines() if line.startswith(BATCH_COUNT_MARKER)
+    ]
+
+
+def test_one_call_per_batch(stub):
+    url, prompts = stub()
+    rows, stats = run_pipeline(url, 23, concurrency=4, per_call=5)
+    assert len(rows) == 23
+    assert stats.calls == 5          # ceil(23 / 5)
+    assert stats.retry_calls == 0
+    assert len(asked(prompts)) == 5
+    assert len({row["question_text"] for row in rows}) == 23
+
+
+def test_only_rejected_questions_are_requested_again(stub):
+    url, prompts = stub(invalid_rate=0.2, seed=4)
+    rows, stats = run_pipeline(url, 10, concurrency=1, per_call=5, max_calls_factor=4)
+    assert len(rows) == 10
+    assert stats.rejected > 0 and stats.aborted_calls == 0
+    counts = asked(prompts)
+    assert counts[:2] == [5, 5] and len(counts) > 2
+    # Every question asked for was either accepted or rejected: no full batches re-run
+    assert sum(counts) == stats.accepted + stats.rejected
+    assert all("A previous answer was rejected" in prompt for prompt in prompts[2:])
+
+
+def test_mostly_bad_call_is_cut_off(stub):
+    url, prompts = stub(invalid_rate=1.0)
+    rows, stats = run_pipeline(url, 10, concurrency=1, per_call=10)
+    assert rows == []
+    assert stats.calls == 2          # The call budget: 2x the one call needed
+    assert stats.aborted_calls == 2
+    assert stats.parsed < sum(asked(prompts))    # The rest of each response was never read
+
+
+# ============================================================================
+# StreamingObjectParser
+# ============================================================================
+
+ITEMS = [
+    {"question_text": 'Which is bigger: {a} or [b]? Say "a".', "options": ["{", "}", "[", "]"], "n": 1},
+    {"question_text": "Back\\slash and \\\"quote\\\" and café ☃", "meta": {"nested": [{"x": "}"}, [{"y": 2}]], "deep": {"x": "}"}}},
+    {"question_text": "", "options": [], "correct_answer": "}\"{"},
+]
+
+
+def parse_in_chunks(text, cuts):
+    parser = StreamingObjectParser()
+    items, last = [], 0
+    for cut in list(cuts) + [len(text)]:
+        items += list(parser.feed(text[last:cut]))
+        last = cut
+    items += list(parser.close())
+    return items, parser
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps({"questions": ITEMS}),
+    "Here you go:\n```json\n" + json.dumps({"questions": ITEMS}, indent=2) + "\n```",
+    "\n".join(json.dumps(item) for item in ITEMS),
+    json.dumps(ITEMS),
+], ids=["wrapped", "fenced", "json-lines", "array"])
+def test_parser_is_independent_of_chunking(text):
+    for cut in range(len(text) + 1):
+        assert parse_in_chunks(text, [cut])[0] == ITEMS, f"split at {cut}"
+    assert parse_in_chunks(text, range(1, len(text)))[0] == ITEMS    # One character at a time
+    rng = random.Random(0)
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 20)))
+        assert parse_in_chunks(text, cuts)[0] == ITEMS
+
+
+@pytest.mark.parametrize("wrap", [lambda items: {"questions": items}, lambda items: items], ids=["wrapped", "array"])
+def test_parser_keeps_objects_in_an_items_array_inside_the_item(wrap):
+    items = [
+        {"question_text": "Pick one", "options": [{"text": "a"}, {"text": "b"}], "correct_answer": "a"},
+        {"question_text": "And again", "options": [{"text": "c", "tags": [{"t": 1}]}], "correct_answer": "c"},
+    ]
+    text = json.dumps(wrap(items))
+    for cut in range(len(text) + 1):
+        assert parse_in_chunks(text, [cut])[0] == items, f"split at {cut}"
+    assert parse_in_chunks(text, range(1, len(text)))[0] == items
+
+
+def test_parser_skips_malformed_objects():
+    text = json.dumps(ITEMS[0]) + "\n{\"question_text\": nope}\n" + json.dumps(ITEMS[2])
+    for cut in range(len(text) + 1):
+        items, parser = parse_in_chunks(text, [cut])
+        assert items == [ITEMS[0], ITEMS[2]]
+        assert parser.malformed == 1
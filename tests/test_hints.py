@@ -0,0 +1,117 @@
+"""
+Live hints: concurrent misses for one question make one LLM call and one
+row, and nothing reaches the LLM unless the paid AI features are enabled
+"""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.agents.llm_cache import LLMResponseCache
+from src.agents.practice_agent import HINT_PROMPT_VERSION, PracticeAgent
+from src.api import main
+from src.core.database import Question, QuestionHint, SessionLocal, init_db, save_question_hint
+from settings import settings
+
+
+class SlowLLM:
+    """Stands in for the LLM client: a fixed hint after a delay, counting calls"""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, prompt: str, **params) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "Look at how each word is used."
+
+
+@pytest.fixture
+def question_id():
+    init_db()
+    db = SessionLocal()
+    try:
+        question = Question(
+            id=str(uuid.uuid4()), exam_type="11plus_gl", subject="verbal_reasoning",
+            question_type="synonyms", question_text="Which word means the same as happy?",
+            options=["glad", "sad", "cross", "tired"], correct_answer="glad", correct_index=0,
+        )
+        db.add(question)
+        db.commit()
+        return question.id
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def ai_tutor(monkeypatch):
+    monkeypatch.setattr(settings, "app_mode", "paid")
+    monkeypatch.setattr(settings, "enable_ai_tutor", True)
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    llm = SlowLLM()
+    agent = PracticeAgent(llm, cache=LLMResponseCache(), model=settings.llm_model)
+    monkeypatch.setattr(main, "_practice_agent", agent)
+    return llm
+
+
+def stored_hints(question_id):
+    db = SessionLocal()
+    try:
+        return db.query(QuestionHint).filter(QuestionHint.question_id == question_id).all()
+    finally:
+        db.close()
+
+
+def test_concurrent_hint_misses_share_one_call(question_id, slow_llm, ai_tutor):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(f"/api/questions/{question_id}/hint") for _ in range(3)))
+
+    responses = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert {r.json()["source"] for r in responses} == {"live"}
+    assert slow_llm.calls == 1
+    assert len(stored_hints(question_id)) == 1
+
+
+def test_save_question_hint_overwrites(question_id):
+    db = SessionLocal()
+    try:
+        save_question_hint(db, question_id, "model", HINT_PROMPT_VERSION, "first")
+        save_question_hint(db, question_id, "model", HINT_PROMPT_VERSION, "second")
+        db.commit()
+    finally:
+        db.close()
+    hints = stored_hints(question_id)
+    assert [h.hint for h in hints] == ["second"]
+
+
+def test_llm_endpoints_need_their_feature(question_id, slow_llm):
+    with TestClient(main.app) as client:
+        assert client.get(f"/api/questions/{question_id}/hint").status_code == 403
+        assert client.get(f"/api/questions/{question_id}/hint/stream").status_code == 403
+        assert client.get("/api/explain/stream", params={"topic": "synonyms"}).status_code == 403
+    assert slow_llm.calls == 0
+    assert stored_hints(question_id) == []
+
+
+def test_stored_hints_are_served_without_ai_tutor(question_id, slow_llm):
+    db = SessionLocal()
+    try:
+        save_question_hint(db, question_id, settings.llm_model, HINT_PROMPT_VERSION, "Think of a happy word.")
+        db.commit()
+    finally:
+        db.close()
+    with TestClient(main.app) as client:
+        response = client.get(f"/api/questions/{question_id}/hint")
+    assert response.status_code == 200
+    assert response.json()["source"] == "precomputed"
+    assert slow_llm.calls == 0
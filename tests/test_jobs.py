@@ -0,0 +1,70 @@
+"""The mimic job: params are validated when queued, and a restarted run adds nothing twice"""
+
+import uuid
+
+from fastapi.testclient import TestClient
+
+from src.api import jobs as job_handlers
+from src.api import main
+from src.core.database import Question, SessionLocal, init_db
+
+
+class Context:
+    """Just enough of JobContext for a handler run outside the runner"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def progress(self, current, total=None, message=None):
+        pass
+
+
+def add_sequence_question() -> str:
+    init_db()
+    db = SessionLocal()
+    try:
+        question = Question(
+            id=str(uuid.uuid4()), exam_type="11plus_gl", subject="mathematics", question_type="sequences",
+            question_text="What comes next in the sequence?\n4, 9, 14, 19, ___",
+            options=["23", "24", "25", "26", "27"], correct_answer="24", correct_index=1,
+        )
+        db.add(question)
+        db.commit()
+        return question.id
+    finally:
+        db.close()
+
+
+def bank_size() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Question).count()
+    finally:
+        db.close()
+
+
+def test_restarted_mimic_job_repeats_its_variants():
+    params = {"question_ids": [add_sequence_question()], "count": 5}
+    ctx = Context(str(uuid.uuid4()))
+
+    first = job_handlers.mimic_questions(ctx, params)
+    size = bank_size()
+    again = job_handlers.mimic_questions(ctx, params)
+
+    assert first["created"] == 5
+    assert again["created"] == 0
+    assert bank_size() == size
+
+
+def test_mimic_job_params_are_validated():
+    client = TestClient(main.app)
+    question_id = add_sequence_question()
+
+    too_many = client.post("/api/jobs", json={"kind": "mimic", "params": {"question_ids": [question_id], "count": 5000}})
+    no_source = client.post("/api/jobs", json={"kind": "mimic", "params": {"count": 5}})
+    queued = client.post("/api/jobs", json={"kind": "mimic", "params": {"question_type": "sequences", "count": "3"}})
+
+    assert too_many.status_code == 422
+    assert no_source.status_code == 422
+    assert queued.status_code == 202
+    assert queued.json()["params"] == {"question_type": "sequences", "count": 3}
@@ -0,0 +1,77 @@
+"""Single-flight behaviour of LLMResponseCache.get_or_generate"""
+
+import asyncio
+
+from src.agents.llm_cache import LLMResponseCache, cache_key
+
+
+def make_generate(calls, delay=0.1, response="answer"):
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return response
+    return generate
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        cache, calls = LLMResponseCache(), []
+        generate = make_generate(calls)
+        results = await asyncio.gather(*(cache.get_or_generate("m", "p", generate) for _ in range(5)))
+        return results, calls
+
+    results, calls = asyncio.run(run())
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    async def run():
+        cache, calls = LLMResponseCache(), []
+        generate = make_generate(calls)
+        leader = asyncio.create_task(cache.get_or_generate("m", "p", generate))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_generate("m", "p", generate)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        return leader, results, calls
+
+    leader, results, calls = asyncio.run(run())
+    assert leader.cancelled()
+    assert results == ["answer"] * 3
+    assert len(calls) == 2    # The leader's call, then one waiter's
+
+
+def test_cancelled_waiter_leaves_the_call_running():
+    async def run():
+        cache, calls = LLMResponseCache(), []
+        generate = make_generate(calls)
+        leader = asyncio.create_task(cache.get_or_generate("m", "p", generate))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get_or_generate("m", "p", generate))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        return await asyncio.gather(leader, waiter, return_exceptions=True), calls
+
+    (leader, waiter), calls = asyncio.run(run())
+    assert leader == "answer"
+    assert isinstance(waiter, asyncio.CancelledError)
+    assert len(calls) == 1
+
+
+def test_failures_reach_waiters_and_are_not_cached():
+    async def run():
+        cache = LLMResponseCache()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("LLM down")
+
+        results = await asyncio.gather(*(cache.get_or_generate("m", "p", fail) for _ in range(3)),
+                                       return_exceptions=True)
+        return results, cache.get(cache_key("m", "p"))
+
+    results, cached = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cached is None
@@ -0,0 +1,34 @@
+"""Per-request query headers only for an enabled middleware and a truthy X-Debug-Queries"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.metrics import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, MetricsMiddleware
+
+
+def client(**options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(MetricsMiddleware, **options)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("value, shown", [
+    ("1", True), ("true", True), ("On", True), ("0", False), ("false", False), ("", False),
+])
+def test_debug_header_value_is_checked(value, shown):
+    response = client(debug_header=True).get("/ping", headers={"X-Debug-Queries": value})
+
+    assert (QUERY_COUNT_HEADER in response.headers) is shown
+    assert (QUERY_TIME_HEADER in response.headers) is shown
+
+
+def test_debug_header_is_off_by_default():
+    response = client().get("/ping", headers={"X-Debug-Queries": "1"})
+
+    assert QUERY_COUNT_HEADER not in response.headers
@@ -0,0 +1,43 @@
+"""scripts/migrate_question_stats.py on a database the app already wrote question_stats to"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from migrate_question_stats import migrate    # noqa: E402
+
+
+def test_counts_are_added_and_answer_times_rebuilt_once(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE questions (id TEXT PRIMARY KEY, question_text TEXT, times_attempted INTEGER, times_correct INTEGER);
+        CREATE TABLE attempts (id INTEGER PRIMARY KEY, question_id TEXT, time_taken_seconds INTEGER);
+        CREATE TABLE question_stats (
+            question_id TEXT PRIMARY KEY, times_attempted INTEGER NOT NULL, times_correct INTEGER NOT NULL,
+            timed_attempts INTEGER NOT NULL, total_time_seconds INTEGER NOT NULL, updated_at DATETIME
+        );
+        -- Four answers counted on the old row, then two counted by the app in question_stats
+        INSERT INTO questions VALUES ('q1', 'first', 4, 3), ('q2', 'second', 0, 0);
+        INSERT INTO question_stats VALUES ('q1', 2, 1, 2, 50, NULL);
+        -- Every answer is in attempts: three old ones with times, and the app's two
+        INSERT INTO attempts (question_id, time_taken_seconds) VALUES
+            ('q1', 10), ('q1', 20), ('q1', 0), ('q1', 30), ('q1', 20), ('q1', 30);
+    """)
+    conn.commit()
+    conn.close()
+
+    result = migrate(str(path))
+
+    conn = sqlite3.connect(path)
+    row = conn.execute(
+        "SELECT times_attempted, times_correct, timed_attempts, total_time_seconds FROM question_stats "
+        "WHERE question_id = 'q1'"
+    ).fetchone()
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(questions)")}
+    conn.close()
+    assert result["dropped"] == ["times_attempted", "times_correct"]
+    assert row == (6, 4, 5, 110)
+    assert not columns & {"times_attempted", "times_correct"}
@@ -0,0 +1,27 @@
+"""Rendered NVR tiles can sit side by side on one page"""
+
+import json
+import xml.dom.minidom
+
+from src.question_bank import nvr
+
+OPTIONS = [
+    {"shape": "square", "fill": "#FFFFFF", "inner": {"shape": "circle", "fill": "#000000"}},
+    {"shape": "square", "fill": "#FFFFFF", "inner": {"shape": "square", "fill": "#000000"}},
+    {"shape": "star", "fill": "#3B82F6", "rotation": 36},
+    {"shape": "triangle", "fill": "#3B82F6", "rotation": 90, "size": 20},
+    {"shape": "hexagon", "fill": "#F59E0B"},
+]
+
+
+def test_rendered_tiles_have_no_ids_to_clash():
+    question = json.dumps({"scene_version": nvr.SCENE_VERSION, "sequence": OPTIONS[:3]})
+    text, options = nvr.render_question(question, OPTIONS)
+    tiles = json.loads(text)["sequence"] + options
+
+    for tile in tiles:
+        svg = xml.dom.minidom.parseString(tile).documentElement
+        assert svg.tagName == "svg"
+        assert "id=" not in tile and "href" not in tile
+        # One drawn element per shape, inner shape included
+        assert len([n for n in svg.childNodes if n.nodeType == n.ELEMENT_NODE]) in (1, 2)
@@ -0,0 +1,31 @@
+"""Fixed /api/questions paths are not swallowed by /api/questions/{question_id}"""
+
+import uuid
+
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.core.database import Question, SessionLocal, init_db
+
+
+def test_random_question_route_is_not_a_question_id():
+    init_db()
+    subject = f"routes-{uuid.uuid4().hex[:8]}"
+    db = SessionLocal()
+    try:
+        question = Question(
+            id=str(uuid.uuid4()), exam_type="11plus_gl", subject=subject,
+            question_type="synonyms", question_text="Which word means the same as quick?",
+            options=["fast", "slow", "late", "calm"], correct_answer="fast", correct_index=0,
+        )
+        db.add(question)
+        db.commit()
+        question_id = question.id
+    finally:
+        db.close()
+
+    client = TestClient(main.app)
+    response = client.get("/api/questions/random", params={"subject": subject})
+    assert response.status_code == 200
+    assert response.json()["id"] == question_id
+    assert client.get(f"/api/questions/{question_id}").status_code == 200
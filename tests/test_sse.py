@@ -0,0 +1,82 @@
+"""Event streams pass through the gzip middleware uncompressed, one event at a time"""
+
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from src.api import sse
+from src.api.sse import SSEGZipMiddleware, sse_event, sse_response
+
+EVENTS = [sse_event({"text": f"token {i} " + "x" * 600}, "token") for i in range(3)]
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for event in EVENTS:
+                yield event
+        return sse_response(stream())
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("y" * 5000)
+
+    app.add_middleware(SSEGZipMiddleware, minimum_size=500)
+    return app
+
+
+def call(app, path):
+    """Run one GET through the ASGI app, returning the messages it sent"""
+    messages = []
+
+    async def receive():
+        await asyncio.sleep(3600)    # The client never disconnects
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip")], "client": ("test", 1), "server": ("test", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    bodies = [m.get("body", b"") for m in messages[1:] if m.get("body")]
+    return headers, bodies
+
+
+@pytest.fixture(params=["installed", "pre-0.46"])
+def gzip_middleware(request, monkeypatch):
+    if request.param == "pre-0.46":
+        # Older Starlette compressed every content type
+        from starlette.middleware import gzip as starlette_gzip
+
+        class CompressEverything(starlette_gzip.GZipMiddleware):
+            def __init__(self, app, **options):
+                super().__init__(app, **options)
+                if hasattr(self, "exclude_content_types"):
+                    self.exclude_content_types = ()
+        monkeypatch.setattr(sse, "GZipMiddleware", CompressEverything)
+
+
+def test_events_are_sent_uncompressed_as_they_come(gzip_middleware):
+    headers, bodies = call(make_app(), "/events")
+
+    assert "content-encoding" not in headers
+    assert headers["content-type"].startswith("text/event-stream")
+    assert [body.decode() for body in bodies] == EVENTS
+
+
+def test_other_responses_are_still_compressed(gzip_middleware):
+    headers, bodies = call(make_app(), "/text")
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(b"".join(bodies)) == b"y" * 5000
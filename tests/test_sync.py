@@ -0,0 +1,57 @@
+"""Delta sync: a student's attempts come straight from attempts by id, not through change_log"""
+
+import uuid
+
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.core.database import ChangeLog, Question, SessionLocal, init_db
+
+
+def add_question() -> str:
+    init_db()
+    db = SessionLocal()
+    try:
+        question = Question(
+            id=str(uuid.uuid4()), exam_type="11plus_gl", subject="verbal_reasoning", question_type="synonyms",
+            question_text="Which word means the same as big?",
+            options=["large", "small", "thin", "short"], correct_answer="large", correct_index=0,
+        )
+        db.add(question)
+        db.commit()
+        return question.id
+    finally:
+        db.close()
+
+
+def test_attempts_page_by_id_and_stay_out_of_the_log():
+    client = TestClient(main.app)
+    question_id = add_question()
+    student_id = f"sync-{uuid.uuid4().hex[:8]}"
+    answers = ["large", "small", "large"]
+    upload = client.post("/api/sync/attempts", json={
+        "student_id": student_id, "batch_id": "b1",
+        "attempts": [{"question_id": question_id, "answer": answer} for answer in answers],
+    })
+    assert upload.status_code == 200
+
+    first = client.get("/api/sync", params={"student_id": student_id, "limit": 2}).json()
+    assert [a["student_answer"] for a in first["attempts"]] == answers[:2]
+    assert first["attempts"][0]["question_id"] == question_id
+    assert first["has_more"]
+
+    rest = client.get("/api/sync", params={
+        "student_id": student_id, "since": first["latest"], "since_attempt": first["attempt_id"], "limit": 2,
+    }).json()
+    assert [a["student_answer"] for a in rest["attempts"]] == answers[2:]
+    assert rest["attempt_id"] > first["attempt_id"]
+    assert not rest["has_more"]
+
+    other = client.get("/api/sync", params={"student_id": f"other-{uuid.uuid4().hex[:8]}"}).json()
+    assert other["attempts"] == []
+
+    db = SessionLocal()
+    try:
+        assert db.query(ChangeLog).filter(ChangeLog.entity == "attempt").count() == 0
+    finally:
+        db.close()